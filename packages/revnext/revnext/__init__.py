@@ -2,26 +2,96 @@
 Revolution Next (*.revolutionnext.com.au) report downloads via REST API.
 """
 
-from revnext.common import ReportDownloadError
-from revnext.config import RevNextConfig, get_revnext_base_url_from_env
+from revnext.async_flow import run_report_flow_async, run_reports_async
+from revnext.batch import download_reports
+from revnext.cache import CacheEntry, ReportCache, StaleReport
+from revnext.client import RevNextClient
+from revnext.common import (
+    DeadlineExceededError,
+    ReportCancelledError,
+    ReportDownloadError,
+    ReportJob,
+    ReportRejectedError,
+    SessionExpiredError,
+    add_snapshot,
+    cancel_report_task,
+    run_report_job,
+)
+from revnext.config import (
+    CacheSettings,
+    PoolSettings,
+    RevNextConfig,
+    get_revnext_base_url_from_env,
+)
+from revnext.delta import RowChange, diff_reports, write_delta
+from revnext.journal import JournalEntry, ReportJournal, params_key
 from revnext.logger import get_logger, set_logger
+from revnext.polling import PollHistory
+from revnext.retry import RetryPolicy
+from revnext.session import PoolStats, get_pool_stats
+from revnext.snapshots import Snapshot, SnapshotStore
 from revnext.parts.reports import (
     PartsByBinLocationParams,
     PartsPriceListParams,
+    ReportOffsetIndex,
+    ReportRecord,
+    build_offset_index,
+    build_parts_by_bin_job,
+    build_parts_price_list_job,
+    convert_report,
     download_parts_by_bin_report,
     download_parts_price_list_report,
+    iter_report,
+    iter_report_batches,
 )
 
 __all__ = [
+    "CacheEntry",
+    "CacheSettings",
+    "DeadlineExceededError",
+    "JournalEntry",
+    "ReportCache",
+    "ReportCancelledError",
     "ReportDownloadError",
+    "ReportJob",
+    "ReportJournal",
+    "ReportOffsetIndex",
+    "ReportRecord",
+    "ReportRejectedError",
+    "RowChange",
+    "RetryPolicy",
+    "RevNextClient",
     "RevNextConfig",
     "get_revnext_base_url_from_env",
     "PartsByBinLocationParams",
     "PartsPriceListParams",
+    "PollHistory",
+    "PoolSettings",
+    "PoolStats",
+    "SessionExpiredError",
+    "Snapshot",
+    "SnapshotStore",
+    "StaleReport",
+    "add_snapshot",
+    "build_offset_index",
+    "build_parts_by_bin_job",
+    "build_parts_price_list_job",
+    "cancel_report_task",
+    "convert_report",
+    "diff_reports",
     "download_parts_by_bin_report",
     "download_parts_price_list_report",
+    "download_reports",
     "get_logger",
+    "get_pool_stats",
+    "iter_report",
+    "iter_report_batches",
+    "params_key",
+    "run_report_flow_async",
+    "run_report_job",
+    "run_reports_async",
     "set_logger",
+    "write_delta",
 ]
 
 __version__ = "0.1.0"
@@ -0,0 +1,301 @@
+"""
+Asyncio engine for Revolution Next report downloads.
+Runs the same submit → poll → loadData → download steps as revnext.common.run_report_flow, but waits
+between polls with asyncio.sleep so many reports can share one event loop. The HTTP calls themselves
+use requests and run in worker threads; a semaphore limits how many reports are in flight at once.
+"""
+
+import asyncio
+import threading
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+import requests
+
+from revnext.common import (
+    ReportDownloadError,
+    ReportJob,
+    _abandon_task,
+    _after_failed_attempt,
+    _check_cancelled,
+    _check_deadline,
+    _download_report,
+    _load_report_response_url,
+    _log_report_attempt_failed,
+    _poll_plan,
+    _poll_report_once,
+    _raise_report_flow_error,
+    _report_print,
+    _report_retry_delay,
+    _ReportProgress,
+    _submit_report_task,
+    add_snapshot,
+)
+from revnext.client import RevNextClient
+from revnext.journal import ReportJournal
+from revnext.polling import PollHistory
+from revnext.retry import RetryPolicy
+from revnext.snapshots import SnapshotStore
+
+# How often (seconds) a sleeping report checks its cancel_event.
+CANCEL_CHECK_INTERVAL = 0.5
+
+
+async def _sleep_unless_cancelled(
+    delay: float, cancel_event: threading.Event | None
+) -> None:
+    """asyncio.sleep(delay), raising ReportCancelledError if cancel_event is (or becomes) set."""
+    if cancel_event is None:
+        await asyncio.sleep(delay)
+        return
+    deadline = time.monotonic() + delay
+    while not cancel_event.is_set():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        await asyncio.sleep(min(remaining, CANCEL_CHECK_INTERVAL))
+    _check_cancelled(cancel_event)
+
+
+async def _run_report_flow_once_async(
+    session: requests.Session,
+    job: ReportJob,
+    base_url: str,
+    *,
+    max_polls: int,
+    poll_interval: float,
+    retry_policy: RetryPolicy,
+    deadline_at: float | None,
+    progress: _ReportProgress,
+    poll_history: PollHistory | None,
+    max_poll_interval: float,
+    cancel_event: threading.Event | None,
+) -> Path | bytes:
+    """Single attempt of the report flow; see revnext.common._run_report_flow_once."""
+    retry = {
+        "policy": retry_policy,
+        "deadline_at": deadline_at,
+        "report_label": job.report_label,
+    }
+    _check_cancelled(cancel_event)
+    if progress.task_id is None:
+        progress.task_id, progress.body = await asyncio.to_thread(
+            _submit_report_task,
+            session,
+            job.service_object,
+            base_url,
+            job.get_submit_body,
+            **retry,
+        )
+        progress.submitted_at = time.time()
+        progress.checkpoint()
+        if job.post_submit_hook:
+            await asyncio.to_thread(job.post_submit_hook, session)
+    elif progress.response_url is None:
+        _report_print(job.report_label, f"Resuming task {progress.task_id}")
+    task_id, body = progress.task_id, progress.body
+
+    if progress.response_url is None:
+        plan = _poll_plan(
+            job.service_object,
+            progress,
+            poll_history,
+            poll_interval=poll_interval,
+            max_poll_interval=max_poll_interval,
+        )
+        for i in range(max_polls):
+            delay = plan.next_delay()
+            try:
+                _check_deadline(deadline_at, delay)
+                await _sleep_unless_cancelled(delay, cancel_event)
+            except ReportDownloadError:
+                await asyncio.to_thread(
+                    _abandon_task,
+                    session,
+                    job.service_object,
+                    base_url,
+                    job.activity_tab_id,
+                    progress,
+                )
+                raise
+            done = await asyncio.to_thread(
+                _poll_report_once,
+                session,
+                job.service_object,
+                base_url,
+                job.activity_tab_id,
+                task_id,
+                body,
+                **retry,
+            )
+            if done:
+                plan.complete()
+                _report_print(job.report_label, "Report generation complete.")
+                break
+            _report_print(
+                job.report_label,
+                f"Poll {i + 1}: still generating...{plan.eta_text()}",
+                "  ",
+            )
+        else:
+            await asyncio.to_thread(
+                _abandon_task,
+                session,
+                job.service_object,
+                base_url,
+                job.activity_tab_id,
+                progress,
+            )
+            raise RuntimeError("Timed out waiting for report.")
+
+        progress.response_url = await asyncio.to_thread(
+            _load_report_response_url,
+            session,
+            job.service_object,
+            base_url,
+            job.activity_tab_id,
+            task_id,
+            body,
+            **retry,
+        )
+        progress.checkpoint()
+    result = await asyncio.to_thread(
+        _download_report,
+        session,
+        job.service_object,
+        progress.response_url,
+        job.output_path,
+        **retry,
+    )
+    progress.finish()
+    return result
+
+
+async def run_report_flow_async(
+    session: requests.Session,
+    job: ReportJob,
+    base_url: str,
+    *,
+    max_polls: int = 60,
+    poll_interval: float = 2,
+    retry_policy: RetryPolicy | None = None,
+    poll_history: PollHistory | None = None,
+    max_poll_interval: float = 30,
+    journal: ReportJournal | None = None,
+    cancel_event: threading.Event | None = None,
+    snapshots: SnapshotStore | None = None,
+) -> Path | bytes:
+    """
+    Async version of run_report_flow for one ReportJob.
+    Retries the full flow per retry_policy (report_attempts, backoff, deadline) on ReportDownloadError
+    or RuntimeError, resuming from the furthest step reached like run_report_flow; with a journal,
+    also resumes the job's task journaled by an earlier run.
+    Stops with ReportCancelledError once cancel_event is set. If the coroutine is cancelled (or
+    interrupted) while its task is generating, the task is cancelled on the server unless journaled.
+    With snapshots (a SnapshotStore) and job.key, the downloaded report is added to the store.
+    Returns the saved Path, or the CSV bytes when job.output_path is None.
+    """
+    policy = retry_policy or RetryPolicy()
+    deadline_at = policy.deadline_at()
+    last_error: BaseException | None = None
+    progress = _ReportProgress.for_job(job, journal)
+    attempt = 0
+    try:
+        while True:
+            attempt += 1
+            resumed_stage = progress.stage
+            try:
+                result = await _run_report_flow_once_async(
+                    session,
+                    job,
+                    base_url,
+                    max_polls=max_polls,
+                    poll_interval=poll_interval,
+                    retry_policy=policy,
+                    deadline_at=deadline_at,
+                    progress=progress,
+                    poll_history=poll_history,
+                    max_poll_interval=max_poll_interval,
+                    cancel_event=cancel_event,
+                )
+                if snapshots is not None and job.key:
+                    await asyncio.to_thread(add_snapshot, snapshots, job, result)
+                return result
+            except (ReportDownloadError, RuntimeError) as e:
+                last_error = e
+                await asyncio.to_thread(
+                    _after_failed_attempt,
+                    session,
+                    job.service_object,
+                    base_url,
+                    job.activity_tab_id,
+                    progress,
+                    resumed_stage,
+                )
+                delay = _report_retry_delay(policy, attempt, e, deadline_at)
+                if delay is None:
+                    break
+                _log_report_attempt_failed(
+                    job.report_label, attempt, policy.report_attempts, e, delay
+                )
+                await _sleep_unless_cancelled(delay, cancel_event)
+    except (asyncio.CancelledError, KeyboardInterrupt, SystemExit):
+        if progress.journal is None:
+            # Blocking on purpose: the event loop may be shutting down.
+            _abandon_task(
+                session, job.service_object, base_url, job.activity_tab_id, progress
+            )
+        raise
+    _raise_report_flow_error(last_error, attempt, job.report_label)
+
+
+async def run_reports_async(
+    jobs: Iterable[ReportJob],
+    client: RevNextClient | None = None,
+    *,
+    max_concurrency: int = 4,
+    return_exceptions: bool = False,
+    **flow_options,
+) -> list[Path | bytes | BaseException]:
+    """
+    Run many ReportJobs on one event loop, at most max_concurrency at a time.
+    All jobs share the client's session (default a RevNextClient() from env, closed when done); the service object
+    is sent per request.
+    flow_options are passed to run_report_flow_async (max_polls, poll_interval, retry_policy, ...);
+    poll_history, retry_policy, journal, snapshots and cancel_event default to the client's, so
+    every downloaded report is snapshotted as it finishes, even if another report fails.
+    Returns results in job order. If return_exceptions=True, failed jobs give their exception
+    instead of raising (like asyncio.gather).
+
+    Example:
+        asyncio.run(run_reports_async(jobs, RevNextClient(config), max_concurrency=8))
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1.")
+    if client is None:
+        # A client made here is closed afterwards (session, journal, caches, snapshot store).
+        with RevNextClient() as client:
+            return await run_reports_async(
+                jobs,
+                client,
+                max_concurrency=max_concurrency,
+                return_exceptions=return_exceptions,
+                **flow_options,
+            )
+    base_url = client.base_url
+    flow_options.setdefault("poll_history", client.poll_history)
+    flow_options.setdefault("retry_policy", client.config.retry)
+    flow_options.setdefault("journal", client.journal)
+    flow_options.setdefault("snapshots", client.snapshots)
+    flow_options.setdefault("cancel_event", client.cancel_event)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    session = await asyncio.to_thread(lambda: client.session)
+
+    async def run_one(job: ReportJob) -> Path | bytes:
+        async with semaphore:
+            return await run_report_flow_async(session, job, base_url, **flow_options)
+
+    return await asyncio.gather(
+        *(run_one(job) for job in jobs), return_exceptions=return_exceptions
+    )
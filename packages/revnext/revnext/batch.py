@@ -0,0 +1,371 @@
+"""
+Batch scheduler for Revolution Next report downloads.
+Submits every report task up front so the server generates them all at once, then polls the
+outstanding task IDs from one thread, each on its own adaptive schedule (revnext.polling.PollPlan),
+and runs loadData for each report as soon as it is ready. Downloads run on a small worker pool, so
+a large CSV never holds up polling of the other tasks (or skews their poll timing).
+Wall-clock time is roughly the slowest report rather than the sum of all.
+"""
+
+import threading
+import time
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from revnext.common import (
+    ReportCancelledError,
+    ReportDownloadError,
+    ReportJob,
+    _abandon_task,
+    _after_failed_attempt,
+    _check_deadline,
+    _download_report,
+    _load_report_response_url,
+    _log_report_attempt_failed,
+    _poll_plan,
+    _poll_report_once,
+    _raise_report_flow_error,
+    _report_print,
+    _report_retry_delay,
+    _ReportProgress,
+    _submit_report_task,
+    add_snapshot,
+)
+from revnext.client import RevNextClient
+from revnext.journal import ReportJournal
+from revnext.polling import PollHistory, PollPlan
+from revnext.retry import RetryPolicy
+from revnext.snapshots import SnapshotStore
+
+# Reports downloading at once; keep within PoolSettings.pool_maxsize.
+DOWNLOAD_WORKERS = 4
+
+# How often (seconds) the loop checks cancel_event while downloads are running.
+CANCEL_CHECK_INTERVAL = 0.5
+
+# Default of poll_history, journal and snapshots: the client's. Passing None turns them off.
+_FROM_CLIENT: Any = object()
+
+
+@dataclass
+class _BatchEntry:
+    """Scheduling state for one job in a batch."""
+
+    index: int
+    job: ReportJob
+    progress: _ReportProgress
+    attempt: int = 0
+    resumed_stage: int = 0
+    plan: PollPlan | None = None
+    polls: int = 0
+    submit_after: float = 0.0
+    next_poll_at: float = 0.0
+    deadline_at: float | None = None
+    download: Future | None = None
+
+
+def download_reports(
+    jobs: Iterable[ReportJob],
+    client: RevNextClient | None = None,
+    *,
+    max_polls: int = 60,
+    poll_interval: float = 2,
+    retry_policy: RetryPolicy | None = None,
+    return_exceptions: bool = False,
+    poll_history: PollHistory | None = _FROM_CLIENT,
+    max_poll_interval: float = 30,
+    journal: ReportJournal | None = _FROM_CLIENT,
+    cancel_event: threading.Event | None = None,
+    snapshots: SnapshotStore | None = _FROM_CLIENT,
+    download_workers: int = DOWNLOAD_WORKERS,
+) -> list[Path | bytes | BaseException]:
+    """
+    Submit every ReportJob on the client's shared session (default a RevNextClient() from env,
+    closed when done), then poll all outstanding tasks from one loop and download each report as
+    soon as it finishes, on up to download_workers threads so polling carries on meanwhile.
+    Each task is polled on its own schedule: first near its expected
+    completion from poll_history (default client.poll_history), then backing off from poll_interval up to
+    max_poll_interval; a task that is not ready after max_polls polls fails with a timeout.
+    A failed report is resubmitted per retry_policy (default client.config.retry): up to report_attempts
+    times in total, with backoff, within its deadline; an expired session or rejected request fails at once.
+    Jobs with a key are recorded in journal (default client.journal); a job whose task an earlier run
+    journaled is not resubmitted: polling (or the download) picks up that task. Each downloaded
+    report of a job with a key is added to snapshots (default client.snapshots) as it finishes.
+    Pass poll_history=None, journal=None or snapshots=None to turn that feature off for the batch.
+    A task that times out or fails is cancelled on the server before its report is resubmitted. Setting
+    cancel_event (default client.cancel_event) cancels every unfinished task and fails those reports
+    with ReportCancelledError; KeyboardInterrupt or SystemExit cancels them too unless journaled.
+
+    Returns results in job order: the saved Path, or CSV bytes when the job has no output_path.
+    If return_exceptions=True, failed jobs give their ReportDownloadError instead; otherwise the
+    first failure is raised once every other job has finished.
+    """
+    if client is None:
+        # A client made here is closed afterwards (session, journal, caches, snapshot store).
+        with RevNextClient() as client:
+            return download_reports(
+                jobs,
+                client,
+                max_polls=max_polls,
+                poll_interval=poll_interval,
+                retry_policy=retry_policy,
+                return_exceptions=return_exceptions,
+                poll_history=poll_history,
+                max_poll_interval=max_poll_interval,
+                journal=journal,
+                cancel_event=cancel_event,
+                snapshots=snapshots,
+                download_workers=download_workers,
+            )
+    base_url = client.base_url
+    if poll_history is _FROM_CLIENT:
+        poll_history = client.poll_history
+    policy = retry_policy or client.config.retry
+    if journal is _FROM_CLIENT:
+        journal = client.journal
+    if snapshots is _FROM_CLIENT:
+        snapshots = client.snapshots
+    if cancel_event is None:
+        cancel_event = client.cancel_event
+    entries = [
+        _BatchEntry(index, job, _ReportProgress.for_job(job, journal))
+        for index, job in enumerate(jobs)
+    ]
+    results: list[Path | bytes | BaseException | None] = [None] * len(entries)
+    unfinished = list(entries)
+
+    def schedule(entry: _BatchEntry) -> None:
+        """Plan polling for a submitted (or journaled) task; a known download URL is due at once."""
+        entry.plan = _poll_plan(
+            entry.job.service_object,
+            entry.progress,
+            poll_history,
+            poll_interval=poll_interval,
+            max_poll_interval=max_poll_interval,
+        )
+        entry.next_poll_at = time.monotonic()
+        if entry.progress.response_url is None:
+            entry.next_poll_at += entry.plan.next_delay()
+
+    for entry in entries:
+        if entry.progress.task_id is not None:
+            entry.attempt = 1
+            entry.resumed_stage = entry.progress.stage
+            entry.deadline_at = policy.deadline_at()
+            schedule(entry)
+
+    def abandon(entry: _BatchEntry) -> None:
+        _abandon_task(
+            client.session,
+            entry.job.service_object,
+            base_url,
+            entry.job.activity_tab_id,
+            entry.progress,
+        )
+
+    def fail(entry: _BatchEntry, error: BaseException) -> None:
+        """
+        Same staging as run_report_flow: the next attempt keeps polling the same task, or resumes
+        the download (Range request on the partial file), unless this attempt had resumed that
+        step and failed there again; then the task is cancelled and resubmitted.
+        """
+        label = entry.job.report_label
+        progress = entry.progress
+        _after_failed_attempt(
+            client.session,
+            entry.job.service_object,
+            base_url,
+            entry.job.activity_tab_id,
+            progress,
+            entry.resumed_stage,
+        )
+        entry.plan = None
+        entry.polls = 0
+        delay = _report_retry_delay(policy, entry.attempt, error, entry.deadline_at)
+        if delay is not None:
+            _log_report_attempt_failed(
+                label, entry.attempt, policy.report_attempts, error, delay
+            )
+            entry.submit_after = time.monotonic() + delay
+            if progress.task_id is not None:
+                # Task kept: no resubmit, so the next attempt starts here.
+                entry.attempt += 1
+                entry.resumed_stage = progress.stage
+                schedule(entry)
+                entry.next_poll_at = entry.submit_after
+            return
+        try:
+            _raise_report_flow_error(error, entry.attempt, label)
+        except ReportDownloadError as e:
+            results[entry.index] = e
+        unfinished.remove(entry)
+
+    downloads = ThreadPoolExecutor(
+        max_workers=download_workers, thread_name_prefix="revnext-batch-download"
+    )
+    # Set when a download finishes, to wake the loop early.
+    wake = threading.Event()
+
+    def start_download(entry: _BatchEntry) -> None:
+        retry = {"policy": policy, "deadline_at": entry.deadline_at}
+        entry.download = downloads.submit(
+            _download_report,
+            client.session,
+            entry.job.service_object,
+            entry.progress.response_url,
+            entry.job.output_path,
+            report_label=entry.job.report_label,
+            **retry,
+        )
+        entry.download.add_done_callback(lambda _: wake.set())
+
+    def finish_download(entry: _BatchEntry) -> None:
+        future, entry.download = entry.download, None
+        try:
+            results[entry.index] = future.result()
+        except (ReportDownloadError, RuntimeError) as e:
+            fail(entry, e)
+            return
+        entry.progress.finish()
+        unfinished.remove(entry)
+        if snapshots is not None and entry.job.key:
+            add_snapshot(snapshots, entry.job, results[entry.index])
+
+    try:
+        while unfinished:
+            if cancel_event.is_set():
+                for entry in unfinished:
+                    if entry.download is not None:
+                        entry.download.cancel()
+                    abandon(entry)
+                    results[entry.index] = ReportCancelledError("Report cancelled.")
+                unfinished.clear()
+                break
+            wake.clear()
+            for entry in list(unfinished):
+                if entry.download is not None and entry.download.done():
+                    finish_download(entry)
+            now = time.monotonic()
+            for entry in list(unfinished):
+                if entry.progress.task_id is not None or entry.submit_after > now:
+                    continue
+                entry.attempt += 1
+                entry.resumed_stage = 0
+                if entry.deadline_at is None:
+                    entry.deadline_at = policy.deadline_at()
+                retry = {"policy": policy, "deadline_at": entry.deadline_at}
+                try:
+                    progress = entry.progress
+                    progress.task_id, progress.body = _submit_report_task(
+                        client.session,
+                        entry.job.service_object,
+                        base_url,
+                        entry.job.get_submit_body,
+                        report_label=entry.job.report_label,
+                        **retry,
+                    )
+                    progress.submitted_at = time.time()
+                    progress.checkpoint()
+                    if entry.job.post_submit_hook:
+                        entry.job.post_submit_hook(client.session)
+                    schedule(entry)
+                except (ReportDownloadError, RuntimeError) as e:
+                    fail(entry, e)
+
+            if not unfinished:
+                break
+            now = time.monotonic()
+            waiting = [e for e in unfinished if e.download is None]
+            due = [
+                e
+                for e in waiting
+                if e.progress.task_id is not None and e.next_poll_at <= now
+            ]
+            if not due:
+                wake_at = min(
+                    (
+                        (
+                            e.next_poll_at
+                            if e.progress.task_id is not None
+                            else e.submit_after
+                        )
+                        for e in waiting
+                    ),
+                    default=now + CANCEL_CHECK_INTERVAL,
+                )
+                timeout = max(0.0, wake_at - now)
+                if len(waiting) < len(unfinished):
+                    # Downloads running: also wake when one finishes.
+                    wake.wait(min(timeout, CANCEL_CHECK_INTERVAL))
+                else:
+                    cancel_event.wait(timeout)
+                continue
+
+            for entry in due:
+                label = entry.job.report_label
+                progress = entry.progress
+                retry = {"policy": policy, "deadline_at": entry.deadline_at}
+                try:
+                    if progress.response_url is None:
+                        done = _poll_report_once(
+                            client.session,
+                            entry.job.service_object,
+                            base_url,
+                            entry.job.activity_tab_id,
+                            progress.task_id,
+                            progress.body,
+                            report_label=label,
+                            **retry,
+                        )
+                        entry.polls += 1
+                        if not done:
+                            if entry.polls >= max_polls:
+                                # May never finish: stop it; the next attempt resubmits.
+                                abandon(entry)
+                                raise RuntimeError("Timed out waiting for report.")
+                            _report_print(
+                                label,
+                                f"Poll {entry.polls}: still generating...{entry.plan.eta_text()}",
+                                "  ",
+                            )
+                            delay = entry.plan.next_delay()
+                            try:
+                                _check_deadline(entry.deadline_at, delay)
+                            except ReportDownloadError:
+                                abandon(entry)
+                                raise
+                            entry.next_poll_at = time.monotonic() + delay
+                            continue
+                        entry.plan.complete()
+                        _report_print(label, "Report generation complete.")
+                        progress.response_url = _load_report_response_url(
+                            client.session,
+                            entry.job.service_object,
+                            base_url,
+                            entry.job.activity_tab_id,
+                            progress.task_id,
+                            progress.body,
+                            report_label=label,
+                            **retry,
+                        )
+                        progress.checkpoint()
+                    start_download(entry)
+                except (ReportDownloadError, RuntimeError) as e:
+                    fail(entry, e)
+    except (KeyboardInterrupt, SystemExit):
+        if journal is None:
+            for entry in unfinished:
+                abandon(entry)
+        raise
+    finally:
+        # A download already running finishes in the background (its result is not used).
+        downloads.shutdown(wait=False, cancel_futures=True)
+
+    if not return_exceptions:
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+    return results
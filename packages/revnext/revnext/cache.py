@@ -0,0 +1,232 @@
+"""
+On-disk cache of downloaded reports.
+Each finished report is copied into the cache directory under its params key (the hash of the
+service object and report parameters, ReportJob.key), with a SQLite index of size, creation and
+last-access times. A later run of the same report within the freshness TTL is served from the
+cache instead of generating it again on the server. Least recently used entries are evicted
+once the cache holds more than max_entries reports or max_bytes.
+StaleReport is what stale-while-revalidate reads return (RevNextClient.run_report_stale): the last
+good copy at once, plus a Future for the fresh one being generated in the background.
+"""
+
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+
+from revnext.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Defaults for CacheSettings: reports stay fresh for 10 minutes; at most 64 reports / 2 GiB kept.
+DEFAULT_TTL = 600
+DEFAULT_MAX_ENTRIES = 64
+DEFAULT_MAX_BYTES = 2 * 1024**3
+
+_INDEX_NAME = "index.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS report_cache (
+    key TEXT PRIMARY KEY,
+    service_object TEXT NOT NULL,
+    report_label TEXT,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+)
+"""
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """One cached report. path is the cached CSV; created_at is when it was downloaded."""
+
+    key: str
+    service_object: str
+    report_label: str | None
+    path: Path
+    size: int
+    created_at: float
+
+    def age(self) -> float:
+        """Seconds since the report was downloaded."""
+        return max(0.0, time.time() - self.created_at)
+
+
+@dataclass(frozen=True)
+class StaleReport:
+    """
+    A report served stale-while-revalidate. result is the last good copy (a Path, or bytes for
+    return_data) and version its download time (time.time()); both are None when nothing was
+    cached yet. refresh is the background regeneration, or None when the copy is within the TTL.
+    Await the fresh copy with fresh(), or asyncio.wrap_future(report.refresh) in an event loop.
+    """
+
+    result: Path | bytes | None
+    version: float | None
+    refresh: "Future[Path | bytes] | None" = None
+
+    @property
+    def stale(self) -> bool:
+        """True when result is older than the cache TTL (or missing) and a refresh is running."""
+        return self.refresh is not None
+
+    def age(self) -> float | None:
+        """Seconds since result was downloaded, or None without a cached copy."""
+        return None if self.version is None else max(0.0, time.time() - self.version)
+
+    def fresh(self, timeout: float | None = None) -> Path | bytes:
+        """
+        The refreshed report, waiting up to timeout seconds for it (result if no refresh was
+        needed). Raises the refresh's error if regenerating the report failed.
+        """
+        if self.refresh is None:
+            return self.result
+        return self.refresh.result(timeout)
+
+
+def _copy_atomic(source: Path, target: Path) -> None:
+    """Copy source to target through a temporary file renamed into place."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        shutil.copyfile(source, tmp)
+        os.replace(tmp, target)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+class ReportCache:
+    """
+    Directory of cached report CSVs with a SQLite index. Thread-safe; one connection shared
+    under a lock. get() only returns entries younger than ttl (or the max_age given);
+    put() stores a report and evicts the least recently used ones beyond max_entries / max_bytes.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.path / _INDEX_NAME), check_same_thread=False
+        )
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(_SCHEMA)
+
+    def _blob_path(self, key: str) -> Path:
+        return self.path / f"{key}.csv"
+
+    def get(self, key: str, max_age: float | None = None) -> CacheEntry | None:
+        """
+        The entry for key if it is younger than max_age seconds (default ttl), else None.
+        A hit marks the entry as recently used.
+        """
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT service_object, report_label, size, created_at"
+                " FROM report_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            entry = CacheEntry(key, row[0], row[1], self._blob_path(key), *row[2:])
+            if not entry.path.exists():
+                self._delete(key)
+                return None
+            if entry.age() > max_age:
+                return None
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE report_cache SET accessed_at = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+        return entry
+
+    def put(
+        self,
+        key: str,
+        content: Path | bytes,
+        *,
+        service_object: str,
+        report_label: str | None = None,
+    ) -> CacheEntry:
+        """Store a downloaded report (a file or its bytes) under key, replacing any older copy."""
+        blob = self._blob_path(key)
+        if isinstance(content, bytes):
+            tmp = blob.with_name(f"{blob.name}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(content)
+            os.replace(tmp, blob)
+        else:
+            _copy_atomic(Path(content), blob)
+        now = time.time()
+        entry = CacheEntry(
+            key, service_object, report_label, blob, blob.stat().st_size, now
+        )
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO report_cache VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, service_object, report_label, entry.size, now, now),
+                )
+            self._evict()
+        return entry
+
+    def load(self, entry: CacheEntry, output_path: Path | None) -> Path | bytes:
+        """
+        The cached report as run_report_job would return it: copied to output_path (atomic
+        rename) and that Path, or the content as bytes when output_path is None.
+        """
+        if output_path is None:
+            return entry.path.read_bytes()
+        _copy_atomic(entry.path, output_path)
+        return output_path
+
+    def _evict(self) -> None:
+        """Drop least recently used entries beyond max_entries / max_bytes (lock held)."""
+        rows = self._conn.execute(
+            "SELECT key, size, report_label FROM report_cache ORDER BY accessed_at DESC"
+        ).fetchall()
+        total = 0
+        for i, (key, size, label) in enumerate(rows):
+            total += size
+            if i >= self.max_entries or total > self.max_bytes:
+                logger.debug("Evicting cached report %s", label or key)
+                self._delete(key)
+
+    def _delete(self, key: str) -> None:
+        with self._conn:
+            self._conn.execute("DELETE FROM report_cache WHERE key = ?", (key,))
+        self._blob_path(key).unlink(missing_ok=True)
+
+    def discard(self, key: str) -> None:
+        """Remove the cached report for key."""
+        with self._lock:
+            self._delete(key)
+
+    def clear(self) -> None:
+        """Remove every cached report."""
+        with self._lock:
+            keys = [
+                row[0] for row in self._conn.execute("SELECT key FROM report_cache")
+            ]
+            for key in keys:
+                self._delete(key)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
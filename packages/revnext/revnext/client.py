@@ -0,0 +1,323 @@
+"""
+Thread-safe client for Revolution Next (*.revolutionnext.com.au).
+Holds the config and one authenticated requests.Session (with its cookies), its connection
+pool sized by config.pool. Every library call sends its service object as a per-request
+x-service-object header, so many worker threads can share one client: one login, one
+connection pool, no repeated TLS handshakes. If the cookie session expires mid-flow, the
+first thread to see the login page logs in again (once, under a lock) and every affected
+request is replayed, so report polling and downloads carry on with the same task. It also keeps the PollHistory of report
+generation times that the report flows use to schedule polls, and the ReportJournal of
+in-flight report tasks (config.journal_path) that lets a restarted process resume them, and the
+ReportCache of finished reports (config.cache) that serves repeat runs without regenerating them;
+run_report_stale() serves the last good copy at once and regenerates the report in the background.
+With config.snapshot_dir, every downloaded report is also kept in a SnapshotStore.
+enquiry_cache is the EnquiryCache shared by the client's part enquiries (config.enquiry_cache_path).
+cancel_reports() stops every report running on the client and cancels its server-side task.
+"""
+
+import math
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import requests
+
+from revnext.cache import CacheEntry, ReportCache, StaleReport
+from revnext.common import ReportJob, _service_headers, run_report_job
+from revnext.config import RevNextConfig
+from revnext.journal import ReportJournal
+from revnext.logger import get_logger
+from revnext.polling import PollHistory
+from revnext.session import (
+    PoolStats,
+    current_cookie,
+    get_or_create_session,
+    get_pool_stats,
+    relogin,
+    request_cookie,
+)
+from revnext.snapshots import SnapshotStore
+
+if TYPE_CHECKING:
+    from revnext.parts.enquiries.cache import EnquiryCache
+
+logger = get_logger(__name__)
+
+# Background threads regenerating reports for run_report_stale.
+REFRESH_WORKERS = 4
+
+
+class RevNextClient:
+    """
+    Shared handle on one RevNext tenant. The session is created lazily on first use (loaded
+    from config.session_path or logged in) and then reused by every thread.
+
+    Example:
+        client = RevNextClient(RevNextConfig.from_env())
+        rows = search_part_general(client.session, client.base_url, "PZQ6160670")
+        path = client.run_report(build_parts_by_bin_job(params, output_path="bin.csv"))
+    """
+
+    def __init__(self, config: RevNextConfig | None = None) -> None:
+        self.config = config or RevNextConfig.from_env()
+        self._session: requests.Session | None = None
+        self._lock = threading.Lock()
+        self._login_lock = threading.Lock()
+        self._journal: ReportJournal | None = None
+        self._cache: ReportCache | None = None
+        self._snapshots: SnapshotStore | None = None
+        self._enquiry_cache: "EnquiryCache | None" = None
+        # Background refreshes for run_report_stale, one per report key at a time.
+        self._refresh_lock = threading.Lock()
+        self._refreshing: dict[str, Future] = {}
+        self._refresh_executor: ThreadPoolExecutor | None = None
+        self.poll_history = PollHistory(self.config.poll_history_path)
+        # Set by cancel_reports(); report flows on this client stop when it is set.
+        self.cancel_event = threading.Event()
+
+    @property
+    def base_url(self) -> str:
+        return self.config.base_url
+
+    @property
+    def session(self) -> requests.Session:
+        """The shared authenticated session (created on first access)."""
+        with self._lock:
+            if self._session is None:
+                session = get_or_create_session(self.config)
+                session.on_session_expired = self._reauthenticate
+                self._session = session
+            return self._session
+
+    @property
+    def journal(self) -> ReportJournal | None:
+        """The report task journal (opened on first access), or None if config.journal_path is None."""
+        with self._lock:
+            if self._journal is None and self.config.journal_path is not None:
+                self._journal = ReportJournal(self.config.journal_path)
+            return self._journal
+
+    @property
+    def cache(self) -> ReportCache | None:
+        """The report cache (opened on first access), or None if config.cache.path is None."""
+        settings = self.config.cache
+        with self._lock:
+            if self._cache is None and settings.path is not None:
+                self._cache = ReportCache(
+                    settings.path,
+                    ttl=settings.ttl,
+                    max_entries=settings.max_entries,
+                    max_bytes=settings.max_bytes,
+                )
+            return self._cache
+
+    @property
+    def snapshots(self) -> SnapshotStore | None:
+        """The report snapshot store (opened on first access), or None if config.snapshot_dir is None."""
+        with self._lock:
+            if self._snapshots is None and self.config.snapshot_dir is not None:
+                self._snapshots = SnapshotStore(
+                    self.config.snapshot_dir,
+                    compression=self.config.snapshot_compression,
+                )
+            return self._snapshots
+
+    @property
+    def enquiry_cache(self) -> "EnquiryCache":
+        """
+        The enquiry cache (created on first access): in memory, over config.enquiry_cache_path
+        on disk when set. Use its search / load methods with client.session and client.base_url.
+        """
+        # Imported here: revnext.parts imports this module.
+        from revnext.parts.enquiries.cache import EnquiryCache
+
+        with self._lock:
+            if self._enquiry_cache is None:
+                self._enquiry_cache = EnquiryCache(self.config.enquiry_cache_path)
+            return self._enquiry_cache
+
+    def _reauthenticate(
+        self, session: requests.Session, response: requests.Response
+    ) -> bool:
+        """
+        on_session_expired callback: log in again unless another thread already did since this
+        request was sent (its cookie is no longer the session's), then ask for a replay.
+        Returns False if the login fails, so the caller sees the login page (SessionExpiredError).
+        """
+        with self._login_lock:
+            if request_cookie(response) != current_cookie(session, response.request):
+                return True
+            logger.warning("RevNext session expired; logging in again.")
+            try:
+                relogin(session, self.config)
+            except (ValueError, requests.RequestException) as e:
+                logger.error("Logging in again failed: %s", e)
+                return False
+        return True
+
+    def pool_stats(self) -> PoolStats:
+        """Connection pool counters (requests, connections opened, reused, idle)."""
+        return get_pool_stats(self.session)
+
+    def post(self, url: str, service_object: str, **kwargs) -> requests.Response:
+        """POST with the given service object as a per-request header."""
+        headers = {**kwargs.pop("headers", {}), **_service_headers(service_object)}
+        return self.session.post(url, headers=headers, **kwargs)
+
+    def get(
+        self, url: str, service_object: str | None = None, **kwargs
+    ) -> requests.Response:
+        """GET, optionally with a per-request service object header."""
+        headers = dict(kwargs.pop("headers", {}))
+        if service_object:
+            headers.update(_service_headers(service_object))
+        return self.session.get(url, headers=headers, **kwargs)
+
+    def run_report(self, job: ReportJob, **flow_options) -> Path | bytes:
+        """
+        Run a ReportJob on the shared session; flow_options as for run_report_job
+        (poll_history, retry_policy, journal, cache, snapshots and cancel_event default to the client's).
+        """
+        flow_options.setdefault("poll_history", self.poll_history)
+        flow_options.setdefault("retry_policy", self.config.retry)
+        flow_options.setdefault("journal", self.journal)
+        flow_options.setdefault("cache", self.cache)
+        flow_options.setdefault("snapshots", self.snapshots)
+        flow_options.setdefault("cancel_event", self.cancel_event)
+        return run_report_job(self.session, job, self.base_url, **flow_options)
+
+    def run_report_stale(
+        self, job: ReportJob, *, max_stale: float | None = None, **flow_options
+    ) -> StaleReport:
+        """
+        Stale-while-revalidate: return the last good copy of job's report from the report cache at
+        once (copied to job.output_path, or bytes), without waiting for the server. If that copy is
+        older than the cache TTL, or there is none yet, the report is regenerated in the background
+        (one refresh per report at a time, however many callers ask) and StaleReport.refresh
+        completes with the fresh copy. Copies older than max_stale seconds are not served.
+        flow_options as for run_report. Raises ValueError without a cache or without job.key.
+        """
+        cache = flow_options.pop("cache", None) or self.cache
+        flow_options.pop("refresh_cache", None)
+        if cache is None or not job.key:
+            raise ValueError(
+                "Stale-while-revalidate needs a report cache (config.cache.path) and a job key."
+            )
+        entry = cache.get(job.key, max_age=math.inf if max_stale is None else max_stale)
+        if entry is not None and entry.age() <= cache.ttl:
+            return self._load_cached(cache, job, entry, refresh=None)
+        refresh = self._refresh_report(job, cache, flow_options)
+        if entry is None:
+            return StaleReport(None, None, refresh)
+        return self._load_cached(cache, job, entry, refresh=refresh)
+
+    def _load_cached(
+        self,
+        cache: ReportCache,
+        job: ReportJob,
+        entry: CacheEntry,
+        refresh: Future | None,
+    ) -> StaleReport:
+        """
+        Copy the newest cached copy to job.output_path under the refresh lock, so a stale copy
+        never overwrites the file a finished refresh has just put there.
+        """
+        with self._refresh_lock:
+            entry = cache.get(job.key, max_age=math.inf) or entry
+            result = cache.load(entry, job.output_path)
+        return StaleReport(result, entry.created_at, refresh)
+
+    def _refresh_report(
+        self, job: ReportJob, cache: ReportCache, flow_options: dict
+    ) -> Future:
+        """The running background refresh for job.key, or a newly started one."""
+        with self._refresh_lock:
+            future = self._refreshing.get(job.key)
+            if future is not None:
+                return future
+            if self._refresh_executor is None:
+                self._refresh_executor = ThreadPoolExecutor(
+                    max_workers=REFRESH_WORKERS, thread_name_prefix="revnext-refresh"
+                )
+            future = self._refresh_executor.submit(
+                self._run_refresh, job, cache, flow_options
+            )
+            self._refreshing[job.key] = future
+        future.add_done_callback(lambda f: self._refresh_done(job, f))
+        return future
+
+    def _run_refresh(
+        self, job: ReportJob, cache: ReportCache, flow_options: dict
+    ) -> Path | bytes:
+        """
+        Regenerate the report into a staging file next to job.output_path (readers keep the stale
+        file meanwhile), cache it, then rename it over job.output_path.
+        """
+        target = job.output_path
+        if target is not None:
+            job = replace(job, output_path=target.with_name(f"{target.name}.refresh"))
+        result = self.run_report(job, cache=cache, refresh_cache=True, **flow_options)
+        if target is None:
+            return result
+        with self._refresh_lock:
+            os.replace(result, target)
+        return target
+
+    def _refresh_done(self, job: ReportJob, future: Future) -> None:
+        with self._refresh_lock:
+            if self._refreshing.get(job.key) is future:
+                del self._refreshing[job.key]
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning(
+                "Background refresh of %s failed: %s",
+                job.report_label or job.service_object,
+                future.exception(),
+            )
+
+    def cancel_reports(self) -> None:
+        """
+        Stop every report running on this client (any thread or event loop): each cancels its
+        server-side task and fails with ReportCancelledError. Later reports fail at once until
+        reset_cancel() is called.
+        """
+        self.cancel_event.set()
+
+    def reset_cancel(self) -> None:
+        """Allow reports to run again after cancel_reports()."""
+        self.cancel_event.clear()
+
+    def close(self) -> None:
+        """
+        Close the session's pooled connections, the journal, the report cache index, the
+        snapshot manifest and the enquiry cache store.
+        Background refreshes not yet started are dropped.
+        """
+        with self._refresh_lock:
+            if self._refresh_executor is not None:
+                self._refresh_executor.shutdown(wait=False, cancel_futures=True)
+                self._refresh_executor = None
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            if self._cache is not None:
+                self._cache.close()
+                self._cache = None
+            if self._snapshots is not None:
+                self._snapshots.close()
+                self._snapshots = None
+            if self._enquiry_cache is not None:
+                self._enquiry_cache.close()
+                self._enquiry_cache = None
+
+    def __enter__(self) -> "RevNextClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,22 @@
+"""
+Report column names shared by the report reader, delta, columnar output, part index and bulk
+enquiry: header normalisation and the header names of the franchise and part number columns.
+"""
+
+from typing import Iterable, Sequence
+
+# Header names (compared case-insensitively, ignoring spaces, "_", "." and "#") tried in order
+# to find the key columns of a report.
+FRANCHISE_COLUMNS = ("franchise", "franchisecode", "frnid", "frn")
+PART_COLUMNS = ("partnumber", "partno", "part", "prtid", "partcode", "partnum")
+
+
+def normalise_header(name: str) -> str:
+    """A header name lower-cased, without spaces, "_", "." and "#" ("Part No." -> "partno")."""
+    return "".join(c for c in name.lower() if c not in " _.#")
+
+
+def find_column(header: Sequence[str], candidates: Iterable[str]) -> str | None:
+    """The first header column whose normalised name is one of candidates (in their order)."""
+    by_name = {normalise_header(name): name for name in header}
+    return next((by_name[c] for c in candidates if c in by_name), None)
@@ -3,21 +3,42 @@ Shared utilities for Revolution Next (*.revolutionnext.com.au) report downloads.
 Session creation (auto-login with persistence) and generic submit → poll → loadData → download flow.
 """
 
+import glob
+import hashlib
 import json
+import os
+import sqlite3
+import threading
 import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Callable
+from typing import Callable, NoReturn
 
 import requests
 
+from revnext.cache import ReportCache
 from revnext.config import RevNextConfig
+from revnext.journal import JournalEntry, ReportJournal
 from revnext.logger import get_logger
+from revnext.polling import PollHistory, PollPlan, history_key
+from revnext.retry import RetryPolicy
+from revnext.snapshots import SnapshotStore
 
 logger = get_logger(__name__)
 
 # Minimum response length to consider as valid JSON (e.g. "{}").
 MIN_JSON_BODY_LENGTH = 2
 
+# Bytes read per chunk when streaming a report download to disk.
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Bytes buffered from the start of a streamed download to check for an HTML error page.
+HTML_SNIFF_BYTES = 512
+
+# Endpoint used to stop a submitted report task, and how long to wait for it (seconds).
+CANCEL_TASK_PATH = "next/rest/si/static/cancelActivityTask"
+CANCEL_TIMEOUT = 10
+
 
 class ReportDownloadError(RuntimeError):
     """
@@ -29,6 +50,40 @@ class ReportDownloadError(RuntimeError):
     pass
 
 
+class SessionExpiredError(ReportDownloadError):
+    """
+    Raised when RevNext answers with its login page (or HTTP 401): the session has expired.
+    Not retried on the same session, since every retry would get the login page again.
+    """
+
+    pass
+
+
+class ReportRejectedError(ReportDownloadError):
+    """
+    Raised when the server rejects a request outright (HTTP 4xx, or submitActivityTask
+    validation errors). Not retried: sending the same request again cannot succeed.
+    """
+
+    pass
+
+
+class DeadlineExceededError(ReportDownloadError):
+    """Raised when a report runs past RetryPolicy.deadline."""
+
+    pass
+
+
+class ReportCancelledError(ReportDownloadError):
+    """Raised when a report is stopped through its cancel_event (e.g. RevNextClient.cancel_reports)."""
+
+    pass
+
+
+# HTTP 4xx statuses that are still worth retrying (request timeout, too early, rate limited).
+RETRYABLE_CLIENT_STATUSES = frozenset({408, 425, 429})
+
+
 def _looks_like_html(content: bytes) -> bool:
     """True if the response body looks like HTML (error page, login redirect, etc.)."""
     if not content or len(content) < 2:
@@ -41,6 +96,69 @@ def _looks_like_html(content: bytes) -> bool:
     return text.startswith("<!") or "<html" in text[:50]
 
 
+def _is_login_page(html: str) -> bool:
+    """True if the response body looks like the login form."""
+    return "sign in to REVOLUTIONnext" in html or 'name="j_username"' in html
+
+
+def _reject_html(content: bytes) -> None:
+    """
+    Raise for an HTML body where JSON or CSV was expected: SessionExpiredError for the login
+    page, ValueError (retried) for anything else, e.g. a 502/503 error page.
+    """
+    if not _looks_like_html(content):
+        return
+    if _is_login_page(content.decode("utf-8", errors="replace")):
+        raise SessionExpiredError(
+            "Session expired: RevNext returned its login page; log in again."
+        )
+    raise ValueError(
+        "Response body looks like HTML (error page, login redirect, or 502/503 page)"
+    )
+
+
+def _raise_for_status(response: requests.Response) -> None:
+    """
+    raise_for_status with classification: 401 (or a 403 with the login page) raises
+    SessionExpiredError, other 4xx (except RETRYABLE_CLIENT_STATUSES) raise ReportRejectedError;
+    5xx raise HTTPError, which is retried.
+    """
+    status = response.status_code
+    if status == 401 or (status == 403 and _is_login_page(response.text)):
+        raise SessionExpiredError(
+            f"Session expired: HTTP {status} {response.reason} for {response.url}"
+        )
+    if 400 <= status < 500 and status not in RETRYABLE_CLIENT_STATUSES:
+        raise ReportRejectedError(
+            f"Request rejected: HTTP {status} {response.reason} for {response.url}"
+        )
+    response.raise_for_status()
+
+
+def _is_retryable(error: BaseException) -> bool:
+    """False for failures a retry cannot fix: expired session, rejected request, deadline passed, cancelled."""
+    return not isinstance(
+        error,
+        (
+            SessionExpiredError,
+            ReportRejectedError,
+            DeadlineExceededError,
+            ReportCancelledError,
+        ),
+    )
+
+
+def _retry_after(error: BaseException) -> float | None:
+    """Seconds from a Retry-After header on a 429/503 response, if the server sent one."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
+
+
 def _common_headers(base_url: str) -> dict:
     """Build common request headers for the given base URL."""
     return {
@@ -59,13 +177,22 @@ def _common_headers(base_url: str) -> dict:
     }
 
 
+def _service_headers(service_object: str) -> dict:
+    """
+    Per-request header naming the RevNext service object. Sent with each request instead of being
+    set on session.headers, so one session can be shared by threads calling different services.
+    """
+    return {"x-service-object": service_object}
+
+
 def _parse_json_response(
     response: requests.Response,
     min_length: int = MIN_JSON_BODY_LENGTH,
 ) -> dict:
     """
     Parse response body as JSON. Raises ValueError if body is empty, too small,
-    looks like HTML, or is invalid JSON. Used by retry logic to detect transient failures.
+    looks like HTML, or is invalid JSON, and SessionExpiredError for the login page.
+    Used by retry logic to detect transient failures.
     """
     content = response.content
     if content is None or len(content) < min_length:
@@ -73,59 +200,96 @@ def _parse_json_response(
             f"Response body empty or too small (length {len(content) if content else 0}, "
             f"expected at least {min_length} for valid JSON)"
         )
-    if _looks_like_html(content):
-        raise ValueError(
-            "Response body looks like HTML (error page, login redirect, or 502/503 page)"
-        )
+    _reject_html(content)
     try:
         return response.json()
     except json.JSONDecodeError as e:
         raise ValueError(f"Response is not valid JSON: {e}") from e
 
 
+def _log_retry(
+    report_label: str | None,
+    step_name: str,
+    attempt: int,
+    max_attempts: int,
+    reason: str,
+    retry_delay: float,
+) -> None:
+    prefix = f"[{report_label}] " if report_label else ""
+    logger.warning(
+        "%s%s attempt %d of %d failed (%s); retrying in %.1fs.",
+        prefix,
+        step_name,
+        attempt,
+        max_attempts,
+        reason,
+        retry_delay,
+    )
+
+
+def _wait_before_retry(
+    policy: RetryPolicy,
+    attempt: int,
+    error: BaseException,
+    *,
+    deadline_at: float | None,
+    report_label: str | None,
+    step_name: str,
+) -> bool:
+    """
+    After failed request attempt number attempt: log, sleep the backoff delay (or the server's
+    Retry-After, capped at max_delay) and return True. Return False without sleeping when the
+    attempts are used up or the delay would run past deadline_at.
+    """
+    if attempt >= policy.max_attempts:
+        return False
+    delay = _retry_after(error)
+    delay = min(delay, policy.max_delay) if delay is not None else policy.delay(attempt)
+    if deadline_at is not None and time.monotonic() + delay > deadline_at:
+        return False
+    _log_retry(report_label, step_name, attempt, policy.max_attempts, str(error), delay)
+    time.sleep(delay)
+    return True
+
+
 def _post_json_with_retry(
     session: requests.Session,
     url: str,
     *,
-    max_attempts: int,
-    retry_delay: float,
+    policy: RetryPolicy,
     report_label: str | None,
     step_name: str,
+    deadline_at: float | None = None,
     **kwargs,
 ) -> dict:
     """
-    POST and parse JSON with retries. On empty/HTML/JSONDecodeError, log and retry.
-    After last attempt, raise ReportDownloadError.
+    POST and parse JSON, retrying per policy.for_step(step_name) on empty/HTML/invalid JSON,
+    connection errors, 5xx and retryable 4xx. The login page and other 4xx fail at once.
+    After the last attempt, raise ReportDownloadError.
     """
+    policy = policy.for_step(step_name)
     last_error = None
-    for attempt in range(1, max_attempts + 1):
+    attempt = 0
+    while True:
+        attempt += 1
         try:
             r = session.post(url, **kwargs)
-            r.raise_for_status()
+            _raise_for_status(r)
             return _parse_json_response(r)
-        except (ValueError, json.JSONDecodeError) as e:
-            last_error = e
-            reason = str(e)
-        except requests.RequestException as e:
+        except (ValueError, requests.RequestException) as e:
             last_error = e
-            reason = str(e)
-        if attempt < max_attempts:
-            prefix = f"[{report_label}] " if report_label else ""
-            logger.warning(
-                "%s%s attempt %d of %d failed (%s); retrying in %.1fs.",
-                prefix,
-                step_name,
-                attempt,
-                max_attempts,
-                reason,
-                retry_delay,
-            )
-            time.sleep(retry_delay)
-        else:
+        if not _wait_before_retry(
+            policy,
+            attempt,
+            last_error,
+            deadline_at=deadline_at,
+            report_label=report_label,
+            step_name=step_name,
+        ):
             break
     label_suffix = f" [{report_label}]" if report_label else ""
     raise ReportDownloadError(
-        f"Report API returned invalid or non-JSON response after {max_attempts} attempt(s){label_suffix}: {last_error}"
+        f"Report API returned invalid or non-JSON response after {attempt} attempt(s){label_suffix}: {last_error}"
     ) from last_error
 
 
@@ -133,54 +297,212 @@ def _get_content_with_retry(
     session: requests.Session,
     url: str,
     *,
-    max_attempts: int,
-    retry_delay: float,
+    policy: RetryPolicy,
     report_label: str | None,
     step_name: str,
+    deadline_at: float | None = None,
     min_content_length: int = 1,
+    headers: dict | None = None,
 ) -> bytes:
     """
-    GET report content (e.g. CSV) with retries. Retries when body is empty or looks like HTML.
-    After last attempt, raise ReportDownloadError.
+    GET report content (e.g. CSV), retrying per policy.for_step(step_name) when the body is
+    empty or HTML or the request fails transiently. After the last attempt, raise ReportDownloadError.
     """
+    policy = policy.for_step(step_name)
     last_error = None
-    for attempt in range(1, max_attempts + 1):
+    attempt = 0
+    while True:
+        attempt += 1
         try:
-            r = session.get(url)
-            r.raise_for_status()
+            r = session.get(url, headers=headers)
+            _raise_for_status(r)
             content = r.content or b""
             if len(content) < min_content_length:
                 raise ValueError(
                     f"Response body empty or too small (length {len(content)})"
                 )
-            if _looks_like_html(content):
-                raise ValueError("Response body looks like HTML (error/redirect page)")
+            _reject_html(content)
             return content
         except (ValueError, requests.RequestException) as e:
             last_error = e
-            reason = str(e)
-        if attempt < max_attempts:
-            prefix = f"[{report_label}] " if report_label else ""
-            logger.warning(
-                "%s%s attempt %d of %d failed (%s); retrying in %.1fs.",
-                prefix,
-                step_name,
-                attempt,
-                max_attempts,
-                reason,
-                retry_delay,
-            )
-            time.sleep(retry_delay)
-        else:
+        if not _wait_before_retry(
+            policy,
+            attempt,
+            last_error,
+            deadline_at=deadline_at,
+            report_label=report_label,
+            step_name=step_name,
+        ):
             break
     label_suffix = f" [{report_label}]" if report_label else ""
     raise ReportDownloadError(
-        f"Report download returned invalid or empty content after {max_attempts} attempt(s){label_suffix}: {last_error}"
+        f"Report download returned invalid or empty content after {attempt} attempt(s){label_suffix}: {last_error}"
+    ) from last_error
+
+
+def _write_stream_to_file(
+    response: requests.Response,
+    part_path: Path,
+    *,
+    offset: int = 0,
+    min_content_length: int = 1,
+    chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+) -> int:
+    """
+    Write a streamed response body to part_path chunk by chunk, then flush and fsync.
+    offset > 0 appends a ranged (206) response to the bytes already in part_path.
+    For a fresh download only the first HTML_SNIFF_BYTES are buffered, to reject HTML
+    error/login pages before anything is written. Returns the number of bytes written;
+    raises ValueError on HTML or an empty body, SessionExpiredError on the login page.
+    """
+    head = b"" if offset == 0 else None
+    written = 0
+    with open(part_path, "ab" if offset else "wb") as f:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if not chunk:
+                continue
+            if head is not None:
+                head += chunk
+                if len(head) < HTML_SNIFF_BYTES:
+                    continue
+                _reject_html(head)
+                chunk, head = head, None
+            f.write(chunk)
+            written += len(chunk)
+        if head is not None:
+            if len(head) < min_content_length:
+                raise ValueError(
+                    f"Response body empty or too small (length {len(head)})"
+                )
+            _reject_html(head)
+            f.write(head)
+            written += len(head)
+        f.flush()
+        os.fsync(f.fileno())
+    return written
+
+
+def _part_path_for(output_path: Path, url: str) -> Path:
+    """
+    Partial-download file for output_path. Named after the download URL so a partial file is
+    only ever resumed against the report it came from.
+    """
+    url_hash = hashlib.sha1(url.encode("utf-8")).hexdigest()[:12]
+    return output_path.with_name(f"{output_path.name}.{url_hash}.part")
+
+
+def _remove_stale_part_files(output_path: Path, keep: Path) -> None:
+    """Delete partial downloads for output_path left over from other (older) report tasks."""
+    pattern = glob.escape(output_path.name) + ".*.part"
+    for stale in output_path.parent.glob(pattern):
+        if stale != keep:
+            stale.unlink(missing_ok=True)
+
+
+def _content_range_start(response: requests.Response) -> int | None:
+    """Start offset from a 206 response's Content-Range ("bytes 100-199/200"), or None."""
+    value = response.headers.get("Content-Range", "")
+    if not value.startswith("bytes "):
+        return None
+    try:
+        return int(value[len("bytes ") :].split("-", 1)[0])
+    except ValueError:
+        return None
+
+
+def _open_download(
+    session: requests.Session,
+    url: str,
+    part_path: Path,
+    headers: dict | None,
+) -> tuple[requests.Response, int]:
+    """
+    Start a streamed GET for url. If part_path already holds bytes, ask for the rest with a
+    Range header. Returns (response, offset): offset is where the response body starts, or 0
+    when the server ignored or refused the range and sent the whole file.
+    """
+    offset = part_path.stat().st_size if part_path.exists() else 0
+    request_headers = dict(headers or {})
+    if offset:
+        request_headers["Range"] = f"bytes={offset}-"
+    r = session.get(url, headers=request_headers, stream=True)
+    if offset and r.status_code == 416:
+        # Range not satisfiable: the partial file is unusable; start again.
+        r.close()
+        part_path.unlink(missing_ok=True)
+        return _open_download(session, url, part_path, headers)
+    try:
+        _raise_for_status(r)
+    except (ReportDownloadError, requests.HTTPError):
+        r.close()
+        raise
+    if offset and (r.status_code != 206 or _content_range_start(r) != offset):
+        offset = 0
+    return r, offset
+
+
+def _stream_to_file_with_retry(
+    session: requests.Session,
+    url: str,
+    output_path: Path,
+    *,
+    policy: RetryPolicy,
+    report_label: str | None,
+    step_name: str,
+    deadline_at: float | None = None,
+    headers: dict | None = None,
+) -> Path:
+    """
+    GET report content with stream=True and write it straight to disk: chunks go to a
+    ".part" file next to output_path, which is fsynced and atomically renamed to output_path,
+    so memory use stays flat and output_path never holds a partial file.
+    If the connection drops, the partial file is kept and the next attempt (or the next call
+    for the same URL) resumes it with an HTTP Range request, falling back to a full GET when
+    the server does not honour the range. Retries follow policy.for_step(step_name); after the
+    last attempt, raise ReportDownloadError.
+    """
+    policy = policy.for_step(step_name)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    part_path = _part_path_for(output_path, url)
+    _remove_stale_part_files(output_path, keep=part_path)
+    last_error = None
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            r, offset = _open_download(session, url, part_path, headers)
+            with r:
+                if offset:
+                    _report_print(report_label, f"Resuming download at byte {offset}")
+                _write_stream_to_file(r, part_path, offset=offset)
+            os.replace(part_path, output_path)
+            return output_path
+        except ValueError as e:
+            # HTML or empty body: nothing worth resuming.
+            last_error = e
+            part_path.unlink(missing_ok=True)
+        except requests.RequestException as e:
+            last_error = e
+        except SessionExpiredError:
+            part_path.unlink(missing_ok=True)
+            raise
+        if not _wait_before_retry(
+            policy,
+            attempt,
+            last_error,
+            deadline_at=deadline_at,
+            report_label=report_label,
+            step_name=step_name,
+        ):
+            break
+    label_suffix = f" [{report_label}]" if report_label else ""
+    raise ReportDownloadError(
+        f"Report download returned invalid or empty content after {attempt} attempt(s){label_suffix}: {last_error}"
     ) from last_error
 
 
 def get_or_create_session(
-    config: RevNextConfig, service_object: str
+    config: RevNextConfig, service_object: str | None = None
 ) -> requests.Session:
     """
     Return an authenticated session: load from config.session_path if present and valid,
@@ -243,29 +565,253 @@ def _submit_errors_message(response_data: dict) -> str:
     return "; ".join(parts) if parts else "Unknown error"
 
 
-def _run_report_flow_once(
+def _report_print(report_label: str | None, message: str, indent: str = "") -> None:
+    """Print a progress message, prefixed with the report label when set."""
+    if report_label:
+        print(f"{indent}[{report_label}] {message}")
+    else:
+        print(f"{indent}{message}")
+
+
+def _user_context(body: dict) -> dict:
+    """Company/division/department user context taken from a submit body."""
+    return {
+        "_userContext_vg_coid": body.get("_userContext_vg_coid", "03"),
+        "_userContext_vg_divid": body.get("_userContext_vg_divid", "1"),
+        "_userContext_vg_dftdpt": body.get("_userContext_vg_dftdpt", "570"),
+    }
+
+
+@dataclass
+class ReportJob:
+    """
+    One report to run through the submit → poll → loadData → download flow.
+    Report modules build these (e.g. build_parts_price_list_job) so several reports
+    can be handed to a single engine (run_report_job, run_reports_async).
+    output_path None means the report content is returned as bytes. key (params_key of the
+    report parameters) lets a ReportJournal resume the job's task after a restart; params (the
+    parameters as a dict) are recorded with snapshots of the report.
+    """
+
+    service_object: str
+    activity_tab_id: str
+    get_submit_body: Callable[[], dict]
+    output_path: Path | None = None
+    post_submit_hook: Callable[[requests.Session], None] | None = None
+    report_label: str | None = None
+    # Stable identity of the report's parameters (revnext.journal.params_key); enables journaling.
+    key: str | None = None
+    # The report parameters (dataclasses.asdict of the params object), for SnapshotStore manifests.
+    params: dict | None = None
+
+
+@dataclass
+class _ReportProgress:
+    """
+    How far a report has got, kept across full attempts so a retry resumes instead of
+    resubmitting: with response_url set only the download is redone (resuming its partial
+    file); with task_id set polling continues on the same server task.
+    With a journal and key, every step is also written to the ReportJournal, so a restarted
+    process can resume the same server task (see start).
+    """
+
+    task_id: str | None = None
+    body: dict | None = None
+    submitted_at: float | None = None
+    response_url: str | None = None
+    journal: ReportJournal | None = None
+    key: str | None = None
+    service_object: str = ""
+    report_label: str | None = None
+    output_path: Path | None = None
+
+    @classmethod
+    def start(
+        cls,
+        service_object: str,
+        *,
+        journal: ReportJournal | None = None,
+        key: str | None = None,
+        report_label: str | None = None,
+        output_path: Path | None = None,
+    ) -> "_ReportProgress":
+        """Progress for a new report run, picking up its journaled task when there is one."""
+        progress = cls(
+            journal=journal if key else None,
+            key=key,
+            service_object=service_object,
+            report_label=report_label,
+            output_path=output_path,
+        )
+        entry = progress.journal.get(key) if progress.journal else None
+        if entry is not None:
+            progress.task_id = entry.task_id
+            progress.body = entry.body
+            progress.submitted_at = entry.submitted_at
+            progress.response_url = entry.response_url
+            _report_print(
+                report_label,
+                f"Found task {entry.task_id} from an earlier run ({entry.step})",
+            )
+        return progress
+
+    @classmethod
+    def for_job(
+        cls, job: ReportJob, journal: ReportJournal | None
+    ) -> "_ReportProgress":
+        return cls.start(
+            job.service_object,
+            journal=journal,
+            key=job.key,
+            report_label=job.report_label,
+            output_path=job.output_path,
+        )
+
+    def checkpoint(self) -> None:
+        """Write the step reached to the journal (no-op without one)."""
+        if self.journal is None or self.task_id is None:
+            return
+        self.journal.save(
+            JournalEntry(
+                key=self.key,
+                service_object=self.service_object,
+                report_label=self.report_label,
+                task_id=self.task_id,
+                body=self.body or {},
+                submitted_at=self.submitted_at or time.time(),
+                step="ready" if self.response_url else "submitted",
+                response_url=self.response_url,
+                output_path=str(self.output_path) if self.output_path else None,
+            )
+        )
+
+    def finish(self) -> None:
+        """The report is saved: drop it from the journal."""
+        if self.journal is not None:
+            self.journal.discard(self.key)
+
+    @property
+    def stage(self) -> int:
+        """0 = nothing submitted, 1 = task submitted, 2 = download URL known."""
+        if self.response_url:
+            return 2
+        return 1 if self.task_id else 0
+
+    def reset(self) -> None:
+        self.task_id = None
+        self.body = None
+        self.submitted_at = None
+        self.response_url = None
+        self.finish()
+
+
+def cancel_report_task(
     session: requests.Session,
     service_object: str,
-    activity_tab_id: str,
-    get_submit_body: Callable[[], dict],
     base_url: str,
-    output_path: Path | None = None,
-    post_submit_hook: Callable[[requests.Session], None] | None = None,
-    max_polls: int = 60,
-    poll_interval: float = 2,
+    activity_tab_id: str,
+    task_id: str,
+    body: dict | None = None,
+    *,
     report_label: str | None = None,
-    max_retries: int = 3,
-    retry_delay: float = 5,
-) -> Path | bytes:
+) -> bool:
     """
-    Single attempt: submit report task, poll until ready, loadData for download URL, then download CSV.
-    On submit: if response has ERROR, raises; if only WARNING and not success, retries once with stopOnWarning=False.
-    Optionally call post_submit_hook(session) after submit (e.g. onChoose_btn_closesubmit).
-    If output_path is set: save content to file and return the Path.
-    If output_path is None: return the report content as bytes (caller can save or load into pandas).
-    report_label: optional short label (e.g. "Parts Price List - 130") included in poll/complete messages.
-    max_retries: number of attempts per API request when response is empty, HTML, or invalid JSON (default 3).
-    retry_delay: seconds to wait between retries (default 5). Raises ReportDownloadError after last attempt.
+    Ask the server to stop a submitted report task (cancelActivityTask), so an abandoned report does
+    not keep generating next to its replacement. Best effort: one attempt with a short timeout;
+    failures are logged, never raised, since this runs on timeout, error and shutdown paths.
+    Returns True if the server accepted the request.
+    """
+    url = f"{base_url}/{CANCEL_TASK_PATH}"
+    cancel_body = {
+        **_user_context(body or {}),
+        "activityTabId": activity_tab_id,
+        "taskID": task_id,
+        "uiType": "ISC",
+    }
+    try:
+        r = session.post(
+            url,
+            json=cancel_body,
+            headers=_service_headers(service_object),
+            timeout=CANCEL_TIMEOUT,
+        )
+        r.raise_for_status()
+    except requests.RequestException as e:
+        prefix = f"[{report_label}] " if report_label else ""
+        logger.warning("%sCould not cancel task %s: %s", prefix, task_id, e)
+        return False
+    _report_print(report_label, f"Cancelled task {task_id}")
+    return True
+
+
+def _abandon_task(
+    session: requests.Session,
+    service_object: str,
+    base_url: str,
+    activity_tab_id: str,
+    progress: _ReportProgress,
+) -> None:
+    """Cancel progress's task if it is still generating on the server, then forget it."""
+    if progress.task_id and not progress.response_url:
+        cancel_report_task(
+            session,
+            service_object,
+            base_url,
+            activity_tab_id,
+            progress.task_id,
+            progress.body,
+            report_label=progress.report_label,
+        )
+    progress.reset()
+
+
+def _check_cancelled(cancel_event: threading.Event | None) -> None:
+    """Raise ReportCancelledError if cancel_event is set."""
+    if cancel_event is not None and cancel_event.is_set():
+        raise ReportCancelledError("Report cancelled.")
+
+
+def _wait_for_next_poll(delay: float, cancel_event: threading.Event | None) -> None:
+    """Sleep delay seconds; raise ReportCancelledError as soon as cancel_event is set."""
+    if cancel_event is None:
+        time.sleep(delay)
+    else:
+        cancel_event.wait(delay)
+        _check_cancelled(cancel_event)
+
+
+def _poll_plan(
+    service_object: str,
+    progress: _ReportProgress,
+    poll_history: PollHistory | None,
+    *,
+    poll_interval: float,
+    max_poll_interval: float,
+) -> PollPlan:
+    """Adaptive poll schedule for a submitted task, keyed by service object and department."""
+    return PollPlan(
+        poll_history,
+        history_key(service_object, progress.body or {}),
+        progress.submitted_at or time.time(),
+        poll_interval=poll_interval,
+        max_poll_interval=max_poll_interval,
+    )
+
+
+def _submit_report_task(
+    session: requests.Session,
+    service_object: str,
+    base_url: str,
+    get_submit_body: Callable[[], dict],
+    *,
+    policy: RetryPolicy,
+    deadline_at: float | None,
+    report_label: str | None,
+) -> tuple[str, dict]:
+    """
+    Submit the report task and return (task_id, submitted body).
+    If response has ERROR, raises ReportRejectedError; if only WARNING and not success, retries once
+    with stopOnWarning=False.
     """
     submit_url = f"{base_url}/next/rest/si/static/submitActivityTask"
     body = get_submit_body()
@@ -273,8 +819,9 @@ def _run_report_flow_once(
         session,
         submit_url,
         json=body,
-        max_attempts=max_retries,
-        retry_delay=retry_delay,
+        headers=_service_headers(service_object),
+        policy=policy,
+        deadline_at=deadline_at,
         report_label=report_label,
         step_name="submitActivityTask",
     )
@@ -282,7 +829,7 @@ def _run_report_flow_once(
     if not submit_data.get("submittedSuccess"):
         has_error, warning_only = _has_submit_errors(submit_data)
         if has_error:
-            raise RuntimeError(
+            raise ReportRejectedError(
                 f"submitActivityTask failed: {_submit_errors_message(submit_data)}"
             )
         if warning_only:
@@ -292,13 +839,14 @@ def _run_report_flow_once(
                 session,
                 submit_url,
                 json=body,
-                max_attempts=max_retries,
-                retry_delay=retry_delay,
+                headers=_service_headers(service_object),
+                policy=policy,
+                deadline_at=deadline_at,
                 report_label=report_label,
-                step_name="submitActivityTask (warnings retry)",
+                step_name="submitActivityTask",
             )
             if not submit_data.get("submittedSuccess"):
-                raise RuntimeError(
+                raise ReportRejectedError(
                     f"submitActivityTask failed after retry (warnings): {_submit_errors_message(submit_data)}"
                 )
         else:
@@ -309,53 +857,58 @@ def _run_report_flow_once(
     task_id = extract_task_id(submit_data)
     if not task_id:
         raise RuntimeError("Could not get taskID from submit response.")
-    if report_label:
-        print(f"[{report_label}] Task submitted: {task_id}")
-    else:
-        print(f"Task submitted: {task_id}")
-
-    if post_submit_hook:
-        post_submit_hook(session)
+    _report_print(report_label, f"Task submitted: {task_id}")
+    return task_id, body
 
-    coid = body.get("_userContext_vg_coid", "03")
-    divid = body.get("_userContext_vg_divid", "1")
-    dftdpt = body.get("_userContext_vg_dftdpt", "570")
 
+def _poll_report_once(
+    session: requests.Session,
+    service_object: str,
+    base_url: str,
+    activity_tab_id: str,
+    task_id: str,
+    body: dict,
+    *,
+    policy: RetryPolicy,
+    deadline_at: float | None,
+    report_label: str | None,
+) -> bool:
+    """Send one autoPollResponse request for task_id. True when the report is ready."""
     poll_url = f"{base_url}/next/rest/si/presenter/autoPollResponse"
     poll_body = {
-        "_userContext_vg_coid": coid,
-        "_userContext_vg_divid": divid,
-        "_userContext_vg_dftdpt": dftdpt,
+        **_user_context(body),
         "activityTabId": activity_tab_id,
         "ctrlProp": [
             {"name": "ttActivityTask.taskID", "prop": "SCREENVALUE", "value": task_id}
         ],
         "uiType": "ISC",
     }
-    for i in range(max_polls):
-        time.sleep(poll_interval)
-        poll_data = _post_json_with_retry(
-            session,
-            poll_url,
-            json=poll_body,
-            max_attempts=max_retries,
-            retry_delay=retry_delay,
-            report_label=report_label,
-            step_name="poll",
-        )
-        if is_poll_done(poll_data):
-            msg = "Report generation complete."
-            if report_label:
-                msg = f"[{report_label}] {msg}"
-            print(msg)
-            break
-        msg = f"  Poll {i + 1}: still generating..."
-        if report_label:
-            msg = f"  [{report_label}] Poll {i + 1}: still generating..."
-        print(msg)
-    else:
-        raise RuntimeError("Timed out waiting for report.")
+    poll_data = _post_json_with_retry(
+        session,
+        poll_url,
+        json=poll_body,
+        headers=_service_headers(service_object),
+        policy=policy,
+        deadline_at=deadline_at,
+        report_label=report_label,
+        step_name="poll",
+    )
+    return is_poll_done(poll_data)
+
 
+def _load_report_response_url(
+    session: requests.Session,
+    service_object: str,
+    base_url: str,
+    activity_tab_id: str,
+    task_id: str,
+    body: dict,
+    *,
+    policy: RetryPolicy,
+    deadline_at: float | None,
+    report_label: str | None,
+) -> str:
+    """Call loadData for a finished task and return the absolute download URL."""
     load_url = f"{base_url}/next/rest/si/static/loadData"
     load_body = {
         "taskID": task_id,
@@ -366,9 +919,7 @@ def _run_report_flow_once(
         "activityType": "dummy",
         "fluidService": "dummy",
         "uiType": "ISC",
-        "_userContext_vg_coid": coid,
-        "_userContext_vg_divid": divid,
-        "_userContext_vg_dftdpt": dftdpt,
+        **_user_context(body),
         "activityTabId": activity_tab_id,
         "loadMode": "EDIT",
         "loadRowid": "dummy",
@@ -377,8 +928,9 @@ def _run_report_flow_once(
         session,
         load_url,
         json=load_body,
-        max_attempts=max_retries,
-        retry_delay=retry_delay,
+        headers=_service_headers(service_object),
+        policy=policy,
+        deadline_at=deadline_at,
         report_label=report_label,
         step_name="loadData",
     )
@@ -389,31 +941,39 @@ def _run_report_flow_once(
 
     if not response_url.startswith("http"):
         response_url = f"{base_url}/next/{response_url.lstrip('/')}"
-    if report_label:
-        print(f"[{report_label}] Download URL: {response_url}")
-    else:
-        print(f"Download URL: {response_url}")
+    _report_print(report_label, f"Download URL: {response_url}")
+    return response_url
 
-    content = _get_content_with_retry(
-        session,
-        response_url,
-        max_attempts=max_retries,
-        retry_delay=retry_delay,
-        report_label=report_label,
-        step_name="download",
-    )
+
+def _download_report(
+    session: requests.Session,
+    service_object: str,
+    response_url: str,
+    output_path: Path | None,
+    *,
+    policy: RetryPolicy,
+    deadline_at: float | None,
+    report_label: str | None,
+) -> Path | bytes:
+    """
+    Download the report CSV. Stream it to output_path (atomic rename) and return the Path,
+    or return bytes when output_path is None.
+    """
+    retry = {
+        "policy": policy,
+        "deadline_at": deadline_at,
+        "report_label": report_label,
+        "step_name": "download",
+        "headers": _service_headers(service_object),
+    }
     if output_path is None:
-        return content
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_bytes(content)
-    if report_label:
-        print(f"[{report_label}] Saved: {output_path}")
-    else:
-        print(f"Saved: {output_path}")
+        return _get_content_with_retry(session, response_url, **retry)
+    _stream_to_file_with_retry(session, response_url, output_path, **retry)
+    _report_print(report_label, f"Saved: {output_path}")
     return output_path
 
 
-def run_report_flow(
+def _run_report_flow_once(
     session: requests.Session,
     service_object: str,
     activity_tab_id: str,
@@ -424,50 +984,330 @@ def run_report_flow(
     max_polls: int = 60,
     poll_interval: float = 2,
     report_label: str | None = None,
-    max_retries: int = 3,
-    retry_delay: float = 5,
-    max_report_attempts: int = 2,
-    report_retry_delay: float = 30,
+    retry_policy: RetryPolicy | None = None,
+    deadline_at: float | None = None,
+    progress: _ReportProgress | None = None,
+    poll_history: PollHistory | None = None,
+    max_poll_interval: float = 30,
+    cancel_event: threading.Event | None = None,
 ) -> Path | bytes:
     """
-    Submit report task, poll until ready, loadData for download URL, then download CSV.
-    Retries the full flow up to max_report_attempts times on ReportDownloadError or RuntimeError.
+    Single attempt: submit report task, poll until ready, loadData for download URL, then download CSV.
+    On submit: if response has ERROR, raises ReportRejectedError; if only WARNING and not success, retries once with stopOnWarning=False.
+    Optionally call post_submit_hook(session) after submit (e.g. onChoose_btn_closesubmit).
+    If output_path is set: save content to file and return the Path.
+    If output_path is None: return the report content as bytes (caller can save or load into pandas).
+    report_label: optional short label (e.g. "Parts Price List - 130") included in poll/complete messages.
+    retry_policy: per-request retries and backoff (default RetryPolicy()). Raises ReportDownloadError after last attempt.
+    deadline_at: time.monotonic() value after which polling and retries stop with DeadlineExceededError.
+    progress: state from an earlier failed attempt; submit and/or polling are skipped for steps it already reached.
+    poll_history: past generation times; the first poll is scheduled near the expected completion, then polls
+    back off from poll_interval up to max_poll_interval with jitter (see revnext.polling.PollPlan).
+    cancel_event: when set, polling stops with ReportCancelledError. On cancellation, deadline or
+    poll timeout the task is cancelled on the server (cancel_report_task) before giving up on it.
     """
-    last_error: BaseException | None = None
-    for attempt in range(1, max_report_attempts + 1):
-        try:
-            return _run_report_flow_once(
+    progress = progress if progress is not None else _ReportProgress()
+    retry = {
+        "policy": retry_policy or RetryPolicy(),
+        "deadline_at": deadline_at,
+        "report_label": report_label,
+    }
+    _check_cancelled(cancel_event)
+    if progress.task_id is None:
+        progress.task_id, progress.body = _submit_report_task(
+            session, service_object, base_url, get_submit_body, **retry
+        )
+        progress.submitted_at = time.time()
+        progress.checkpoint()
+        if post_submit_hook:
+            post_submit_hook(session)
+    elif progress.response_url is None:
+        _report_print(report_label, f"Resuming task {progress.task_id}")
+    task_id, body = progress.task_id, progress.body
+
+    if progress.response_url is None:
+        plan = _poll_plan(
+            service_object,
+            progress,
+            poll_history,
+            poll_interval=poll_interval,
+            max_poll_interval=max_poll_interval,
+        )
+        for i in range(max_polls):
+            delay = plan.next_delay()
+            try:
+                _check_deadline(deadline_at, delay)
+                _wait_for_next_poll(delay, cancel_event)
+            except ReportDownloadError:
+                _abandon_task(
+                    session, service_object, base_url, activity_tab_id, progress
+                )
+                raise
+            if _poll_report_once(
                 session,
                 service_object,
-                activity_tab_id,
-                get_submit_body,
                 base_url,
-                output_path=output_path,
-                post_submit_hook=post_submit_hook,
-                max_polls=max_polls,
-                poll_interval=poll_interval,
-                report_label=report_label,
-                max_retries=max_retries,
-                retry_delay=retry_delay,
+                activity_tab_id,
+                task_id,
+                body,
+                **retry,
+            ):
+                plan.complete()
+                _report_print(report_label, "Report generation complete.")
+                break
+            _report_print(
+                report_label,
+                f"Poll {i + 1}: still generating...{plan.eta_text()}",
+                "  ",
             )
-        except (ReportDownloadError, RuntimeError) as e:
-            last_error = e
-            if attempt < max_report_attempts:
-                prefix = f"[{report_label}] " if report_label else ""
-                logger.warning(
-                    "%sFull report attempt %d of %d failed (%s); retrying in %.1fs.",
-                    prefix,
-                    attempt,
-                    max_report_attempts,
-                    e,
-                    report_retry_delay,
+        else:
+            # The task may never finish; stop it, and the next attempt must resubmit.
+            _abandon_task(session, service_object, base_url, activity_tab_id, progress)
+            raise RuntimeError("Timed out waiting for report.")
+
+        progress.response_url = _load_report_response_url(
+            session, service_object, base_url, activity_tab_id, task_id, body, **retry
+        )
+        progress.checkpoint()
+    result = _download_report(
+        session, service_object, progress.response_url, output_path, **retry
+    )
+    progress.finish()
+    return result
+
+
+def run_report_flow(
+    session: requests.Session,
+    service_object: str,
+    activity_tab_id: str,
+    get_submit_body: Callable[[], dict],
+    base_url: str,
+    output_path: Path | None = None,
+    post_submit_hook: Callable[[requests.Session], None] | None = None,
+    max_polls: int = 60,
+    poll_interval: float = 2,
+    report_label: str | None = None,
+    retry_policy: RetryPolicy | None = None,
+    poll_history: PollHistory | None = None,
+    max_poll_interval: float = 30,
+    journal: ReportJournal | None = None,
+    journal_key: str | None = None,
+    cancel_event: threading.Event | None = None,
+) -> Path | bytes:
+    """
+    Submit report task, poll until ready, loadData for download URL, then download CSV.
+    Retries the full flow up to retry_policy.report_attempts times on ReportDownloadError or
+    RuntimeError, with backoff between attempts, within retry_policy.deadline. Failures a retry
+    cannot fix (SessionExpiredError, ReportRejectedError) are raised at once.
+    A retry resumes from the furthest step reached (same task ID, or just the download, resumed
+    with a Range request) and only resubmits if that resumed attempt fails at the same step.
+    With a journal and journal_key, progress is recorded in the ReportJournal, and a task journaled
+    by an earlier (crashed or interrupted) run is resumed the same way instead of resubmitted.
+    Setting cancel_event stops the report (ReportCancelledError). On KeyboardInterrupt or SystemExit
+    the task still generating is cancelled on the server, unless it is journaled for the next run.
+    """
+    policy = retry_policy or RetryPolicy()
+    deadline_at = policy.deadline_at()
+    last_error: BaseException | None = None
+    progress = _ReportProgress.start(
+        service_object,
+        journal=journal,
+        key=journal_key,
+        report_label=report_label,
+        output_path=output_path,
+    )
+    attempt = 0
+    try:
+        while True:
+            attempt += 1
+            resumed_stage = progress.stage
+            try:
+                return _run_report_flow_once(
+                    session,
+                    service_object,
+                    activity_tab_id,
+                    get_submit_body,
+                    base_url,
+                    output_path=output_path,
+                    post_submit_hook=post_submit_hook,
+                    max_polls=max_polls,
+                    poll_interval=poll_interval,
+                    report_label=report_label,
+                    retry_policy=policy,
+                    deadline_at=deadline_at,
+                    progress=progress,
+                    poll_history=poll_history,
+                    max_poll_interval=max_poll_interval,
+                    cancel_event=cancel_event,
                 )
-                time.sleep(report_retry_delay)
-            else:
-                break
-    label_suffix = f" [{report_label}]" if report_label else ""
+            except (ReportDownloadError, RuntimeError) as e:
+                last_error = e
+                _after_failed_attempt(
+                    session,
+                    service_object,
+                    base_url,
+                    activity_tab_id,
+                    progress,
+                    resumed_stage,
+                )
+                delay = _report_retry_delay(policy, attempt, e, deadline_at)
+                if delay is None:
+                    break
+                _log_report_attempt_failed(
+                    report_label, attempt, policy.report_attempts, e, delay
+                )
+                _wait_for_next_poll(delay, cancel_event)
+    except (KeyboardInterrupt, SystemExit):
+        if progress.journal is None:
+            _abandon_task(session, service_object, base_url, activity_tab_id, progress)
+        raise
+    _raise_report_flow_error(last_error, attempt, report_label)
+
+
+def _check_deadline(deadline_at: float | None, wait: float = 0) -> None:
+    """Raise DeadlineExceededError if waiting another wait seconds would pass deadline_at."""
+    if deadline_at is not None and time.monotonic() + wait > deadline_at:
+        raise DeadlineExceededError(
+            "Report deadline reached before the report finished."
+        )
+
+
+def _report_retry_delay(
+    policy: RetryPolicy,
+    attempt: int,
+    error: BaseException,
+    deadline_at: float | None,
+) -> float | None:
+    """
+    Seconds to wait before the next full report attempt, or None when the report should fail
+    now: the error is not retryable, report_attempts are used up, or the wait passes deadline_at.
+    """
+    if not _is_retryable(error) or attempt >= policy.report_attempts:
+        return None
+    delay = policy.report_retry_delay(attempt)
+    if deadline_at is not None and time.monotonic() + delay > deadline_at:
+        return None
+    return delay
+
+
+def _after_failed_attempt(
+    session: requests.Session,
+    service_object: str,
+    base_url: str,
+    activity_tab_id: str,
+    progress: _ReportProgress,
+    resumed_stage: int,
+) -> None:
+    """
+    Resubmit next time if this attempt resumed a step and failed there again; a task dropped
+    while still generating is cancelled on the server first, so it does not run next to its
+    replacement.
+    """
+    if resumed_stage and progress.stage == resumed_stage:
+        _abandon_task(session, service_object, base_url, activity_tab_id, progress)
+
+
+def _log_report_attempt_failed(
+    report_label: str | None,
+    attempt: int,
+    max_report_attempts: int,
+    error: BaseException,
+    report_retry_delay: float,
+) -> None:
+    prefix = f"[{report_label}] " if report_label else ""
+    logger.warning(
+        "%sFull report attempt %d of %d failed (%s); retrying in %.1fs.",
+        prefix,
+        attempt,
+        max_report_attempts,
+        error,
+        report_retry_delay,
+    )
+
+
+def _raise_report_flow_error(
+    last_error: BaseException | None,
+    attempts: int,
+    report_label: str | None,
+) -> NoReturn:
+    """Raise once the last full report attempt has failed."""
     if isinstance(last_error, ReportDownloadError):
         raise last_error
+    label_suffix = f" [{report_label}]" if report_label else ""
     raise ReportDownloadError(
-        f"Report download failed after {max_report_attempts} full attempt(s){label_suffix}: {last_error}"
+        f"Report download failed after {attempts} full attempt(s){label_suffix}: {last_error}"
     ) from last_error
+
+
+def run_report_job(
+    session: requests.Session,
+    job: ReportJob,
+    base_url: str,
+    **flow_options,
+) -> Path | bytes:
+    """
+    Run a ReportJob with run_report_flow. flow_options are passed through (max_polls, poll_interval,
+    max_poll_interval, poll_history, retry_policy, journal, cancel_event); job.key is the journal key.
+    With cache (a ReportCache) and job.key, a cached copy younger than cache.ttl is returned
+    without contacting the server, and a freshly downloaded report is stored in the cache.
+    refresh_cache=True skips the lookup but still stores the result.
+    With snapshots (a SnapshotStore) and job.key, every freshly downloaded report is also added
+    to the snapshot store.
+    """
+    cache: ReportCache | None = flow_options.pop("cache", None)
+    refresh_cache: bool = flow_options.pop("refresh_cache", False)
+    snapshots: SnapshotStore | None = flow_options.pop("snapshots", None)
+    if cache is not None and job.key:
+        entry = None if refresh_cache else cache.get(job.key)
+        if entry is not None:
+            _report_print(
+                job.report_label,
+                f"Using cached report ({entry.age():.0f}s old)",
+            )
+            return cache.load(entry, job.output_path)
+    result = run_report_flow(
+        session,
+        job.service_object,
+        job.activity_tab_id,
+        job.get_submit_body,
+        base_url,
+        output_path=job.output_path,
+        post_submit_hook=job.post_submit_hook,
+        report_label=job.report_label,
+        journal_key=job.key,
+        **flow_options,
+    )
+    if cache is not None and job.key:
+        try:
+            cache.put(
+                job.key,
+                result,
+                service_object=job.service_object,
+                report_label=job.report_label,
+            )
+        except OSError as e:
+            logger.warning("Could not cache report %s: %s", job.report_label, e)
+    if snapshots is not None and job.key:
+        add_snapshot(snapshots, job, result)
+    return result
+
+
+def add_snapshot(
+    snapshots: SnapshotStore, job: ReportJob, result: Path | bytes
+) -> None:
+    """
+    Add a finished job's report (its saved Path or bytes) to snapshots. Best effort: a failure
+    is logged and never fails the report that was downloaded.
+    """
+    try:
+        snapshot = snapshots.add(
+            result,
+            key=job.key,
+            service_object=job.service_object,
+            report_label=job.report_label,
+            params=job.params,
+        )
+    except (OSError, sqlite3.Error) as e:
+        logger.warning("Could not snapshot report %s: %s", job.report_label, e)
+        return
+    _report_print(job.report_label, f"Snapshot {snapshot.hash[:12]}")
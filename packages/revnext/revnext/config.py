@@ -7,6 +7,9 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
+from revnext.cache import DEFAULT_MAX_BYTES, DEFAULT_MAX_ENTRIES, DEFAULT_TTL
+from revnext.retry import RetryPolicy
+
 
 def _load_dotenv_if_available() -> None:
     try:
@@ -22,6 +25,74 @@ def _default_session_path() -> Path:
     return Path.cwd() / ".revnext-session.json"
 
 
+def _default_poll_history_path() -> Path:
+    """Default path for recorded report generation times (under cwd)."""
+    return Path.cwd() / ".revnext-poll-history.json"
+
+
+def _default_journal_path() -> Path:
+    """Default path for the journal of in-flight report tasks (under cwd)."""
+    return Path.cwd() / ".revnext-journal.sqlite3"
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Read a boolean env var ("1", "true", "yes", "on" are true)."""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    """HTTP connection pool settings for the RevNext session (requests HTTPAdapter)."""
+
+    # Number of per-host pools to cache (one host per tenant is typical).
+    pool_connections: int = 10
+    # Connections kept open per host; raise for high-concurrency downloads/enquiries.
+    pool_maxsize: int = 10
+    # True: wait for a free connection when the pool is full instead of opening a throwaway one.
+    pool_block: bool = False
+    # False: send "Connection: close" so every request opens a new connection.
+    keep_alive: bool = True
+
+    @classmethod
+    def from_env(cls) -> "PoolSettings":
+        """Env: REVNEXT_POOL_CONNECTIONS, REVNEXT_POOL_MAXSIZE, REVNEXT_POOL_BLOCK, REVNEXT_KEEP_ALIVE."""
+        return cls(
+            pool_connections=int(os.getenv("REVNEXT_POOL_CONNECTIONS") or 10),
+            pool_maxsize=int(os.getenv("REVNEXT_POOL_MAXSIZE") or 10),
+            pool_block=_env_bool("REVNEXT_POOL_BLOCK", False),
+            keep_alive=_env_bool("REVNEXT_KEEP_ALIVE", True),
+        )
+
+
+@dataclass(frozen=True)
+class CacheSettings:
+    """On-disk report cache settings (revnext.cache.ReportCache). path None disables the cache."""
+
+    # Directory holding cached report CSVs and their index.
+    path: Optional[Path] = None
+    # Seconds a cached report is served instead of generating it again.
+    ttl: float = DEFAULT_TTL
+    # Least recently used reports are evicted beyond either limit.
+    max_entries: int = DEFAULT_MAX_ENTRIES
+    max_bytes: int = DEFAULT_MAX_BYTES
+
+    @classmethod
+    def from_env(cls) -> "CacheSettings":
+        """Env: REVNEXT_CACHE_DIR (unset: no cache), REVNEXT_CACHE_TTL, REVNEXT_CACHE_MAX_ENTRIES, REVNEXT_CACHE_MAX_BYTES."""
+        path = os.getenv("REVNEXT_CACHE_DIR")
+        return cls(
+            path=Path(path) if path else None,
+            ttl=float(os.getenv("REVNEXT_CACHE_TTL") or DEFAULT_TTL),
+            max_entries=int(
+                os.getenv("REVNEXT_CACHE_MAX_ENTRIES") or DEFAULT_MAX_ENTRIES
+            ),
+            max_bytes=int(os.getenv("REVNEXT_CACHE_MAX_BYTES") or DEFAULT_MAX_BYTES),
+        )
+
+
 @dataclass(frozen=True)
 class RevNextConfig:
     """Configuration for Revolution Next (*.revolutionnext.com.au) API / report downloads."""
@@ -30,6 +101,21 @@ class RevNextConfig:
     username: str
     password: str
     session_path: Optional[Path] = None
+    pool: PoolSettings = PoolSettings()
+    # JSON file of past report generation times used for adaptive polling; None keeps them in memory.
+    poll_history_path: Optional[Path] = None
+    retry: RetryPolicy = RetryPolicy()
+    # SQLite journal of in-flight report tasks, resumed after a restart; None disables journaling.
+    journal_path: Optional[Path] = None
+    # On-disk cache of finished reports; disabled unless cache.path is set.
+    cache: CacheSettings = CacheSettings()
+    # Content-addressed store of every downloaded report (revnext.snapshots); None disables it.
+    snapshot_dir: Optional[Path] = None
+    # Snapshot blob compression: "gzip" or "zstd" (needs the zstandard package).
+    snapshot_compression: str = "gzip"
+    # SQLite store behind the in-process enquiry cache (revnext.parts.enquiries.cache); None keeps
+    # cached enquiry results in memory only.
+    enquiry_cache_path: Optional[Path] = None
 
     @classmethod
     def from_env(
@@ -39,12 +125,23 @@ class RevNextConfig:
         username: Optional[str] = None,
         password: Optional[str] = None,
         session_path: Optional[Path] = None,
+        pool: Optional[PoolSettings] = None,
+        poll_history_path: Optional[Path] = None,
+        retry: Optional[RetryPolicy] = None,
+        journal_path: Optional[Path] = None,
+        cache: Optional[CacheSettings] = None,
+        snapshot_dir: Optional[Path] = None,
+        snapshot_compression: Optional[str] = None,
+        enquiry_cache_path: Optional[Path] = None,
         load_dotenv: bool = True,
     ) -> "RevNextConfig":
         """Build config from environment variables. Override any field by passing it explicitly.
 
         Env: REVNEXT_URL (full base URL), REVNEXT_USERNAME, REVNEXT_PASSWORD,
-        optional REVNEXT_SESSION_PATH.
+        optional REVNEXT_SESSION_PATH, REVNEXT_POLL_HISTORY_PATH, REVNEXT_JOURNAL_PATH,
+        REVNEXT_SNAPSHOT_DIR (unset: no snapshots), REVNEXT_SNAPSHOT_COMPRESSION,
+        REVNEXT_ENQUIRY_CACHE_PATH (unset: enquiry cache in memory only), pool settings (see PoolSettings.from_env),
+        retry settings (see RetryPolicy.from_env) and report cache settings (see CacheSettings.from_env).
         """
         if load_dotenv:
             _load_dotenv_if_available()
@@ -62,11 +159,37 @@ class RevNextConfig:
             sp = Path(os.getenv("REVNEXT_SESSION_PATH"))
         if sp is None:
             sp = _default_session_path()
+        php = poll_history_path
+        if php is None and os.getenv("REVNEXT_POLL_HISTORY_PATH"):
+            php = Path(os.getenv("REVNEXT_POLL_HISTORY_PATH"))
+        if php is None:
+            php = _default_poll_history_path()
+        jp = journal_path
+        if jp is None and os.getenv("REVNEXT_JOURNAL_PATH"):
+            jp = Path(os.getenv("REVNEXT_JOURNAL_PATH"))
+        if jp is None:
+            jp = _default_journal_path()
+        sd = snapshot_dir
+        if sd is None and os.getenv("REVNEXT_SNAPSHOT_DIR"):
+            sd = Path(os.getenv("REVNEXT_SNAPSHOT_DIR"))
+        ecp = enquiry_cache_path
+        if ecp is None and os.getenv("REVNEXT_ENQUIRY_CACHE_PATH"):
+            ecp = Path(os.getenv("REVNEXT_ENQUIRY_CACHE_PATH"))
         return cls(
             base_url=url,
             username=uname,
             password=pwd,
             session_path=sp,
+            pool=pool or PoolSettings.from_env(),
+            poll_history_path=php,
+            retry=retry or RetryPolicy.from_env(),
+            journal_path=jp,
+            cache=cache or CacheSettings.from_env(),
+            snapshot_dir=sd,
+            snapshot_compression=snapshot_compression
+            or os.getenv("REVNEXT_SNAPSHOT_COMPRESSION")
+            or "gzip",
+            enquiry_cache_path=ecp,
         )
 
     def validate(self) -> None:
@@ -0,0 +1,237 @@
+"""
+Row-level delta between two downloads of the same report (Parts Price List or Parts By Bin Location).
+Rows are keyed by franchise plus part number. Each file is sorted by key with an external merge
+sort (sorted runs of chunk_rows rows in temporary files, merged with heapq), then the two sorted
+streams are merged: rows only in the new file are inserts, rows only in the old file are deletes,
+and rows in both whose other fields differ are updates listing the changed fields. Neither file
+is ever fully loaded into memory.
+"""
+
+import csv
+import heapq
+import itertools
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Iterable, Iterator, Sequence
+
+from revnext.columns import FRANCHISE_COLUMNS, PART_COLUMNS, find_column
+from revnext.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Rows sorted in memory per run before spilling to a temporary file.
+DEFAULT_CHUNK_ROWS = 50_000
+
+INSERT = "insert"
+DELETE = "delete"
+UPDATE = "update"
+
+
+@dataclass(frozen=True)
+class RowChange:
+    """
+    One changed row. key is (franchise, part number[, occurrence]). row is the new row (the old
+    one for deletes); changes maps each changed field to (old, new) for updates.
+    """
+
+    kind: str
+    key: tuple
+    row: dict
+    changes: dict = field(default_factory=dict)
+
+
+@dataclass
+class DeltaSummary:
+    """Counts of a written delta."""
+
+    inserts: int = 0
+    deletes: int = 0
+    updates: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.inserts + self.deletes + self.updates
+
+
+def find_key_columns(header: Sequence[str]) -> tuple[str, str]:
+    """The (franchise, part number) columns of a report header. Raises ValueError if not found."""
+    found = []
+    for candidates, what in (
+        (FRANCHISE_COLUMNS, "franchise"),
+        (PART_COLUMNS, "part number"),
+    ):
+        name = find_column(header, candidates)
+        if name is None:
+            raise ValueError(
+                f"No {what} column in report header {list(header)}; pass key_columns=."
+            )
+        found.append(name)
+    return found[0], found[1]
+
+
+def _open_csv(source: Path | str | IO[str]):
+    if isinstance(source, (str, Path)):
+        return open(source, encoding="utf-8-sig", newline="")
+    return source
+
+
+def _sorted_runs(
+    reader: Iterator[list[str]],
+    key_indexes: Sequence[int],
+    chunk_rows: int,
+    tmpdir: str,
+) -> list[Path]:
+    """Split reader into sorted runs written to temporary CSV files (key fields first)."""
+    runs = []
+    while True:
+        chunk = list(itertools.islice(reader, chunk_rows))
+        if not chunk:
+            return runs
+        keyed = [
+            [row[i].strip() if i < len(row) else "" for i in key_indexes] + row
+            for row in chunk
+        ]
+        keyed.sort(key=lambda r: r[: len(key_indexes)])
+        path = Path(tmpdir) / f"run{len(runs)}.csv"
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            csv.writer(f).writerows(keyed)
+        runs.append(path)
+
+
+def _iter_run(path: Path) -> Iterator[list[str]]:
+    with open(path, encoding="utf-8", newline="") as f:
+        yield from csv.reader(f)
+
+
+def _sorted_rows(
+    source: Path | str | IO[str],
+    key_columns: tuple[str, str] | None,
+    chunk_rows: int,
+    tmpdir: str,
+) -> Iterator[tuple[tuple, dict]]:
+    """
+    The (key, row) pairs of one report in key order. Rows sharing a key
+    (e.g. one part in several bins) get an occurrence number as the last key element, so
+    they are matched up in file order.
+    """
+    f = _open_csv(source)
+    reader = csv.reader(f)
+    header = next(reader, [])
+    key_columns = key_columns or find_key_columns(header)
+    key_indexes = [header.index(name) for name in key_columns]
+    runs = _sorted_runs(reader, key_indexes, chunk_rows, tmpdir)
+    if isinstance(source, (str, Path)):
+        f.close()
+    width = len(key_indexes)
+
+    def rows() -> Iterator[tuple[tuple, dict]]:
+        merged = heapq.merge(*(_iter_run(p) for p in runs), key=lambda r: r[:width])
+        for key, group in itertools.groupby(merged, key=lambda r: tuple(r[:width])):
+            for n, keyed in enumerate(group):
+                yield key + (n,), dict(zip(header, keyed[width:]))
+
+    return rows()
+
+
+def _changed_fields(old: dict, new: dict, ignore: set[str]) -> dict:
+    changes = {}
+    for name in dict.fromkeys([*old, *new]):
+        if name in ignore:
+            continue
+        before, after = old.get(name, "").strip(), new.get(name, "").strip()
+        if before != after:
+            changes[name] = (before, after)
+    return changes
+
+
+def _public_key(key: tuple) -> tuple:
+    """Drop the occurrence number when it is 0 (the usual one row per part)."""
+    return key[:-1] if key[-1] == 0 else key
+
+
+def diff_reports(
+    old: Path | str | IO[str],
+    new: Path | str | IO[str],
+    *,
+    key_columns: tuple[str, str] | None = None,
+    ignore_columns: Iterable[str] = (),
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> Iterator[RowChange]:
+    """
+    Yield the RowChanges that turn report CSV old into new, in key order. old and new are paths
+    or open text files (e.g. io.TextIOWrapper(store.open(snapshot), encoding="utf-8-sig")).
+    key_columns defaults to the franchise and part number columns found in each header;
+    ignore_columns are not compared (e.g. a report date column).
+    """
+    ignore = set(ignore_columns)
+    with tempfile.TemporaryDirectory(prefix="revnext-delta-") as tmpdir:
+        old_dir = tempfile.mkdtemp(dir=tmpdir)
+        new_dir = tempfile.mkdtemp(dir=tmpdir)
+        old_rows = _sorted_rows(old, key_columns, chunk_rows, old_dir)
+        new_rows = _sorted_rows(new, key_columns, chunk_rows, new_dir)
+        old_item = next(old_rows, None)
+        new_item = next(new_rows, None)
+        while old_item is not None or new_item is not None:
+            if new_item is None or (old_item is not None and old_item[0] < new_item[0]):
+                yield RowChange(DELETE, _public_key(old_item[0]), old_item[1])
+                old_item = next(old_rows, None)
+            elif old_item is None or new_item[0] < old_item[0]:
+                yield RowChange(INSERT, _public_key(new_item[0]), new_item[1])
+                new_item = next(new_rows, None)
+            else:
+                changes = _changed_fields(old_item[1], new_item[1], ignore)
+                if changes:
+                    yield RowChange(
+                        UPDATE, _public_key(new_item[0]), new_item[1], changes
+                    )
+                old_item = next(old_rows, None)
+                new_item = next(new_rows, None)
+
+
+def write_delta(
+    changes: Iterable[RowChange], output_path: Path | str | IO[str]
+) -> DeltaSummary:
+    """
+    Write changes as a CSV delta feed: change, key, changed_fields ("|"-separated), then the
+    row's columns (the new values; the old ones for deletes). Returns the counts written.
+    """
+    summary = DeltaSummary()
+    own_file = isinstance(output_path, (str, Path))
+    f = (
+        open(output_path, "w", encoding="utf-8", newline="")
+        if own_file
+        else output_path
+    )
+    try:
+        writer = None
+        columns: list[str] = []
+        for change in changes:
+            if writer is None:
+                columns = list(change.row)
+                writer = csv.writer(f)
+                writer.writerow(["change", "key", "changed_fields", *columns])
+            writer.writerow(
+                [
+                    change.kind,
+                    "|".join(map(str, change.key)),
+                    "|".join(change.changes),
+                    *(change.row.get(name, "") for name in columns),
+                ]
+            )
+            if change.kind == INSERT:
+                summary.inserts += 1
+            elif change.kind == DELETE:
+                summary.deletes += 1
+            else:
+                summary.updates += 1
+    finally:
+        if own_file:
+            f.close()
+    logger.info(
+        "Delta: %d inserts, %d deletes, %d updates",
+        summary.inserts,
+        summary.deletes,
+        summary.updates,
+    )
+    return summary
@@ -0,0 +1,140 @@
+"""
+Durable journal of in-flight report tasks (SQLite).
+Each report's progress (task ID, submit body and time, step reached, download URL, output path) is
+written as it advances, keyed by a hash of the report's parameters. A restarted process running the
+same report resumes polling or downloading the server-side task instead of submitting it again.
+"""
+
+import dataclasses
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from revnext.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Entries older than this (seconds since submit) are not resumed; the server may have dropped the task.
+DEFAULT_MAX_AGE = 12 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS report_tasks (
+    key TEXT PRIMARY KEY,
+    service_object TEXT NOT NULL,
+    report_label TEXT,
+    task_id TEXT NOT NULL,
+    body TEXT NOT NULL,
+    submitted_at REAL NOT NULL,
+    step TEXT NOT NULL,
+    response_url TEXT,
+    output_path TEXT,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+def params_key(service_object: str, params: object) -> str:
+    """
+    Stable key for a report run: SHA-256 of the service object and the params dataclass fields.
+    Two runs with the same report and parameters share a key, so the second can resume the first.
+    """
+    fields = dataclasses.asdict(params) if dataclasses.is_dataclass(params) else params
+    payload = json.dumps([service_object, fields], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class JournalEntry:
+    """One journaled report task. step is "submitted" (polling) or "ready" (response_url known)."""
+
+    key: str
+    service_object: str
+    report_label: str | None
+    task_id: str
+    body: dict
+    submitted_at: float
+    step: str
+    response_url: str | None = None
+    output_path: str | None = None
+
+
+class ReportJournal:
+    """
+    SQLite-backed journal of report tasks still in flight. Thread-safe; one connection shared
+    under a lock. Finished or abandoned reports are removed, so the table only holds work a
+    restarted process can pick up.
+    """
+
+    def __init__(self, path: Path | str, max_age: float = DEFAULT_MAX_AGE) -> None:
+        self.path = Path(path)
+        self.max_age = max_age
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(_SCHEMA)
+
+    def get(self, key: str) -> JournalEntry | None:
+        """The entry for key, or None if there is none or it is older than max_age."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key, service_object, report_label, task_id, body, submitted_at, step,"
+                " response_url, output_path FROM report_tasks WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        entry = JournalEntry(*row[:4], json.loads(row[4]), *row[5:])
+        if time.time() - entry.submitted_at > self.max_age:
+            logger.info(
+                "Ignoring journaled task %s: older than %ss",
+                entry.task_id,
+                self.max_age,
+            )
+            self.discard(key)
+            return None
+        return entry
+
+    def save(self, entry: JournalEntry) -> None:
+        """Insert or replace the entry for entry.key."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO report_tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    entry.key,
+                    entry.service_object,
+                    entry.report_label,
+                    entry.task_id,
+                    json.dumps(entry.body),
+                    entry.submitted_at,
+                    entry.step,
+                    entry.response_url,
+                    entry.output_path,
+                    time.time(),
+                ),
+            )
+
+    def discard(self, key: str) -> None:
+        """Remove the entry for key (report finished, or its task must not be resumed)."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM report_tasks WHERE key = ?", (key,))
+
+    def pending(self) -> list[JournalEntry]:
+        """All journaled tasks, oldest first (e.g. to report what a restart will resume)."""
+        with self._lock:
+            keys = [
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT key FROM report_tasks ORDER BY submitted_at"
+                )
+            ]
+        return [entry for key in keys if (entry := self.get(key)) is not None]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
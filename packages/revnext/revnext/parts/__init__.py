@@ -2,7 +2,13 @@
 Parts-related functionality (reports, enquiries, etc.) for Revolution Next.
 """
 
-from revnext.parts.enquiries import load_supplier_part, search_supplier_parts
+from revnext.parts.enquiries import (
+    EnquiryCache,
+    iter_supplier_parts,
+    load_supplier_part,
+    search_supplier_parts,
+)
+from revnext.parts.part_index import PartIndex
 from revnext.parts.reports import (
     PartsByBinLocationParams,
     PartsPriceListParams,
@@ -11,10 +17,13 @@ from revnext.parts.reports import (
 )
 
 __all__ = [
+    "EnquiryCache",
+    "PartIndex",
     "PartsByBinLocationParams",
     "PartsPriceListParams",
     "download_parts_by_bin_report",
     "download_parts_price_list_report",
+    "iter_supplier_parts",
     "load_supplier_part",
     "search_supplier_parts",
 ]
@@ -1,13 +1,32 @@
 """
-Enquiries (lookups) for Revolution Next parts – supplier part search and load.
+Enquiries (lookups) for Revolution Next parts – supplier part search and load, and the enquiry cache.
 """
 
+from revnext.parts.enquiries.bulk import (
+    BulkCheckpoint,
+    bulk_supplier_parts,
+    export_supplier_parts,
+    read_part_numbers,
+)
+from revnext.parts.enquiries.cache import EnquiryCache
+from revnext.parts.enquiries.part_batch import batch_part_general
+from revnext.parts.enquiries.prefetch import TabCoAccess, TabPrefetcher
 from revnext.parts.enquiries.supplier_part import (
+    iter_supplier_parts,
     load_supplier_part,
     search_supplier_parts,
 )
 
 __all__ = [
+    "BulkCheckpoint",
+    "EnquiryCache",
+    "TabCoAccess",
+    "TabPrefetcher",
+    "batch_part_general",
+    "bulk_supplier_parts",
+    "export_supplier_parts",
+    "iter_supplier_parts",
     "load_supplier_part",
+    "read_part_numbers",
     "search_supplier_parts",
 ]
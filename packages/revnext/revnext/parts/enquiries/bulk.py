@@ -0,0 +1,376 @@
+"""
+Bulk supplier part enquiry: search_supplier_parts + load_supplier_part for thousands of part
+numbers. Part numbers are read from a file and deduplicated, looked up on a bounded thread pool,
+and every finished part is checkpointed to a SQLite file as it completes, so an interrupted run
+picks up where it stopped (parts already done are skipped, failed ones are tried again).
+export_supplier_parts writes the checkpointed dimensions, weights and prices to CSV or Parquet.
+"""
+
+import csv
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+import requests
+
+from revnext.columns import PART_COLUMNS, find_column
+from revnext.logger import get_logger
+from revnext.parts.enquiries.supplier_part import (
+    iter_supplier_parts,
+    load_supplier_part,
+)
+
+logger = get_logger(__name__)
+
+# Lookups in flight at once; keep within the session's pool (PoolSettings.pool_maxsize).
+DEFAULT_WORKERS = 8
+
+# tt_part fields written by export_supplier_parts, after the requested part number.
+EXPORT_FIELDS = (
+    "supid",
+    "spnam",
+    "supprt",
+    "prtid",
+    "prtdsc",
+    "supprc",
+    "prtlen",
+    "untlen",
+    "prtwdt",
+    "untwdt",
+    "prthgt",
+    "unthgt",
+    "prtvol",
+    "untvol",
+    "prtwgt",
+    "untwgt",
+)
+
+# Fields exported as numbers to Parquet (the API may send them as strings).
+NUMERIC_FIELDS = frozenset({"supprc", "prtlen", "prtwdt", "prthgt", "prtvol", "prtwgt"})
+
+# Rows per Parquet record batch.
+EXPORT_BATCH_SIZE = 10_000
+
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS supplier_parts (
+    part TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    parts TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS run (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    context TEXT NOT NULL
+);
+"""
+
+
+@dataclass
+class BulkSummary:
+    """Counts of one bulk run: parts looked up now, skipped as already done, and failed."""
+
+    done: int = 0
+    skipped: int = 0
+    failed: int = 0
+    not_found: int = 0
+
+
+def read_part_numbers(path: Path | str) -> list[str]:
+    """
+    Part numbers from a text file (one per line) or a CSV with a part number column, stripped
+    and deduplicated ignoring case, in file order.
+    """
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.reader(f))
+    column = 0
+    if rows:
+        name = find_column(rows[0], PART_COLUMNS)
+        if name is not None:
+            column = rows[0].index(name)
+            rows = rows[1:]
+    return dedupe_part_numbers(row[column] for row in rows if len(row) > column)
+
+
+def dedupe_part_numbers(parts: Iterable[str]) -> list[str]:
+    """Strip and deduplicate part numbers ignoring case; blanks are dropped."""
+    seen: set[str] = set()
+    result = []
+    for part in parts:
+        part = part.strip()
+        if part and part.upper() not in seen:
+            seen.add(part.upper())
+            result.append(part)
+    return result
+
+
+class BulkCheckpoint:
+    """
+    SQLite checkpoint of a bulk run: one row per requested part number with its status and the
+    loaded supplier parts (JSON), and the run's context (tenant, supplier, company, division,
+    department), so a rerun with another context cannot pick up these results. Thread-safe.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def bind(self, context: dict[str, Any]) -> None:
+        """
+        Tie the checkpoint to a run context (stored on first use). Raises ValueError if it holds
+        results of a run with another context; clear() it or use another path to start over.
+        """
+        text = json.dumps(context, sort_keys=True, default=str)
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT context FROM run").fetchone()
+            if row is None:
+                self._conn.execute(
+                    "INSERT INTO run (id, context) VALUES (1, ?)", (text,)
+                )
+            elif row[0] != text:
+                raise ValueError(
+                    f"Checkpoint {self.path} belongs to another run ({row[0]}), not {text}; "
+                    "clear it or use another checkpoint path."
+                )
+
+    def clear(self) -> None:
+        """Forget every result and the run context."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM supplier_parts")
+            self._conn.execute("DELETE FROM run")
+
+    def done(self) -> set[str]:
+        """Part numbers already looked up (upper case)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT part FROM supplier_parts WHERE status = ?", (DONE,)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def record(
+        self,
+        part: str,
+        parts: list[dict[str, Any]] | None = None,
+        error: str | None = None,
+    ) -> None:
+        status = FAILED if error is not None else DONE
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO supplier_parts (part, status, parts, error, updated_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (
+                    part.upper(),
+                    status,
+                    json.dumps(parts, default=str) if parts is not None else None,
+                    error,
+                    time.time(),
+                ),
+            )
+
+    def results(self) -> Iterator[tuple[str, list[dict[str, Any]]]]:
+        """(part number, loaded supplier parts) for every part done, in part number order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT part, parts FROM supplier_parts WHERE status = ? ORDER BY part",
+                (DONE,),
+            ).fetchall()
+        for part, parts in rows:
+            yield part, json.loads(parts) if parts else []
+
+    def failures(self) -> dict[str, str]:
+        """Part number -> error of the last failed attempt."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT part, error FROM supplier_parts WHERE status = ?", (FAILED,)
+            ).fetchall()
+        return dict(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def lookup_supplier_part(
+    session: requests.Session,
+    base_url: str,
+    part: str,
+    *,
+    supid: str | None = None,
+    **kwargs: Any,
+) -> list[dict[str, Any]]:
+    """
+    Every supplier's full part data for one part number (only supplier supid when given):
+    all search_supplier_parts pages, then load_supplier_part for each matching row.
+    """
+    parts = []
+    for page in iter_supplier_parts(session, base_url, part, **kwargs):
+        for row in page:
+            if supid is not None and row.get("supid") != supid:
+                continue
+            loaded = load_supplier_part(session, base_url, row["x_rowid"], **kwargs)
+            if loaded is not None:
+                parts.append(loaded)
+    return parts
+
+
+def bulk_supplier_parts(
+    session: requests.Session,
+    base_url: str,
+    part_numbers: Iterable[str],
+    checkpoint: BulkCheckpoint,
+    *,
+    supid: str | None = None,
+    max_workers: int = DEFAULT_WORKERS,
+    cancel_event: threading.Event | None = None,
+    **kwargs: Any,
+) -> BulkSummary:
+    """
+    Look up every part number (deduplicated; those already done in checkpoint are skipped) on
+    up to max_workers threads sharing session, recording each result in checkpoint as it
+    finishes. A failed lookup is logged and recorded, not raised; run again to retry it.
+    Setting cancel_event stops submitting new lookups. kwargs (coid, divid, dftdpt) go to the
+    enquiries. Raises ValueError if checkpoint was made for another base_url, supid or kwargs.
+    """
+    checkpoint.bind({"base_url": base_url.rstrip("/"), "supid": supid, **kwargs})
+    summary = BulkSummary()
+    done = checkpoint.done()
+    todo = []
+    for part in dedupe_part_numbers(part_numbers):
+        if part.upper() in done:
+            summary.skipped += 1
+        else:
+            todo.append(part)
+    logger.info(
+        "Supplier part lookups: %d to do, %d already done", len(todo), summary.skipped
+    )
+    pending: dict[Future, str] = {}
+
+    def finish(future: Future) -> None:
+        part = pending.pop(future)
+        try:
+            parts = future.result()
+        except Exception as e:
+            logger.warning("Lookup of %s failed: %s", part, e)
+            checkpoint.record(part, error=str(e))
+            summary.failed += 1
+            return
+        checkpoint.record(part, parts)
+        summary.done += 1
+        if not parts:
+            summary.not_found += 1
+
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="revnext-bulk"
+    ) as executor:
+        for part in todo:
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            # Keep at most two lookups per worker queued, so the backlog is never all in memory.
+            while len(pending) >= 2 * max_workers:
+                for future in wait(pending, return_when=FIRST_COMPLETED).done:
+                    finish(future)
+            future = executor.submit(
+                lookup_supplier_part, session, base_url, part, supid=supid, **kwargs
+            )
+            pending[future] = part
+        while pending:
+            for future in wait(pending, return_when=FIRST_COMPLETED).done:
+                finish(future)
+    logger.info(
+        "Supplier part lookups: %d done (%d not found), %d failed, %d skipped",
+        summary.done,
+        summary.not_found,
+        summary.failed,
+        summary.skipped,
+    )
+    return summary
+
+
+def _export_value(name: str, value: Any) -> Any:
+    if value is None or value == "":
+        return None
+    if name in NUMERIC_FIELDS:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+    return str(value)
+
+
+def _batches(rows: Iterable[list], size: int) -> Iterator[list[list]]:
+    batch: list[list] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def export_supplier_parts(
+    checkpoint: BulkCheckpoint,
+    output_path: Path | str,
+    output_format: str = "csv",
+) -> int:
+    """
+    Write one row per supplier part in checkpoint (requested part number, then EXPORT_FIELDS)
+    to output_path as "csv" or "parquet" (needs pyarrow). Returns the number of rows written.
+    """
+    output_path = Path(output_path)
+    columns = ("part", *EXPORT_FIELDS)
+    rows = (
+        [part, *(loaded.get(name) for name in EXPORT_FIELDS)]
+        for part, parts in checkpoint.results()
+        for loaded in parts
+    )
+    count = 0
+    if output_format == "csv":
+        with open(output_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+    elif output_format == "parquet":
+        from revnext.parts.reports.columnar import require_pyarrow
+
+        pa = require_pyarrow()
+        import pyarrow.parquet as pq
+
+        schema = pa.schema(
+            [
+                pa.field(name, pa.float64() if name in NUMERIC_FIELDS else pa.string())
+                for name in columns
+            ]
+        )
+        with pq.ParquetWriter(output_path, schema, compression="zstd") as writer:
+            for batch in _batches(rows, EXPORT_BATCH_SIZE):
+                arrays = [
+                    pa.array(
+                        [_export_value(name, row[i]) for row in batch],
+                        schema.field(name).type,
+                    )
+                    for i, name in enumerate(columns)
+                ]
+                writer.write_batch(pa.record_batch(arrays, schema=schema))
+                count += len(batch)
+    else:
+        raise ValueError(
+            f"Unknown output_format {output_format!r}; use 'csv' or 'parquet'."
+        )
+    logger.info("Wrote %d supplier parts to %s", count, output_path)
+    return count
@@ -0,0 +1,292 @@
+"""
+Two-level cache for the part enquiries: an in-process LRU over an optional SQLite store on disk.
+Each kind of result has its own TTL: search results, supplier parts and every part general tab
+(TAB_REGISTRY key). Slow-changing tabs such as "header" are kept for a day, stock tabs for
+seconds, and "on_order" is never cached. EnquiryCache.search_part_general, .load_part_tab,
+.load_part_tabs, .search_supplier_parts and .load_supplier_part take the same arguments as the
+functions they wrap and only make the REST call on a miss.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable
+
+import requests
+
+from revnext.logger import get_logger
+from revnext.parts.enquiries import part_general_enquiry, supplier_part
+
+logger = get_logger(__name__)
+
+# Seconds each kind of result is served from the cache; 0 means never cached.
+# Kinds: "search_part_general", "search_supplier_parts", "supplier_part" and each TAB_REGISTRY key.
+DEFAULT_TTLS: dict[str, float] = {
+    "search_part_general": 300,
+    "search_supplier_parts": 3600,
+    "supplier_part": 24 * 3600,
+    "header": 24 * 3600,
+    "details": 24 * 3600,
+    "other": 24 * 3600,
+    "part_suppliers": 3600,
+    "modification_log": 3600,
+    "history": 3600,
+    "activity": 300,
+    "movement": 300,
+    "stock": 30,
+    "rip": 30,
+    "stock_in_transit": 30,
+    "service_in_progress": 30,
+    "back_order": 30,
+    "on_order": 0,
+}
+
+# Results kept in process memory, least recently used dropped first.
+DEFAULT_MAX_ITEMS = 2048
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS enquiry_cache (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    stored_at REAL NOT NULL
+)
+"""
+
+_MISS = object()
+
+
+def enquiry_key(kind: str, base_url: str, *args: Any, **kwargs: Any) -> str:
+    """Cache key of one enquiry: SHA-256 of its kind, tenant URL and arguments."""
+    payload = json.dumps(
+        [kind, base_url.rstrip("/"), args, kwargs], sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class EnquiryCache:
+    """
+    Enquiry results cached in memory (up to max_items, LRU) and, when path is set, in a SQLite
+    database there, so a restarted process starts warm. ttls overrides DEFAULT_TTLS per kind;
+    kinds missing from both use default_ttl. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        path: Path | str | None = None,
+        *,
+        ttls: dict[str, float] | None = None,
+        default_ttl: float = 0,
+        max_items: int = DEFAULT_MAX_ITEMS,
+    ) -> None:
+        self.path = Path(path) if path is not None else None
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.max_items = max_items
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, tuple[str, float, Any]] = OrderedDict()
+        self._conn: sqlite3.Connection | None = None
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            with self._lock, self._conn:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(_SCHEMA)
+
+    def ttl(self, kind: str) -> float:
+        return self.ttls.get(kind, self.default_ttl)
+
+    def get(self, kind: str, key: str) -> Any:
+        """The cached value for key if younger than kind's TTL, else the MISS sentinel."""
+        ttl = self.ttl(kind)
+        if ttl <= 0:
+            return _MISS
+        now = time.time()
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None:
+                if now - item[1] <= ttl:
+                    self._memory.move_to_end(key)
+                    return item[2]
+                del self._memory[key]
+            if self._conn is None:
+                return _MISS
+            row = self._conn.execute(
+                "SELECT value, stored_at FROM enquiry_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > ttl:
+                return _MISS
+            value = json.loads(row[0])
+            self._remember(key, kind, row[1], value)
+            return value
+
+    def put(self, kind: str, key: str, value: Any) -> None:
+        """Store value under key, unless kind is not cached (TTL 0)."""
+        if self.ttl(kind) <= 0:
+            return
+        now = time.time()
+        with self._lock:
+            self._remember(key, kind, now, value)
+            if self._conn is not None:
+                try:
+                    with self._conn:
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO enquiry_cache (key, kind, value, stored_at)"
+                            " VALUES (?, ?, ?, ?)",
+                            (key, kind, json.dumps(value, default=str), now),
+                        )
+                except sqlite3.Error as e:
+                    logger.warning("Could not store enquiry result on disk: %s", e)
+
+    def _remember(self, key: str, kind: str, stored_at: float, value: Any) -> None:
+        self._memory[key] = (kind, stored_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def has(self, kind: str, key: str) -> bool:
+        """Whether a result for key is cached and younger than kind's TTL."""
+        return self.get(kind, key) is not _MISS
+
+    def get_or_load(self, kind: str, key: str, load: Callable[[], Any]) -> Any:
+        """The cached value for key, or load() (stored for next time) on a miss."""
+        value = self.get(kind, key)
+        if value is _MISS:
+            value = load()
+            self.put(kind, key, value)
+        return value
+
+    def invalidate(self, kind: str | None = None) -> None:
+        """Drop every cached result, or only those of kind (e.g. "stock" after a receipt)."""
+        with self._lock:
+            if kind is None:
+                self._memory.clear()
+            else:
+                for key in [k for k, item in self._memory.items() if item[0] == kind]:
+                    del self._memory[key]
+            if self._conn is not None:
+                with self._conn:
+                    if kind is None:
+                        self._conn.execute("DELETE FROM enquiry_cache")
+                    else:
+                        self._conn.execute(
+                            "DELETE FROM enquiry_cache WHERE kind = ?", (kind,)
+                        )
+
+    def prune(self) -> int:
+        """Remove results older than their kind's TTL from disk. Returns the number removed."""
+        if self._conn is None:
+            return 0
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, kind, stored_at FROM enquiry_cache"
+            ).fetchall()
+            expired = [(key,) for key, kind, at in rows if now - at > self.ttl(kind)]
+            with self._conn:
+                self._conn.executemany(
+                    "DELETE FROM enquiry_cache WHERE key = ?", expired
+                )
+        return len(expired)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # Cached enquiries: same arguments as the wrapped functions.
+
+    def search_part_general(
+        self,
+        session: requests.Session,
+        base_url: str,
+        search_str: str,
+        **kwargs: Any,
+    ) -> list[dict[str, Any]]:
+        kind = "search_part_general"
+        return self.get_or_load(
+            kind,
+            enquiry_key(kind, base_url, search_str, **kwargs),
+            lambda: part_general_enquiry.search_part_general(
+                session, base_url, search_str, **kwargs
+            ),
+        )
+
+    def load_part_tab(
+        self,
+        session: requests.Session,
+        base_url: str,
+        row_id: str,
+        tab: str,
+        **kwargs: Any,
+    ) -> dict[str, Any] | None:
+        return self.get_or_load(
+            tab,
+            enquiry_key(tab, base_url, row_id, **kwargs),
+            lambda: part_general_enquiry.load_part_tab(
+                session, base_url, row_id, tab, **kwargs
+            ),
+        )
+
+    def load_part_tabs(
+        self,
+        session: requests.Session,
+        base_url: str,
+        row_id: str,
+        tabs: list[str],
+        **kwargs: Any,
+    ) -> dict[str, dict[str, Any] | None]:
+        """Cached tabs are served; the rest are loaded together with load_part_tabs."""
+        max_workers = kwargs.pop("max_workers", part_general_enquiry.TAB_WORKERS)
+        tabs = list(dict.fromkeys(tabs))
+        result: dict[str, dict[str, Any] | None] = {}
+        for tab in tabs:
+            value = self.get(tab, enquiry_key(tab, base_url, row_id, **kwargs))
+            if value is not _MISS:
+                result[tab] = value
+        missing = [tab for tab in tabs if tab not in result]
+        if missing:
+            loaded = part_general_enquiry.load_part_tabs(
+                session, base_url, row_id, missing, max_workers=max_workers, **kwargs
+            )
+            for tab, value in loaded.items():
+                self.put(tab, enquiry_key(tab, base_url, row_id, **kwargs), value)
+            result.update(loaded)
+        return {tab: result[tab] for tab in tabs}
+
+    def search_supplier_parts(
+        self,
+        session: requests.Session,
+        base_url: str,
+        prtid: str,
+        **kwargs: Any,
+    ) -> list[dict[str, Any]]:
+        kind = "search_supplier_parts"
+        return self.get_or_load(
+            kind,
+            enquiry_key(kind, base_url, prtid, **kwargs),
+            lambda: supplier_part.search_supplier_parts(
+                session, base_url, prtid, **kwargs
+            ),
+        )
+
+    def load_supplier_part(
+        self,
+        session: requests.Session,
+        base_url: str,
+        row_id: str,
+        **kwargs: Any,
+    ) -> dict[str, Any] | None:
+        kind = "supplier_part"
+        return self.get_or_load(
+            kind,
+            enquiry_key(kind, base_url, row_id, **kwargs),
+            lambda: supplier_part.load_supplier_part(
+                session, base_url, row_id, **kwargs
+            ),
+        )
@@ -0,0 +1,65 @@
+"""
+Paging over getResults searches. getResults returns at most batchSize rows; the next page is
+requested with the last row's x_rowid as the cursor. iter_pages follows the cursor until a short
+or empty page (or a page the server repeats), yielding one list of rows per page, and can fetch
+the next page in the background while the caller works on the current one.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator
+
+from revnext.logger import get_logger
+
+logger = get_logger(__name__)
+
+# fetch(cursor) -> rows of one page; cursor is "" for the first page.
+FetchPage = Callable[[str], list[dict[str, Any]]]
+
+
+def iter_pages(
+    fetch: FetchPage,
+    batch_size: int,
+    *,
+    prefetch: bool = False,
+    max_rows: int | None = None,
+) -> Iterator[list[dict[str, Any]]]:
+    """
+    Yield pages of rows from fetch, following the x_rowid cursor. prefetch=True requests the
+    next page while the current one is being consumed. max_rows stops after that many rows
+    (the last page is cut to fit).
+    """
+    seen: set[str] = set()
+    rows_yielded = 0
+    executor = (
+        ThreadPoolExecutor(max_workers=1, thread_name_prefix="revnext-page")
+        if prefetch
+        else None
+    )
+    try:
+        pending = executor.submit(fetch, "") if executor else None
+        cursor = ""
+        while True:
+            raw = pending.result() if pending else fetch(cursor)
+            pending = None
+            # A full page means there may be more, counted before dropping rows already seen: an
+            # inclusive cursor repeats the cursor row at the top of every later page.
+            full = len(raw) >= batch_size
+            # A server that ignores the cursor sends the first page again: stop there.
+            page = [r for r in raw if r.get("x_rowid") not in seen]
+            if not page:
+                return
+            seen.update(r["x_rowid"] for r in page if r.get("x_rowid"))
+            cursor = page[-1].get("x_rowid") or ""
+            more = full and bool(cursor)
+            if max_rows is not None:
+                page = page[: max_rows - rows_yielded]
+                more = more and rows_yielded + len(page) < max_rows
+            if more and executor:
+                pending = executor.submit(fetch, cursor)
+            rows_yielded += len(page)
+            yield page
+            if not more:
+                return
+    finally:
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
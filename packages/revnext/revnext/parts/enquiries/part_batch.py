@@ -0,0 +1,155 @@
+"""
+Batch part general enquiry: for each of many part numbers, search every franchise
+(iter_part_general, all pages) and load only the requested tabs for every matching x_rowid.
+Searches and tab loads share one pool of max_workers threads, the global limit on requests in
+flight, and are pipelined: a part's tabs are loaded as soon as its search returns, while other
+searches are still running. The result is columnar: one list per field, one entry per matching
+row, ready for pandas.DataFrame(result) or pyarrow.table(result).
+"""
+
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Iterable
+
+import requests
+
+from revnext.logger import get_logger
+from revnext.parts.enquiries import part_general_enquiry
+from revnext.parts.enquiries.bulk import dedupe_part_numbers
+from revnext.parts.enquiries.cache import EnquiryCache
+
+logger = get_logger(__name__)
+
+# Requests (searches and tab loads) in flight at once; keep within PoolSettings.pool_maxsize.
+DEFAULT_WORKERS = 8
+
+# search_part_general fields copied into the result, after the requested part number.
+RESULT_FIELDS = ("frnid", "prtid", "prtdsc", "binid", "supid", "stktot", "prcext")
+
+
+def _search(
+    session: requests.Session,
+    base_url: str,
+    part: str,
+    exact: bool,
+    kwargs: dict[str, Any],
+) -> list[dict[str, Any]]:
+    rows = [
+        row
+        for page in part_general_enquiry.iter_part_general(
+            session, base_url, part, **kwargs
+        )
+        for row in page
+    ]
+    if exact:
+        rows = [r for r in rows if str(r.get("prtid", "")).upper() == part.upper()]
+    return rows
+
+
+def batch_part_general(
+    session: requests.Session,
+    base_url: str,
+    part_numbers: Iterable[str],
+    tabs: list[str],
+    *,
+    exact: bool = True,
+    stkflg: bool = False,
+    coid: str = "03",
+    divid: str = "1",
+    dftdpt: str = "570",
+    max_workers: int = DEFAULT_WORKERS,
+    cache: EnquiryCache | None = None,
+    cancel_event: threading.Event | None = None,
+) -> dict[str, list]:
+    """
+    Search each part number (deduplicated) in every franchise and load tabs (TAB_REGISTRY keys,
+    e.g. ["stock", "on_order"]) for every matching row, with at most max_workers requests in
+    flight. exact=True keeps only rows whose prtid is the part number (ignoring case), dropping
+    the looser matches the search also returns. cache (e.g. client.enquiry_cache) serves tabs it
+    holds. Returns columns: part, RESULT_FIELDS, x_rowid, one column per tab (the tab's
+    dataset, or None) and error. A part with no match has one row with x_rowid None; a failed
+    search or tab load is reported in error rather than raised. Setting cancel_event stops
+    starting new requests.
+    """
+    unknown = [t for t in tabs if t not in part_general_enquiry.TAB_REGISTRY]
+    if unknown:
+        raise ValueError(f"Unknown tabs {unknown}; see TAB_REGISTRY.")
+    tabs = list(dict.fromkeys(tabs))
+    parts = dedupe_part_numbers(part_numbers)
+    context = {"coid": coid, "divid": divid, "dftdpt": dftdpt}
+    search_kwargs = {"stkflg": stkflg, **context}
+    # Per part: its search rows, then per row the loaded tabs and any error.
+    found: dict[str, list[dict[str, Any]]] = {}
+    loaded: dict[tuple[str, int], dict[str, Any]] = {}
+    errors: dict[tuple[str, int], str] = {}
+
+    def load(row_id: str, tab: str):
+        if cache is not None:
+            return cache.load_part_tab(session, base_url, row_id, tab, **context)
+        return part_general_enquiry.load_part_tab(
+            session, base_url, row_id, tab, **context
+        )
+
+    pending: dict[Future, tuple] = {}
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="revnext-part-batch"
+    ) as executor:
+
+        def submit(task: tuple, fn, *args) -> None:
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            pending[executor.submit(fn, *args)] = task
+
+        for part in parts:
+            submit(
+                ("search", part), _search, session, base_url, part, exact, search_kwargs
+            )
+        while pending:
+            for future in wait(pending, return_when=FIRST_COMPLETED).done:
+                task = pending.pop(future)
+                try:
+                    value = future.result()
+                except Exception as e:
+                    if task[0] == "search":
+                        key, message = (task[1], -1), f"search: {e}"
+                    else:
+                        key, message = task[1], f"{task[2]}: {e}"
+                    errors[key] = "; ".join(filter(None, [errors.get(key), message]))
+                    logger.warning(
+                        "Part batch lookup of %s failed: %s", task[1], message
+                    )
+                    continue
+                if task[0] == "search":
+                    part = task[1]
+                    found[part] = value
+                    for i, row in enumerate(value):
+                        loaded[(part, i)] = {}
+                        for tab in tabs:
+                            submit(("tab", (part, i), tab), load, row["x_rowid"], tab)
+                else:
+                    loaded[task[1]][task[2]] = value
+
+    columns: dict[str, list] = {
+        name: [] for name in ("part", *RESULT_FIELDS, "x_rowid", *tabs, "error")
+    }
+
+    def add(part: str, row: dict[str, Any], tab_data: dict[str, Any], error):
+        columns["part"].append(part)
+        for name in RESULT_FIELDS:
+            columns[name].append(row.get(name))
+        columns["x_rowid"].append(row.get("x_rowid"))
+        for tab in tabs:
+            columns[tab].append(tab_data.get(tab))
+        columns["error"].append(error)
+
+    for part in parts:
+        rows = found.get(part)
+        if not rows:
+            error = errors.get((part, -1))
+            if error is None and rows is None:
+                error = "cancelled"
+            add(part, {}, {}, error)
+            continue
+        for i, row in enumerate(rows):
+            add(part, row, loaded.get((part, i), {}), errors.get((part, i)))
+    return columns
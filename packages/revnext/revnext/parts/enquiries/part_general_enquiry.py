@@ -4,10 +4,14 @@ Uses Revolution Next REST API: IM.INQ.PartDash (search) and tab-specific service
 Callers should request only the tabs they need (e.g. part_suppliers only).
 """
 
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator
 
 import requests
 
+from revnext.common import _service_headers
+from revnext.parts.enquiries.pages import iter_pages
+
 GET_RESULTS_SERVICE = "Revolution.Activity.IM.INQ.PartDashPR"
 ACTIVITY_TAB_ID = "Nc262c3a4_e630_4a99_8cd0_70cc9dd9f149"
 
@@ -39,6 +43,10 @@ TAB_REGISTRY: dict[str, tuple[str, str]] = {
 }
 
 
+# Tabs loaded at once by load_part_tabs; keep within the session's pool (PoolSettings.pool_maxsize).
+TAB_WORKERS = 8
+
+
 def _get_results_url(base_url: str) -> str:
     return f"{base_url.rstrip('/')}/next/rest/si/static/getResults"
 
@@ -47,27 +55,18 @@ def _load_data_url(base_url: str) -> str:
     return f"{base_url.rstrip('/')}/next/rest/si/static/loadData"
 
 
-def search_part_general(
-    session: requests.Session,
-    base_url: str,
+def _search_body(
     search_str: str,
     *,
-    frnid: str | None = None,
-    binid: str | None = None,
-    stkflg: bool = False,
-    coid: str = "03",
-    divid: str = "1",
-    dftdpt: str = "570",
-    batch_size: int = 50,
-) -> list[dict[str, Any]]:
-    """
-    Search parts by part number or description (search_str).
-    Returns a list of result rows, each with x_rowid and identifying fields
-    (frnid, prtid, prtdsc, binid, supid, stktot, prcext, etc.) so the user/caller
-    can see options and select the correct part. Each row's x_rowid is valid for load_part_tab.
-    When frnid/binid are omitted or empty, the API may return multiple rows (e.g. one per franchise).
-    """
-    url = _get_results_url(base_url)
+    frnid: str | None,
+    binid: str | None,
+    stkflg: bool,
+    coid: str,
+    divid: str,
+    dftdpt: str,
+    batch_size: int,
+    cursor: str = "",
+) -> dict[str, Any]:
     body: dict[str, Any] = {
         "_userContext_vg_coid": coid,
         "_userContext_vg_divid": divid,
@@ -76,15 +75,21 @@ def search_part_general(
         "batchSize": batch_size,
         "search_str": search_str,
         "stkflg": stkflg,
-        "x_rowid": "",
+        "x_rowid": cursor,
         "uiType": "ISC",
     }
     if frnid is not None and frnid != "":
         body["frnid"] = frnid
     if binid is not None and binid != "":
         body["binid"] = binid
-    session.headers["x-service-object"] = GET_RESULTS_SERVICE
-    r = session.post(url, json=body)
+    return body
+
+
+def _get_results(
+    session: requests.Session, base_url: str, body: dict[str, Any]
+) -> list[dict[str, Any]]:
+    url = _get_results_url(base_url)
+    r = session.post(url, json=body, headers=_service_headers(GET_RESULTS_SERVICE))
     r.raise_for_status()
     data = r.json()
     for ds in data.get("dataSets", []):
@@ -96,6 +101,79 @@ def search_part_general(
     return []
 
 
+def search_part_general(
+    session: requests.Session,
+    base_url: str,
+    search_str: str,
+    *,
+    frnid: str | None = None,
+    binid: str | None = None,
+    stkflg: bool = False,
+    coid: str = "03",
+    divid: str = "1",
+    dftdpt: str = "570",
+    batch_size: int = 50,
+) -> list[dict[str, Any]]:
+    """
+    Search parts by part number or description (search_str).
+    Returns a list of result rows, each with x_rowid and identifying fields
+    (frnid, prtid, prtdsc, binid, supid, stktot, prcext, etc.) so the user/caller
+    can see options and select the correct part. Each row's x_rowid is valid for load_part_tab.
+    When frnid/binid are omitted or empty, the API may return multiple rows (e.g. one per franchise).
+    Only the first batch_size rows are returned; use iter_part_general for every match.
+    """
+    body = _search_body(
+        search_str,
+        frnid=frnid,
+        binid=binid,
+        stkflg=stkflg,
+        coid=coid,
+        divid=divid,
+        dftdpt=dftdpt,
+        batch_size=batch_size,
+    )
+    return _get_results(session, base_url, body)
+
+
+def iter_part_general(
+    session: requests.Session,
+    base_url: str,
+    search_str: str,
+    *,
+    frnid: str | None = None,
+    binid: str | None = None,
+    stkflg: bool = False,
+    coid: str = "03",
+    divid: str = "1",
+    dftdpt: str = "570",
+    batch_size: int = 50,
+    prefetch: bool = False,
+    max_rows: int | None = None,
+) -> Iterator[list[dict[str, Any]]]:
+    """
+    Every row matching a search_part_general search, one page of up to batch_size rows at a
+    time, following the x_rowid cursor until the server has no more. prefetch=True fetches the
+    next page in the background while the caller handles the current one (the session must
+    be shareable across threads, as RevNextClient.session is). max_rows caps the total.
+    """
+
+    def fetch(cursor: str) -> list[dict[str, Any]]:
+        body = _search_body(
+            search_str,
+            frnid=frnid,
+            binid=binid,
+            stkflg=stkflg,
+            coid=coid,
+            divid=divid,
+            dftdpt=dftdpt,
+            batch_size=batch_size,
+            cursor=cursor,
+        )
+        return _get_results(session, base_url, body)
+
+    return iter_pages(fetch, batch_size, prefetch=prefetch, max_rows=max_rows)
+
+
 def load_part_tab(
     session: requests.Session,
     base_url: str,
@@ -129,8 +207,7 @@ def load_part_tab(
         "loadMode": "VIEW",
         "loadRowid": row_id,
     }
-    session.headers["x-service-object"] = service
-    r = session.post(url, json=body)
+    r = session.post(url, json=body, headers=_service_headers(service))
     r.raise_for_status()
     data = r.json()
     for ds in data.get("dataSets", []):
@@ -150,18 +227,40 @@ def load_part_tabs(
     coid: str = "03",
     divid: str = "1",
     dftdpt: str = "570",
+    max_workers: int = TAB_WORKERS,
 ) -> dict[str, dict[str, Any] | None]:
     """
     Load multiple tabs for a part row. tabs is an iterable of tab keys.
     Returns a dict mapping each tab key to its dataset contents (or None).
-    Only the requested tabs are requested from the server.
+    Only the requested tabs are requested from the server, concurrently on up to max_workers
+    threads over the session's connection pool (each request carries its own service header),
+    so the call takes about as long as the slowest tab. Raises the first failed tab's error.
     """
-    result: dict[str, dict[str, Any] | None] = {}
-    for t in tabs:
-        result[t] = load_part_tab(
-            session, base_url, row_id, t, coid=coid, divid=divid, dftdpt=dftdpt
-        )
-    return result
+    tabs = list(dict.fromkeys(tabs))
+    if len(tabs) <= 1 or max_workers <= 1:
+        return {
+            t: load_part_tab(
+                session, base_url, row_id, t, coid=coid, divid=divid, dftdpt=dftdpt
+            )
+            for t in tabs
+        }
+    with ThreadPoolExecutor(
+        max_workers=min(max_workers, len(tabs)), thread_name_prefix="revnext-tab"
+    ) as executor:
+        futures = {
+            t: executor.submit(
+                load_part_tab,
+                session,
+                base_url,
+                row_id,
+                t,
+                coid=coid,
+                divid=divid,
+                dftdpt=dftdpt,
+            )
+            for t in tabs
+        }
+        return {t: future.result() for t, future in futures.items()}
 
 
 if __name__ == "__main__":
@@ -0,0 +1,273 @@
+"""
+Speculative tab prefetch for part dashboards.
+TabCoAccess records which part general tabs are requested together for the same row (within a
+time window), optionally persisted to a JSON file like PollHistory. TabPrefetcher loads tabs
+through an EnquiryCache and, after each load, fetches the tabs most often requested next for
+that row in the background, so a follow-up click is served from the cache. A tab asked for while
+its prefetch is still running waits for that request instead of sending another.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import requests
+
+from revnext.logger import get_logger
+from revnext.parts.enquiries.cache import EnquiryCache, enquiry_key
+
+logger = get_logger(__name__)
+
+# Seconds after a row's first tab in which another tab for that row counts as requested with it.
+CO_ACCESS_WINDOW = 120
+
+# Rows whose recent tab requests are remembered.
+MAX_ROWS = 1024
+
+# A tab is prefetched after another when it followed it at least this often ...
+MIN_PROBABILITY = 0.3
+# ... and at least this many times.
+MIN_COUNT = 3
+# Tabs prefetched after one load, most likely first.
+MAX_PREFETCH = 3
+
+# Background prefetch requests in flight at once.
+PREFETCH_WORKERS = 2
+
+# Co-access counts are saved after this many new pairs (and on save()).
+SAVE_EVERY = 20
+
+
+class TabCoAccess:
+    """
+    How often each tab was requested for a row after each other tab. Thread-safe.
+    With a path, counts are loaded from and saved to that JSON file; with None, in memory only.
+    """
+
+    def __init__(
+        self, path: Path | str | None = None, window: float = CO_ACCESS_WINDOW
+    ) -> None:
+        self.path = Path(path) if path is not None else None
+        self.window = window
+        self._lock = threading.Lock()
+        self._recent: OrderedDict[str, dict[str, float]] = OrderedDict()
+        self._unsaved = 0
+        self._totals: dict[str, int] = {}
+        self._pairs: dict[str, dict[str, int]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self._totals = {k: int(v) for k, v in data.get("totals", {}).items()}
+            self._pairs = {
+                k: {n: int(c) for n, c in v.items()}
+                for k, v in data.get("pairs", {}).items()
+            }
+        except (json.JSONDecodeError, OSError, AttributeError, ValueError) as e:
+            logger.warning("Ignoring unreadable tab co-access %s: %s", self.path, e)
+
+    def save(self) -> None:
+        """Write the counts to path (no-op in memory)."""
+        if self.path is None:
+            return
+        with self._lock:
+            data = {"totals": self._totals, "pairs": self._pairs}
+            self._unsaved = 0
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            tmp.replace(self.path)
+        except OSError as e:
+            logger.warning("Could not save tab co-access %s: %s", self.path, e)
+
+    def record(self, row_id: str, tab: str, at: float | None = None) -> None:
+        """
+        Record that tab was requested for row_id. Each tab already requested for the row within
+        the window counts tab as one of its followers; repeats within the window count once.
+        """
+        at = time.time() if at is None else at
+        with self._lock:
+            seen = self._recent.get(row_id)
+            if seen is not None:
+                seen = {
+                    t: first for t, first in seen.items() if at - first <= self.window
+                }
+            else:
+                seen = {}
+            if tab not in seen:
+                self._totals[tab] = self._totals.get(tab, 0) + 1
+                for earlier in seen:
+                    followers = self._pairs.setdefault(earlier, {})
+                    followers[tab] = followers.get(tab, 0) + 1
+                    self._unsaved += 1
+                seen[tab] = at
+            self._recent[row_id] = seen
+            self._recent.move_to_end(row_id)
+            while len(self._recent) > MAX_ROWS:
+                self._recent.popitem(last=False)
+            save = self._unsaved >= SAVE_EVERY
+        if save:
+            self.save()
+
+    def likely_next(
+        self,
+        tab: str,
+        *,
+        min_probability: float = MIN_PROBABILITY,
+        min_count: int = MIN_COUNT,
+        limit: int = MAX_PREFETCH,
+    ) -> list[str]:
+        """Tabs requested after tab in at least min_probability of its requests, likeliest first."""
+        with self._lock:
+            total = self._totals.get(tab, 0)
+            followers = dict(self._pairs.get(tab, {}))
+        if not total:
+            return []
+        likely = [
+            (count / total, name)
+            for name, count in followers.items()
+            if count >= min_count and count / total >= min_probability
+        ]
+        likely.sort(key=lambda x: (-x[0], x[1]))
+        return [name for _, name in likely[:limit]]
+
+
+class TabPrefetcher:
+    """
+    Loads part general tabs through cache for one session and tenant, recording co-access in
+    co_access and prefetching the likely next tabs of each row in the background. Tabs the cache
+    never keeps (TTL 0, e.g. "on_order") are not prefetched. close() stops pending prefetches
+    and saves the co-access counts.
+    """
+
+    def __init__(
+        self,
+        cache: EnquiryCache,
+        session: requests.Session,
+        base_url: str,
+        *,
+        co_access: TabCoAccess | None = None,
+        max_workers: int = PREFETCH_WORKERS,
+        min_probability: float = MIN_PROBABILITY,
+        max_prefetch: int = MAX_PREFETCH,
+    ) -> None:
+        self.cache = cache
+        self.session = session
+        self.base_url = base_url
+        self.co_access = co_access or TabCoAccess()
+        self.min_probability = min_probability
+        self.max_prefetch = max_prefetch
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="revnext-prefetch"
+        )
+        self._lock = threading.Lock()
+        self._inflight: dict[str, Future] = {}
+
+    def load_part_tab(
+        self, row_id: str, tab: str, **kwargs: Any
+    ) -> dict[str, Any] | None:
+        """load_part_tab through the cache (kwargs: coid, divid, dftdpt), then prefetch."""
+        self.co_access.record(row_id, tab)
+        value = self._load(row_id, tab, kwargs)
+        self._prefetch(row_id, [tab], kwargs)
+        return value
+
+    def load_part_tabs(
+        self, row_id: str, tabs: list[str], **kwargs: Any
+    ) -> dict[str, dict[str, Any] | None]:
+        """load_part_tabs through the cache, then prefetch what usually follows these tabs."""
+        for tab in tabs:
+            self.co_access.record(row_id, tab)
+        waiting = {}
+        with self._lock:
+            for tab in tabs:
+                future = self._inflight.get(
+                    enquiry_key(tab, self.base_url, row_id, **kwargs)
+                )
+                if future is not None:
+                    waiting[tab] = future
+        result = self.cache.load_part_tabs(
+            self.session,
+            self.base_url,
+            row_id,
+            [t for t in tabs if t not in waiting],
+            **kwargs,
+        )
+        for tab in waiting:
+            result[tab] = self._load(row_id, tab, kwargs)
+        self._prefetch(row_id, tabs, kwargs)
+        return {tab: result[tab] for tab in dict.fromkeys(tabs)}
+
+    def _load(self, row_id: str, tab: str, kwargs: dict[str, Any]):
+        key = enquiry_key(tab, self.base_url, row_id, **kwargs)
+        with self._lock:
+            future = self._inflight.get(key)
+        if future is not None:
+            try:
+                return future.result()
+            except (requests.RequestException, ValueError, CancelledError) as e:
+                # Prefetch failed (or was cancelled): load it now and let that error surface.
+                logger.debug("Prefetch of %s failed, loading it again: %s", tab, e)
+        return self.cache.load_part_tab(
+            self.session, self.base_url, row_id, tab, **kwargs
+        )
+
+    def _prefetch(self, row_id: str, tabs: list[str], kwargs: dict[str, Any]) -> None:
+        candidates: list[str] = []
+        for tab in tabs:
+            for name in self.co_access.likely_next(
+                tab, min_probability=self.min_probability, limit=self.max_prefetch
+            ):
+                if name not in tabs and name not in candidates:
+                    candidates.append(name)
+        for name in candidates[: self.max_prefetch]:
+            if self.cache.ttl(name) <= 0:
+                continue
+            key = enquiry_key(name, self.base_url, row_id, **kwargs)
+            if self.cache.has(name, key):
+                continue
+            with self._lock:
+                if key in self._inflight:
+                    continue
+                try:
+                    future = self._executor.submit(
+                        self.cache.load_part_tab,
+                        self.session,
+                        self.base_url,
+                        row_id,
+                        name,
+                        **kwargs,
+                    )
+                except RuntimeError:
+                    return  # Closed.
+                self._inflight[key] = future
+            logger.debug("Prefetching %s for %s", name, row_id)
+            future.add_done_callback(
+                lambda f, key=key, name=name: self._prefetch_done(key, name, f)
+            )
+
+    def _prefetch_done(self, key: str, name: str, future: Future) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+        if not future.cancelled() and future.exception() is not None:
+            logger.debug("Prefetch of %s failed: %s", name, future.exception())
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.co_access.save()
+
+    def __enter__(self) -> "TabPrefetcher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
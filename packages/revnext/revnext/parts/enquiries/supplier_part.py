@@ -3,10 +3,13 @@ Supplier part enquiry: search by part number (getResults), then load full part d
 Uses Revolution Next REST API: IM.INQ.SupplierPartDash (search) and IM.INQ.SupplierPart (load).
 """
 
-from typing import Any
+from typing import Any, Iterator
 
 import requests
 
+from revnext.common import _service_headers
+from revnext.parts.enquiries.pages import iter_pages
+
 GET_RESULTS_SERVICE = "Revolution.Activity.IM.INQ.SupplierPartDashPR"
 LOAD_DATA_SERVICE = "Revolution.Activity.IM.INQ.SupplierPartPR"
 ACTIVITY_TAB_ID = "Ne2c02942_66b0_42b3_bb47_a5d466a3f3b4"
@@ -21,23 +24,16 @@ def _load_data_url(base_url: str) -> str:
     return f"{base_url.rstrip('/')}/next/rest/si/static/loadData"
 
 
-def search_supplier_parts(
-    session: requests.Session,
-    base_url: str,
+def _search_body(
     prtid: str,
     *,
-    coid: str = "03",
-    divid: str = "1",
-    dftdpt: str = "570",
-    batch_size: int = 50,
-) -> list[dict[str, Any]]:
-    """
-    Search supplier parts by part number (prtid).
-    Returns a list of result rows, each with x_rowid, supid, supprt, prtdsc, supprc, spnam, etc.
-    Use x_rowid from the desired row in load_supplier_part() to load full part data.
-    """
-    url = _get_results_url(base_url)
-    body = {
+    coid: str,
+    divid: str,
+    dftdpt: str,
+    batch_size: int,
+    cursor: str = "",
+) -> dict[str, Any]:
+    body: dict[str, Any] = {
         "_userContext_vg_coid": coid,
         "_userContext_vg_divid": divid,
         "_userContext_vg_dftdpt": dftdpt,
@@ -46,8 +42,16 @@ def search_supplier_parts(
         "prtid": prtid,
         "uiType": "ISC",
     }
-    session.headers["x-service-object"] = GET_RESULTS_SERVICE
-    r = session.post(url, json=body)
+    if cursor:
+        body["x_rowid"] = cursor
+    return body
+
+
+def _get_results(
+    session: requests.Session, base_url: str, body: dict[str, Any]
+) -> list[dict[str, Any]]:
+    url = _get_results_url(base_url)
+    r = session.post(url, json=body, headers=_service_headers(GET_RESULTS_SERVICE))
     r.raise_for_status()
     data = r.json()
     for ds in data.get("dataSets", []):
@@ -59,6 +63,59 @@ def search_supplier_parts(
     return []
 
 
+def search_supplier_parts(
+    session: requests.Session,
+    base_url: str,
+    prtid: str,
+    *,
+    coid: str = "03",
+    divid: str = "1",
+    dftdpt: str = "570",
+    batch_size: int = 50,
+) -> list[dict[str, Any]]:
+    """
+    Search supplier parts by part number (prtid).
+    Returns a list of result rows, each with x_rowid, supid, supprt, prtdsc, supprc, spnam, etc.
+    Use x_rowid from the desired row in load_supplier_part() to load full part data.
+    Only the first batch_size rows are returned; use iter_supplier_parts for every match.
+    """
+    body = _search_body(
+        prtid, coid=coid, divid=divid, dftdpt=dftdpt, batch_size=batch_size
+    )
+    return _get_results(session, base_url, body)
+
+
+def iter_supplier_parts(
+    session: requests.Session,
+    base_url: str,
+    prtid: str,
+    *,
+    coid: str = "03",
+    divid: str = "1",
+    dftdpt: str = "570",
+    batch_size: int = 50,
+    prefetch: bool = False,
+    max_rows: int | None = None,
+) -> Iterator[list[dict[str, Any]]]:
+    """
+    Every row matching a search_supplier_parts search, one page of up to batch_size rows at a
+    time, following the x_rowid cursor. prefetch and max_rows as in iter_part_general.
+    """
+
+    def fetch(cursor: str) -> list[dict[str, Any]]:
+        body = _search_body(
+            prtid,
+            coid=coid,
+            divid=divid,
+            dftdpt=dftdpt,
+            batch_size=batch_size,
+            cursor=cursor,
+        )
+        return _get_results(session, base_url, body)
+
+    return iter_pages(fetch, batch_size, prefetch=prefetch, max_rows=max_rows)
+
+
 def load_supplier_part(
     session: requests.Session,
     base_url: str,
@@ -85,8 +142,7 @@ def load_supplier_part(
         "loadMode": "VIEW",
         "loadRowid": row_id,
     }
-    session.headers["x-service-object"] = LOAD_DATA_SERVICE
-    r = session.post(url, json=body)
+    r = session.post(url, json=body, headers=_service_headers(LOAD_DATA_SERVICE))
     r.raise_for_status()
     data = r.json()
     for ds in data.get("dataSets", []):
@@ -0,0 +1,360 @@
+"""
+Local part index built from downloaded Parts Price List and Parts By Bin Location CSVs.
+A SQLite database with one row per franchise + part number (description, primary bin and all
+bins, supplier, stock, price), indexes on franchise/part/bin, and an FTS5 index over part
+numbers and descriptions. Bin rows are kept per franchise + department, so the per-department
+Parts By Bin reports add up instead of replacing each other. PartIndex.search answers the same
+questions as search_part_general with rows of the same shape, locally, so counter lookups do not
+hit the live getResults endpoint.
+Local rows have no x_rowid (None): to load tabs for a part, run the live search for it.
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import IO, Any, Iterable
+
+from revnext.columns import FRANCHISE_COLUMNS, PART_COLUMNS, find_column
+from revnext.logger import get_logger
+from revnext.parts.reports.reader import ReportKind, iter_report
+
+logger = get_logger(__name__)
+
+# search_part_general row field -> normalised report headers it is read from, first match wins.
+FIELD_COLUMNS: dict[str, tuple[str, ...]] = {
+    "frnid": FRANCHISE_COLUMNS,
+    "prtid": PART_COLUMNS,
+    "prtdsc": ("description", "partdescription", "prtdsc"),
+    "binid": ("bin", "binlocation", "primarybin", "binid"),
+    "supid": ("supplier", "suppliercode", "supid"),
+    "stktot": (
+        "stockonhand",
+        "soh",
+        "onhand",
+        "availablestock",
+        "physicalstock",
+        "available",
+        "stktot",
+    ),
+    "prcext": ("listprice", "price1", "retailprice", "price", "prcext"),
+    "dptid": ("department", "dptid"),
+}
+
+# Rows written per executemany batch while building.
+BUILD_BATCH_SIZE = 5_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS parts (
+    frnid TEXT NOT NULL,
+    prtid TEXT NOT NULL,
+    prtdsc TEXT,
+    binid TEXT,
+    bins TEXT,
+    supid TEXT,
+    stktot REAL,
+    prcext REAL,
+    dptid TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (frnid, prtid)
+);
+CREATE INDEX IF NOT EXISTS parts_prtid ON parts (prtid COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS parts_binid ON parts (binid COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS part_bins (
+    frnid TEXT NOT NULL,
+    dptid TEXT NOT NULL,
+    prtid TEXT NOT NULL,
+    binid TEXT,
+    stktot REAL
+);
+CREATE INDEX IF NOT EXISTS part_bins_part ON part_bins (frnid, prtid);
+CREATE INDEX IF NOT EXISTS part_bins_department ON part_bins (frnid, dptid);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS parts_fts USING fts5(
+    prtid, prtdsc, content='parts', content_rowid='rowid', tokenize='unicode61'
+)
+"""
+
+_COLUMNS = "frnid, prtid, prtdsc, binid, bins, supid, stktot, prcext, dptid"
+
+# Price list rows fill description, supplier and price; by-bin rows are kept per department in
+# part_bins, and each part's bins and stock are recomputed from there (_REFRESH_STOCK).
+# Either report keeps what the other set (COALESCE with the existing row).
+_UPSERT = f"""
+INSERT INTO parts ({_COLUMNS}, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (frnid, prtid) DO UPDATE SET
+    prtdsc = COALESCE(excluded.prtdsc, prtdsc),
+    binid = COALESCE(binid, excluded.binid),
+    supid = COALESCE(excluded.supid, supid),
+    prcext = COALESCE(excluded.prcext, prcext),
+    dptid = COALESCE(excluded.dptid, dptid),
+    updated_at = excluded.updated_at
+"""
+
+_INSERT_BIN = (
+    "INSERT INTO part_bins (frnid, dptid, prtid, binid, stktot) VALUES (?, ?, ?, ?, ?)"
+)
+
+# Stock is summed over every department's bin rows; the first bin loaded is the primary one.
+_REFRESH_STOCK = """
+UPDATE parts SET
+    stktot = (
+        SELECT SUM(b.stktot) FROM part_bins b
+        WHERE b.frnid = parts.frnid AND b.prtid = parts.prtid
+    ),
+    bins = (
+        SELECT group_concat(binid) FROM (
+            SELECT DISTINCT b.binid FROM part_bins b
+            WHERE b.frnid = parts.frnid AND b.prtid = parts.prtid AND b.binid IS NOT NULL
+            ORDER BY b.rowid
+        )
+    ),
+    binid = COALESCE(
+        (
+            SELECT b.binid FROM part_bins b
+            WHERE b.frnid = parts.frnid AND b.prtid = parts.prtid AND b.binid IS NOT NULL
+            ORDER BY b.rowid LIMIT 1
+        ),
+        binid
+    )
+WHERE frnid = ?
+"""
+
+
+def _field_map(fields: Iterable[str]) -> dict[str, str]:
+    """Index field -> record attribute for one report's columns."""
+    fields = list(fields)
+    mapping = {}
+    for target, candidates in FIELD_COLUMNS.items():
+        name = find_column(fields, candidates)
+        if name is not None:
+            mapping[target] = name
+    return mapping
+
+
+def _fts_query(search_str: str) -> str:
+    """FTS5 query matching every word of search_str as a prefix."""
+    words = [w.replace('"', '""') for w in search_str.split()]
+    return " ".join(f'"{w}"*' for w in words)
+
+
+class PartIndex:
+    """
+    SQLite part index at path. Thread-safe; one connection shared under a lock.
+    Fill it with add_report (or rebuild), then query it with search / get.
+    If this SQLite build has no FTS5, description searches fall back to LIKE.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            try:
+                self._conn.execute(_FTS_SCHEMA)
+                self.fts = True
+            except sqlite3.OperationalError:
+                logger.warning(
+                    "SQLite has no FTS5; part descriptions are searched with LIKE."
+                )
+                self.fts = False
+
+    def add_report(
+        self,
+        source: Path | str | IO[str],
+        report: ReportKind,
+        *,
+        department: str | None = None,
+    ) -> int:
+        """
+        Add (or update) the parts of one report CSV: "parts_price_list" rows set description,
+        supplier and price; "parts_by_bin" rows replace the bins and stock of their franchise and
+        department, so each department's report can be loaded (and reloaded) on its own and a
+        part's stock is the sum over departments. department fills dptid when the report has no
+        department column. Returns the number of rows read.
+        """
+        mapping: dict[str, str] | None = None
+        batch: list[tuple] = []
+        bins: list[tuple] = []
+        count = 0
+        now = time.time()
+        by_bin = report == "parts_by_bin"
+        # (franchise, department) pairs whose earlier bin rows this report replaces.
+        reloaded: set[tuple[str, str]] = set()
+        with self._lock, self._conn:
+            for record in iter_report(source, report):
+                if mapping is None:
+                    mapping = _field_map(record._fields)
+                    if "frnid" not in mapping or "prtid" not in mapping:
+                        raise ValueError(
+                            f"No franchise / part number column in {list(record._fields)}"
+                        )
+                row = {k: getattr(record, name) for k, name in mapping.items()}
+                if not row["prtid"]:
+                    continue
+                frnid = row["frnid"] or ""
+                prtid = str(row["prtid"])
+                dptid = row.get("dptid") or department
+                if by_bin:
+                    if (frnid, dptid or "") not in reloaded:
+                        reloaded.add((frnid, dptid or ""))
+                        self._conn.execute(
+                            "DELETE FROM part_bins WHERE frnid = ? AND dptid = ?",
+                            (frnid, dptid or ""),
+                        )
+                    bins.append(
+                        (frnid, dptid or "", prtid, row.get("binid"), row.get("stktot"))
+                    )
+                batch.append(
+                    (
+                        frnid,
+                        prtid,
+                        row.get("prtdsc"),
+                        None if by_bin else row.get("binid"),
+                        None,
+                        row.get("supid"),
+                        None,
+                        row.get("prcext"),
+                        dptid,
+                        now,
+                    )
+                )
+                count += 1
+                if len(batch) >= BUILD_BATCH_SIZE:
+                    self._conn.executemany(_UPSERT, batch)
+                    self._conn.executemany(_INSERT_BIN, bins)
+                    batch.clear()
+                    bins.clear()
+            if batch:
+                self._conn.executemany(_UPSERT, batch)
+                self._conn.executemany(_INSERT_BIN, bins)
+            for frnid in {frnid for frnid, _ in reloaded}:
+                self._conn.execute(_REFRESH_STOCK, (frnid,))
+            if self.fts:
+                self._conn.execute(
+                    "INSERT INTO parts_fts(parts_fts) VALUES ('rebuild')"
+                )
+        logger.info("Indexed %d %s rows from %s", count, report, source)
+        return count
+
+    def rebuild(
+        self,
+        price_lists: Iterable[Path | str] = (),
+        bin_reports: Iterable[Path | str] = (),
+    ) -> int:
+        """Empty the index and load the given report CSVs. Returns the number of parts."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM parts")
+            self._conn.execute("DELETE FROM part_bins")
+            if self.fts:
+                self._conn.execute(
+                    "INSERT INTO parts_fts(parts_fts) VALUES ('rebuild')"
+                )
+        for path in price_lists:
+            self.add_report(path, "parts_price_list")
+        for path in bin_reports:
+            self.add_report(path, "parts_by_bin")
+        return len(self)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM parts").fetchone()[0]
+
+    @staticmethod
+    def _result(row: sqlite3.Row) -> dict[str, Any]:
+        result = {name: row[name] for name in _COLUMNS.split(", ")}
+        result["x_rowid"] = None
+        return result
+
+    def get(self, frnid: str, prtid: str) -> dict[str, Any] | None:
+        """The row for one franchise + part number, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM parts WHERE frnid = ? AND prtid = ?",
+                (frnid, prtid),
+            ).fetchone()
+        return self._result(row) if row else None
+
+    def search(
+        self,
+        search_str: str,
+        *,
+        frnid: str | None = None,
+        binid: str | None = None,
+        stkflg: bool = False,
+        batch_size: int = 50,
+    ) -> list[dict[str, Any]]:
+        """
+        Search like search_part_general: parts whose number starts with search_str first, then
+        parts whose description contains every word of it. frnid / binid narrow the results
+        (binid matches any of the part's bins); stkflg keeps only parts with stock. Returns up to
+        batch_size rows with frnid, prtid, prtdsc, binid, bins, supid, stktot, prcext, dptid and
+        x_rowid (None).
+        """
+        search_str = search_str.strip()
+        if not search_str:
+            return []
+        filters, args = [], []
+        if frnid:
+            filters.append("p.frnid = ?")
+            args.append(frnid)
+        if binid:
+            filters.append(
+                "instr(',' || upper(p.bins) || ',', ',' || upper(?) || ',') > 0"
+            )
+            args.append(binid)
+        if stkflg:
+            filters.append("p.stktot > 0")
+        where = "".join(f" AND {f}" for f in filters)
+        columns = ", ".join(f"p.{c}" for c in _COLUMNS.split(", "))
+        by_part = (
+            f"SELECT {columns}, 0 AS tier, 0 AS score FROM parts p"
+            f" WHERE p.prtid LIKE ? ESCAPE '\\' COLLATE NOCASE{where}"
+        )
+        part_args = [
+            search_str.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            + "%",
+            *args,
+        ]
+        if self.fts:
+            by_text = (
+                f"SELECT {columns}, 1 AS tier, bm25(parts_fts) AS score FROM parts_fts"
+                f" JOIN parts p ON p.rowid = parts_fts.rowid WHERE parts_fts MATCH ?{where}"
+            )
+            text_args = [_fts_query(search_str), *args]
+        else:
+            words = search_str.split()
+            by_text = (
+                f"SELECT {columns}, 1 AS tier, 0 AS score FROM parts p WHERE "
+                + " AND ".join("p.prtdsc LIKE ?" for _ in words)
+                + where
+            )
+            text_args = [f"%{w}%" for w in words] + args
+        # Part number matches (tier 0) before description matches (tier 1), those best bm25()
+        # first; with MIN(tier), SQLite takes score from the row of that tier.
+        query = (
+            f"SELECT {_COLUMNS}, MIN(tier) AS tier, score FROM ({by_part} UNION ALL {by_text})"
+            " GROUP BY frnid, prtid ORDER BY tier, score, prtid, frnid LIMIT ?"
+        )
+        with self._lock:
+            try:
+                rows = self._conn.execute(
+                    query, [*part_args, *text_args, batch_size]
+                ).fetchall()
+            except sqlite3.OperationalError:
+                # Not a valid FTS query (e.g. only punctuation): part numbers only.
+                rows = self._conn.execute(
+                    f"{by_part} ORDER BY p.prtid, p.frnid LIMIT ?",
+                    [*part_args, batch_size],
+                ).fetchall()
+        return [self._result(row) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
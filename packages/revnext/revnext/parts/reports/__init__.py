@@ -2,18 +2,35 @@
 Parts reports: Parts By Bin Location, Parts Price List, etc.
 """
 
+from revnext.parts.reports.columnar import convert_report
+from revnext.parts.reports.offsets import ReportOffsetIndex, build_offset_index
 from revnext.parts.reports.parts_by_bin_report import (
     PartsByBinLocationParams,
+    build_parts_by_bin_job,
     download_parts_by_bin_report,
 )
 from revnext.parts.reports.parts_price_list_report import (
     PartsPriceListParams,
+    build_parts_price_list_job,
     download_parts_price_list_report,
 )
+from revnext.parts.reports.reader import (
+    ReportRecord,
+    iter_report,
+    iter_report_batches,
+)
 
 __all__ = [
     "PartsByBinLocationParams",
     "PartsPriceListParams",
+    "ReportOffsetIndex",
+    "ReportRecord",
+    "build_offset_index",
+    "build_parts_by_bin_job",
+    "build_parts_price_list_job",
+    "convert_report",
     "download_parts_by_bin_report",
     "download_parts_price_list_report",
+    "iter_report",
+    "iter_report_batches",
 ]
@@ -0,0 +1,191 @@
+"""
+Parquet / Arrow output for the report downloads (output_format="parquet" or "arrow").
+The downloaded CSV is read in typed column batches (revnext.parts.reports.reader) and written
+batch by batch as a columnar file: numbers as float64/int64, dates as date32, and low-cardinality
+code columns (franchise, bin, department, supplier, movement code) dictionary-encoded.
+"arrow" writes an uncompressed Arrow IPC file that pyarrow.memory_map can read without copying;
+"parquet" writes a zstd-compressed Parquet file. Needs pyarrow (pip install revnext[parquet]).
+"""
+
+import csv
+import os
+from pathlib import Path
+from typing import Literal
+
+from revnext.columns import normalise_header
+from revnext.logger import get_logger
+from revnext.parts.reports.reader import (
+    DEFAULT_BATCH_SIZE,
+    ReportKind,
+    column_type,
+    iter_report_batches,
+    record_type,
+)
+
+logger = get_logger(__name__)
+
+OutputFormat = Literal["csv", "parquet", "arrow"]
+
+SUFFIXES = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+
+# Normalised headers of columns stored dictionary-encoded (few distinct values, many rows).
+DICTIONARY_COLUMNS = frozenset(
+    {
+        "franchise",
+        "bin",
+        "binlocation",
+        "alternatebin",
+        "department",
+        "supplier",
+        "movementcode",
+    }
+)
+
+
+def require_pyarrow():
+    """The pyarrow module; ImportError with the install hint when it is missing."""
+    try:
+        import pyarrow
+
+        return pyarrow
+    except ImportError as e:
+        raise ImportError(
+            "Parquet / Arrow output needs pyarrow (pip install revnext[parquet])."
+        ) from e
+
+
+def output_paths(output_path: Path, output_format: OutputFormat) -> tuple[Path, Path]:
+    """
+    (csv_path, final_path) for a download in output_format: the CSV is downloaded next to the
+    columnar file and removed once converted. For "csv" both are output_path.
+    """
+    if output_format not in SUFFIXES:
+        raise ValueError(
+            f"Unknown output_format {output_format!r}; use 'csv', 'parquet' or 'arrow'."
+        )
+    if output_format == "csv":
+        return output_path, output_path
+    final_path = output_path.with_suffix(SUFFIXES[output_format])
+    return final_path.with_name(final_path.name + ".csv"), final_path
+
+
+def arrow_schema(csv_path: Path | str, report: ReportKind | None = None):
+    """The pyarrow schema for a report CSV, from its header and the reader's column types."""
+    pa = require_pyarrow()
+    with open(csv_path, encoding="utf-8-sig", newline="") as f:
+        header = next(csv.reader(f), [])
+    types = {
+        "str": pa.string(),
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "date": pa.date32(),
+    }
+    fields = []
+    for column, name in zip(header, record_type(header)._fields):
+        kind = column_type(column, report)
+        if kind == "str" and normalise_header(column) in DICTIONARY_COLUMNS:
+            arrow_type = pa.dictionary(pa.int32(), pa.string())
+        else:
+            arrow_type = types[kind]
+        fields.append(pa.field(name, arrow_type))
+    return pa.schema(fields)
+
+
+class _DictionaryEncoder:
+    """
+    Dictionary-encodes one column across batches with a single growing dictionary, so each
+    batch only adds a delta (the Arrow IPC file format allows no dictionary replacement).
+    """
+
+    def __init__(self) -> None:
+        self._codes: dict[str, int] = {}
+        self._values: list[str] = []
+
+    def encode(self, values: list):
+        pa = require_pyarrow()
+        indices = []
+        for value in values:
+            if value is None:
+                indices.append(None)
+                continue
+            code = self._codes.get(value)
+            if code is None:
+                code = self._codes[value] = len(self._values)
+                self._values.append(value)
+            indices.append(code)
+        return pa.DictionaryArray.from_arrays(
+            pa.array(indices, pa.int32()), pa.array(self._values, pa.string())
+        )
+
+
+def convert_report(
+    csv_path: Path | str,
+    output_path: Path | str,
+    output_format: Literal["parquet", "arrow"],
+    report: ReportKind | None = None,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Path:
+    """
+    Convert a report CSV to a Parquet or Arrow IPC file at output_path, one batch_size batch at
+    a time (temp file renamed into place). Returns output_path.
+    """
+    pa = require_pyarrow()
+    output_path = Path(output_path)
+    schema = arrow_schema(csv_path, report)
+    tmp = output_path.with_name(f"{output_path.name}.tmp")
+    if output_format == "parquet":
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(tmp, schema, compression="zstd")
+    elif output_format == "arrow":
+        writer = pa.ipc.new_file(
+            str(tmp),
+            schema,
+            options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True),
+        )
+    else:
+        raise ValueError(
+            f"Unknown output_format {output_format!r}; use 'parquet' or 'arrow'."
+        )
+    encoders = {
+        field.name: _DictionaryEncoder()
+        for field in schema
+        if pa.types.is_dictionary(field.type)
+    }
+    try:
+        rows = 0
+        with writer:
+            for batch in iter_report_batches(csv_path, report, batch_size=batch_size):
+                arrays = [
+                    (
+                        encoders[field.name].encode(batch[field.name])
+                        if field.name in encoders
+                        else pa.array(batch[field.name], field.type)
+                    )
+                    for field in schema
+                ]
+                writer.write_batch(pa.record_batch(arrays, schema=schema))
+                rows += len(arrays[0]) if arrays else 0
+        os.replace(tmp, output_path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    logger.info("Wrote %d rows to %s", rows, output_path)
+    return output_path
+
+
+def finish_download(
+    csv_path: Path,
+    final_path: Path,
+    output_format: OutputFormat,
+    report: ReportKind,
+) -> Path:
+    """
+    Turn a downloaded report CSV into the requested output_format. For "csv" csv_path is
+    returned as is; otherwise it is converted to final_path and removed.
+    """
+    if output_format == "csv":
+        return csv_path
+    convert_report(csv_path, final_path, output_format, report)
+    csv_path.unlink(missing_ok=True)
+    return final_path
@@ -0,0 +1,251 @@
+"""
+Offset index for random access into a saved report CSV.
+A sidecar file (<report>.csv.idx) maps each part number (+ franchise) to the byte offset and
+length of its row(s), sorted by key. A lookup binary-searches the sidecar through mmap, then
+seeks the CSV (also memory-mapped) and parses only the matching rows, typed as iter_report
+would. Opening is instant and resident memory stays at the pages touched, however large the
+report. The sidecar records the CSV's size and mtime and is rebuilt when they change.
+"""
+
+import csv
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Iterable, Mapping
+
+from revnext.delta import find_key_columns
+from revnext.logger import get_logger
+from revnext.parts.reports.reader import (
+    PARSERS,
+    ReportKind,
+    ReportRecord,
+    column_type,
+    record_type,
+)
+
+logger = get_logger(__name__)
+
+SUFFIX = ".idx"
+
+_MAGIC = b"RVNIDX1\n"
+# csv size, csv mtime_ns, entry count, header length.
+_HEADER = struct.Struct("<QQQQ")
+# key position in the key blob, key length, row offset in the CSV, row length.
+_ENTRY = struct.Struct("<QIQI")
+# Separates part number and franchise in a key; keys sort by part number first.
+_SEP = b"\x1f"
+
+
+def _key(part: str, franchise: str | None = None) -> bytes:
+    key = part.strip().upper().encode("utf-8") + _SEP
+    if franchise is not None:
+        key += franchise.strip().upper().encode("utf-8")
+    return key
+
+
+def _rows(data: mmap.mmap, start: int):
+    """Yield (offset, length) of each CSV row from start, keeping quoted newlines in the row."""
+    pos, size = start, len(data)
+    while pos < size:
+        end = pos
+        quotes = 0
+        while True:
+            nl = data.find(b"\n", end)
+            stop = size if nl == -1 else nl + 1
+            quotes += data[end:stop].count(b'"')
+            end = stop
+            if quotes % 2 == 0 or end >= size:
+                break
+        yield pos, end - pos
+        pos = end
+
+
+def _parse_row(raw: bytes) -> list[str]:
+    return next(csv.reader([raw.decode("utf-8")]), [])
+
+
+def build_offset_index(
+    csv_path: Path | str,
+    index_path: Path | str | None = None,
+    *,
+    key_columns: tuple[str, str] | None = None,
+) -> Path:
+    """
+    Write the offset index of a report CSV (default <csv_path>.idx; temp file renamed into
+    place). key_columns is (franchise, part number), found from the header by default.
+    Returns the index path.
+    """
+    csv_path = Path(csv_path)
+    index_path = (
+        Path(index_path) if index_path else csv_path.with_name(csv_path.name + SUFFIX)
+    )
+    stat = csv_path.stat()
+    entries: list[tuple[bytes, int, int]] = []
+    header_length = 0
+    if stat.st_size:
+        with (
+            open(csv_path, "rb") as f,
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data,
+        ):
+            start = 3 if data[:3] == b"\xef\xbb\xbf" else 0
+            rows = _rows(data, start)
+            first = next(rows, None)
+            if first is not None:
+                header = _parse_row(data[first[0] : first[0] + first[1]])
+                header_length = first[0] + first[1]
+                franchise_col, part_col = key_columns or find_key_columns(header)
+                franchise_i, part_i = (
+                    header.index(franchise_col),
+                    header.index(part_col),
+                )
+                width = max(franchise_i, part_i) + 1
+                for offset, length in rows:
+                    row = _parse_row(data[offset : offset + length])
+                    if len(row) < width or not row[part_i].strip():
+                        continue
+                    entries.append(
+                        (_key(row[part_i], row[franchise_i]), offset, length)
+                    )
+    entries.sort()
+    blob = bytearray()
+    packed = bytearray()
+    for key, offset, length in entries:
+        packed += _ENTRY.pack(len(blob), len(key), offset, length)
+        blob += key
+    tmp = index_path.with_name(f"{index_path.name}.tmp")
+    try:
+        with open(tmp, "wb") as out:
+            out.write(_MAGIC)
+            out.write(
+                _HEADER.pack(
+                    stat.st_size, stat.st_mtime_ns, len(entries), header_length
+                )
+            )
+            out.write(packed)
+            out.write(blob)
+        os.replace(tmp, index_path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    logger.info("Indexed %d rows of %s", len(entries), csv_path)
+    return index_path
+
+
+class ReportOffsetIndex:
+    """
+    Random access to the rows of a report CSV by part number, through its offset index
+    (built, or rebuilt when the CSV changed, on open). report and schema type the returned
+    records as in iter_report. Use as a context manager, or call close().
+    """
+
+    def __init__(
+        self,
+        csv_path: Path | str,
+        report: ReportKind | None = None,
+        *,
+        index_path: Path | str | None = None,
+        schema: Mapping[str, str] | None = None,
+        key_columns: tuple[str, str] | None = None,
+    ) -> None:
+        self.csv_path = Path(csv_path)
+        self.index_path = (
+            Path(index_path)
+            if index_path
+            else self.csv_path.with_name(self.csv_path.name + SUFFIX)
+        )
+        if not self._current():
+            build_offset_index(self.csv_path, self.index_path, key_columns=key_columns)
+        self._index_file = open(self.index_path, "rb")
+        self._index = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        _, _, self._count, header_length = _HEADER.unpack_from(self._index, len(_MAGIC))
+        self._entries_at = len(_MAGIC) + _HEADER.size
+        self._blob_at = self._entries_at + self._count * _ENTRY.size
+        self._csv_file = open(self.csv_path, "rb")
+        self._csv = (
+            mmap.mmap(self._csv_file.fileno(), 0, access=mmap.ACCESS_READ)
+            if header_length
+            else b""
+        )
+        header = (
+            _parse_row(self._csv[:header_length].lstrip(b"\xef\xbb\xbf"))
+            if header_length
+            else []
+        )
+        self._record = record_type(header)
+        self._parsers = [PARSERS[column_type(c, report, schema)] for c in header]
+
+    def _current(self) -> bool:
+        """Whether the index exists and matches the CSV's size and mtime."""
+        try:
+            with open(self.index_path, "rb") as f:
+                head = f.read(len(_MAGIC) + _HEADER.size)
+        except FileNotFoundError:
+            return False
+        if not head.startswith(_MAGIC) or len(head) < len(_MAGIC) + _HEADER.size:
+            return False
+        size, mtime_ns, _, _ = _HEADER.unpack_from(head, len(_MAGIC))
+        stat = self.csv_path.stat()
+        return (size, mtime_ns) == (stat.st_size, stat.st_mtime_ns)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _entry(self, i: int) -> tuple[bytes, int, int]:
+        key_pos, key_len, offset, length = _ENTRY.unpack_from(
+            self._index, self._entries_at + i * _ENTRY.size
+        )
+        start = self._blob_at + key_pos
+        return self._index[start : start + key_len], offset, length
+
+    def _lower_bound(self, key: bytes) -> int:
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._entry(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _record_at(self, offset: int, length: int) -> ReportRecord:
+        row = _parse_row(self._csv[offset : offset + length])
+        row = (row + [""] * len(self._parsers))[: len(self._parsers)]
+        return self._record(*(parse(cell) for parse, cell in zip(self._parsers, row)))
+
+    def get(self, part: str, franchise: str | None = None) -> list[ReportRecord]:
+        """
+        The typed rows for part number part (case-insensitive), in every franchise or only in
+        franchise. A part in several bins has several rows; no match is [].
+        """
+        key = _key(part, franchise)
+        exact = franchise is not None
+        records = []
+        for i in range(self._lower_bound(key), self._count):
+            entry_key, offset, length = self._entry(i)
+            if (entry_key != key) if exact else not entry_key.startswith(key):
+                break
+            records.append(self._record_at(offset, length))
+        return records
+
+    def get_many(
+        self, parts: Iterable[str], franchise: str | None = None
+    ) -> dict[str, list[ReportRecord]]:
+        """get for each part number: part -> its rows."""
+        return {part: self.get(part, franchise) for part in parts}
+
+    def __contains__(self, part: str) -> bool:
+        i = self._lower_bound(_key(part))
+        return i < self._count and self._entry(i)[0].startswith(_key(part))
+
+    def close(self) -> None:
+        if isinstance(self._csv, mmap.mmap):
+            self._csv.close()
+        self._csv_file.close()
+        self._index.close()
+        self._index_file.close()
+
+    def __enter__(self) -> "ReportOffsetIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -3,13 +3,23 @@ Download Parts By Bin Location CSV report from Revolution Next (*.revolutionnext
 Uses auto-login with session persistence (no manual cookie export).
 """
 
-from dataclasses import dataclass
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import Literal, Optional, Union
 
-from revnext.common import get_or_create_session, run_report_flow
+from revnext.cache import StaleReport
+from revnext.client import RevNextClient
+from revnext.common import ReportJob, run_report_job
 from revnext.config import RevNextConfig
+from revnext.parts.reports.columnar import (
+    OutputFormat,
+    finish_download,
+    output_paths,
+)
+from revnext.journal import params_key
+from revnext.retry import RetryPolicy
 
 SERVICE_OBJECT = "Revolution.Activity.IM.RPT.PartsByBinLocationPR"
 ACTIVITY_TAB_ID = "Nce9eac79_528b_4fc4_a294_b055a6dde16b"
@@ -248,6 +258,35 @@ def _build_submit_body(params: PartsByBinLocationParams) -> dict:
     }
 
 
+def build_parts_by_bin_job(
+    params: PartsByBinLocationParams,
+    output_path: Optional[Path | str] = None,
+    report_label: Optional[str] = None,
+) -> ReportJob:
+    """
+    Build a ReportJob for the Parts By Bin Location report, for use with run_report_job or
+    run_reports_async. output_path None means the job returns the CSV content as bytes.
+    """
+    label = report_label or (
+        f"Parts by Bin Location - {params.department}"
+        if params.department
+        else "Parts by Bin Location"
+    )
+
+    def get_body():
+        return _build_submit_body(params)
+
+    return ReportJob(
+        service_object=SERVICE_OBJECT,
+        activity_tab_id=ACTIVITY_TAB_ID,
+        get_submit_body=get_body,
+        output_path=Path(output_path) if output_path is not None else None,
+        report_label=label,
+        key=params_key(SERVICE_OBJECT, params),
+        params=asdict(params),
+    )
+
+
 def download_parts_by_bin_report(
     config: Optional[RevNextConfig] = None,
     output_path: Optional[Path | str] = None,
@@ -279,18 +318,20 @@ def download_parts_by_bin_report(
     max_polls: int = 60,
     poll_interval: float = 2,
     return_data: bool = False,
+    client: Optional[RevNextClient] = None,
     report_label: Optional[str] = None,
-    max_retries: int = 3,
-    retry_delay: float = 5,
-    max_report_attempts: int = 2,
-    report_retry_delay: float = 30,
-) -> Union[Path, bytes]:
+    retry_policy: Optional[RetryPolicy] = None,
+    refresh_cache: bool = False,
+    stale_while_revalidate: bool = False,
+    output_format: OutputFormat = "csv",
+) -> Union[Path, bytes, StaleReport]:
     """
     Run the Parts By Bin Location report. By default saves CSV to output_path and returns the Path.
     If return_data=True, returns the report content as bytes (no file saved); use e.g. pd.read_csv(io.BytesIO(data)).
 
     Args:
-        config: RevNext config. Defaults to RevNextConfig.from_env().
+        config: RevNext config. Defaults to RevNextConfig.from_env(). Ignored when client is given.
+        client: Shared RevNextClient (one session for many reports/threads). Defaults to RevNextClient(config), closed when done.
         output_path: Where to save the CSV when return_data=False. Defaults to current dir / Parts_By_Bin_Location.csv.
         base_url: Override base URL (otherwise from config).
         return_data: If True, do not save to file; return the CSV content as bytes.
@@ -315,18 +356,40 @@ def download_parts_by_bin_report(
         last_receipt_before: Last receipt before date (ISO date-time or None).
         print_average_cost: Include average cost in report.
         return_data: If True, return CSV bytes instead of saving to a file.
-        max_retries: Number of attempts per API request when response is empty/HTML/invalid JSON (default 3).
-        retry_delay: Seconds between retries (default 5).
+        retry_policy: Request/report retries, backoff and deadline. Defaults to client.config.retry.
+        refresh_cache: Generate the report even if client.cache holds a fresh copy (the new one is cached).
+        stale_while_revalidate: Return a StaleReport at once: the last cached copy (with its version
+            stamp) and a Future for the copy being regenerated in the background. Needs a shared
+            client (its background refresh outlives this call) with config.cache.
+        output_format: "csv" (default), "parquet" or "arrow": convert the downloaded CSV to a typed
+            columnar file (output_path with a .parquet / .arrow suffix) and return its Path. Needs
+            pyarrow; not with return_data or stale_while_revalidate.
+
+    Polls are scheduled from client.poll_history (past generation times of this report), starting at
+    poll_interval when there is no history yet. With a report cache configured (config.cache), the same
+    report and parameters run within the cache TTL return the cached copy at once.
     """
-    config = config or RevNextConfig.from_env()
-    base_url = base_url or config.base_url
+    if output_format != "csv" and (return_data or stale_while_revalidate):
+        raise ValueError(
+            "output_format='parquet' / 'arrow' writes a file; it cannot be combined with "
+            "return_data or stale_while_revalidate."
+        )
+    if stale_while_revalidate and client is None:
+        # A client made here would refresh on its own executor, so concurrent callers would
+        # not share one refresh per report, and nothing would close it.
+        raise ValueError(
+            "stale_while_revalidate needs a shared client (client=RevNextClient(config))."
+        )
     if return_data:
         out_path = None
     else:
-        out_path = (
-            Path(output_path)
-            if output_path is not None
-            else (Path.cwd() / "Parts_By_Bin_Location.csv")
+        out_path, final_path = output_paths(
+            (
+                Path(output_path)
+                if output_path is not None
+                else (Path.cwd() / "Parts_By_Bin_Location.csv")
+            ),
+            output_format,
         )
     params = report_params or PartsByBinLocationParams()
     kwargs = {
@@ -357,31 +420,35 @@ def download_parts_by_bin_report(
         params = PartsByBinLocationParams(
             **{k: v if v is not None else getattr(params, k) for k, v in kwargs.items()}
         )
-    session = get_or_create_session(config, SERVICE_OBJECT)
-
-    def get_body():
-        return _build_submit_body(params)
-
-    label = report_label or (
-        f"Parts by Bin Location - {params.department}"
-        if params.department
-        else "Parts by Bin Location"
-    )
-    return run_report_flow(
-        session,
-        SERVICE_OBJECT,
-        ACTIVITY_TAB_ID,
-        get_body,
-        base_url,
-        output_path=out_path,
-        max_polls=max_polls,
-        poll_interval=poll_interval,
-        report_label=label,
-        max_retries=max_retries,
-        retry_delay=retry_delay,
-        max_report_attempts=max_report_attempts,
-        report_retry_delay=report_retry_delay,
+    job = build_parts_by_bin_job(
+        params, output_path=out_path, report_label=report_label
     )
+    if stale_while_revalidate:
+        return client.run_report_stale(
+            job,
+            max_polls=max_polls,
+            poll_interval=poll_interval,
+            retry_policy=retry_policy or client.config.retry,
+        )
+    # A client made here is closed afterwards (session, journal, caches, snapshot store).
+    with nullcontext(client) if client is not None else RevNextClient(config) as client:
+        result = run_report_job(
+            client.session,
+            job,
+            base_url or client.base_url,
+            max_polls=max_polls,
+            poll_interval=poll_interval,
+            poll_history=client.poll_history,
+            retry_policy=retry_policy or client.config.retry,
+            journal=client.journal,
+            cache=client.cache,
+            refresh_cache=refresh_cache,
+            snapshots=client.snapshots,
+            cancel_event=client.cancel_event,
+        )
+    if out_path is None:
+        return result
+    return finish_download(result, final_path, output_format, "parts_by_bin")
 
 
 if __name__ == "__main__":
@@ -3,15 +3,29 @@ Download Parts Price List CSV report from Revolution Next (*.revolutionnext.com.
 Uses auto-login with session persistence (no manual cookie export).
 """
 
-from dataclasses import dataclass
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import Literal, Optional, Union
 
 import requests
 
-from revnext.common import get_or_create_session, run_report_flow
+from revnext.cache import StaleReport
+from revnext.client import RevNextClient
+from revnext.common import (
+    ReportJob,
+    _service_headers,
+    run_report_job,
+)
 from revnext.config import RevNextConfig
+from revnext.parts.reports.columnar import (
+    OutputFormat,
+    finish_download,
+    output_paths,
+)
+from revnext.journal import params_key
+from revnext.retry import RetryPolicy
 
 SERVICE_OBJECT = "Revolution.Activity.IM.RPT.PartsPriceListPR"
 ACTIVITY_TAB_ID = "N78b54de4_7cdc_43e0_9e42_71a49bec44f2"
@@ -241,12 +255,56 @@ def _post_submit_closesubmit_factory(
             ],
             "uiType": "ISC",
         }
-        r = session.post(url, json=body)
+        r = session.post(url, json=body, headers=_service_headers(SERVICE_OBJECT))
         r.raise_for_status()
 
     return _post_submit_closesubmit
 
 
+def _validate_params(params: PartsPriceListParams) -> None:
+    """Raise ValueError if no price type is selected (the server rejects the report)."""
+    if not (params.price_1 or "").strip() and not (params.price_2 or "").strip():
+        raise ValueError(
+            "You must select at least one price type to print a price listing. "
+            "Set price_1 and/or price_2 (e.g. price_1='L', price_2='S', or price_1='F', price_2='O')."
+        )
+
+
+def build_parts_price_list_job(
+    params: PartsPriceListParams,
+    base_url: str,
+    output_path: Optional[Path | str] = None,
+    report_label: Optional[str] = None,
+) -> ReportJob:
+    """
+    Build a ReportJob for the Parts Price List report, for use with run_report_job or
+    run_reports_async. base_url is needed for the onChoose_btn_closesubmit hook.
+    output_path None means the job returns the CSV content as bytes.
+    """
+    _validate_params(params)
+    label = report_label or (
+        f"Parts Price List - {params.department}"
+        if params.department
+        else "Parts Price List"
+    )
+
+    def get_body():
+        return _build_submit_body(params)
+
+    return ReportJob(
+        service_object=SERVICE_OBJECT,
+        activity_tab_id=ACTIVITY_TAB_ID,
+        get_submit_body=get_body,
+        output_path=Path(output_path) if output_path is not None else None,
+        post_submit_hook=_post_submit_closesubmit_factory(
+            base_url, params.company, params.division, params.department
+        ),
+        report_label=label,
+        key=params_key(SERVICE_OBJECT, params),
+        params=asdict(params),
+    )
+
+
 def download_parts_price_list_report(
     config: Optional[RevNextConfig] = None,
     output_path: Optional[Path | str] = None,
@@ -268,18 +326,20 @@ def download_parts_price_list_report(
     max_polls: int = 60,
     poll_interval: float = 2,
     return_data: bool = False,
+    client: Optional[RevNextClient] = None,
     report_label: Optional[str] = None,
-    max_retries: int = 3,
-    retry_delay: float = 5,
-    max_report_attempts: int = 2,
-    report_retry_delay: float = 30,
-) -> Union[Path, bytes]:
+    retry_policy: Optional[RetryPolicy] = None,
+    refresh_cache: bool = False,
+    stale_while_revalidate: bool = False,
+    output_format: OutputFormat = "csv",
+) -> Union[Path, bytes, StaleReport]:
     """
     Run the Parts Price List report. By default saves CSV to output_path and returns the Path.
     If return_data=True, returns the report content as bytes (no file saved); use e.g. pd.read_csv(io.BytesIO(data)).
 
     Args:
-        config: RevNext config. Defaults to RevNextConfig.from_env().
+        config: RevNext config. Defaults to RevNextConfig.from_env(). Ignored when client is given.
+        client: Shared RevNextClient (one session for many reports/threads). Defaults to RevNextClient(config), closed when done.
         output_path: Where to save the CSV when return_data=False. Defaults to current dir / Parts_Price_List.csv.
         base_url: Override base URL (otherwise from config).
         return_data: If True, do not save to file; return the CSV content as bytes.
@@ -297,18 +357,40 @@ def download_parts_price_list_report(
         price_2: Price 2 API code (e.g. "S" Stock, "R", "ST"). Default "S".
         include_gst_2: Include GST for price 2. Default True.
         return_data: If True, return CSV bytes instead of saving to a file.
-        max_retries: Number of attempts per API request when response is empty/HTML/invalid JSON (default 3).
-        retry_delay: Seconds between retries (default 5).
+        retry_policy: Request/report retries, backoff and deadline. Defaults to client.config.retry.
+        refresh_cache: Generate the report even if client.cache holds a fresh copy (the new one is cached).
+        stale_while_revalidate: Return a StaleReport at once: the last cached copy (with its version
+            stamp) and a Future for the copy being regenerated in the background. Needs a shared
+            client (its background refresh outlives this call) with config.cache.
+        output_format: "csv" (default), "parquet" or "arrow": convert the downloaded CSV to a typed
+            columnar file (output_path with a .parquet / .arrow suffix) and return its Path. Needs
+            pyarrow; not with return_data or stale_while_revalidate.
+
+    Polls are scheduled from client.poll_history (past generation times of this report), starting at
+    poll_interval when there is no history yet. With a report cache configured (config.cache), the same
+    report and parameters run within the cache TTL return the cached copy at once.
     """
-    config = config or RevNextConfig.from_env()
-    base_url = base_url or config.base_url
+    if output_format != "csv" and (return_data or stale_while_revalidate):
+        raise ValueError(
+            "output_format='parquet' / 'arrow' writes a file; it cannot be combined with "
+            "return_data or stale_while_revalidate."
+        )
+    if stale_while_revalidate and client is None:
+        # A client made here would refresh on its own executor, so concurrent callers would
+        # not share one refresh per report, and nothing would close it.
+        raise ValueError(
+            "stale_while_revalidate needs a shared client (client=RevNextClient(config))."
+        )
     if return_data:
         out_path = None
     else:
-        out_path = (
-            Path(output_path)
-            if output_path is not None
-            else (Path.cwd() / "Parts_Price_List.csv")
+        out_path, final_path = output_paths(
+            (
+                Path(output_path)
+                if output_path is not None
+                else (Path.cwd() / "Parts_Price_List.csv")
+            ),
+            output_format,
         )
     params = report_params or PartsPriceListParams()
     if any(
@@ -350,39 +432,36 @@ def download_parts_price_list_report(
             if include_gst_2 is not None
             else params.include_gst_2,
         )
-    if not (params.price_1 or "").strip() and not (params.price_2 or "").strip():
-        raise ValueError(
-            "You must select at least one price type to print a price listing. "
-            "Set price_1 and/or price_2 (e.g. price_1='L', price_2='S', or price_1='F', price_2='O')."
+    # A client made here is closed afterwards (session, journal, caches, snapshot store).
+    with nullcontext(client) if client is not None else RevNextClient(config) as client:
+        base_url = base_url or client.base_url
+        job = build_parts_price_list_job(
+            params, base_url, output_path=out_path, report_label=report_label
         )
-    session = get_or_create_session(config, SERVICE_OBJECT)
-
-    def get_body():
-        return _build_submit_body(params)
-
-    label = report_label or (
-        f"Parts Price List - {params.department}"
-        if params.department
-        else "Parts Price List"
-    )
-    return run_report_flow(
-        session,
-        SERVICE_OBJECT,
-        ACTIVITY_TAB_ID,
-        get_body,
-        base_url,
-        output_path=out_path,
-        post_submit_hook=_post_submit_closesubmit_factory(
-            base_url, params.company, params.division, params.department
-        ),
-        max_polls=max_polls,
-        poll_interval=poll_interval,
-        report_label=label,
-        max_retries=max_retries,
-        retry_delay=retry_delay,
-        max_report_attempts=max_report_attempts,
-        report_retry_delay=report_retry_delay,
-    )
+        if stale_while_revalidate:
+            return client.run_report_stale(
+                job,
+                max_polls=max_polls,
+                poll_interval=poll_interval,
+                retry_policy=retry_policy or client.config.retry,
+            )
+        result = run_report_job(
+            client.session,
+            job,
+            base_url,
+            max_polls=max_polls,
+            poll_interval=poll_interval,
+            poll_history=client.poll_history,
+            retry_policy=retry_policy or client.config.retry,
+            journal=client.journal,
+            cache=client.cache,
+            refresh_cache=refresh_cache,
+            snapshots=client.snapshots,
+            cancel_event=client.cancel_event,
+        )
+    if out_path is None:
+        return result
+    return finish_download(result, final_path, output_format, "parts_price_list")
 
 
 if __name__ == "__main__":
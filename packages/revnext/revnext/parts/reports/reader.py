@@ -0,0 +1,302 @@
+"""
+Typed streaming reader for the report CSVs saved by revnext.parts.reports.
+Each column gets a type from the report schema (by header name, ignoring case, spaces and
+punctuation): "str", "int", "float" or "date". Numbers may carry thousand separators, a
+currency sign and a leading or trailing minus or parentheses ("1,234.50", "$12.00",
+"(3.00)", "3.00-"); dates may be dd/mm/yyyy (as RevNext prints them) or ISO. Blank cells are
+None. Rows are yielded one at a time as compact __slots__ records (iter_report) or as column
+batches (iter_report_batches), so a multi-department file is never loaded whole.
+"""
+
+import csv
+import itertools
+import keyword
+import re
+from datetime import date, datetime
+from pathlib import Path
+from typing import IO, Callable, Iterator, Literal, Mapping, Sequence
+
+from revnext.columns import normalise_header
+
+ColumnType = Literal["str", "int", "float", "date"]
+ReportKind = Literal["parts_price_list", "parts_by_bin"]
+
+# Columns shared by both reports.
+_COMMON_SCHEMA: dict[str, ColumnType] = {
+    "franchise": "str",
+    "partnumber": "str",
+    "partno": "str",
+    "part": "str",
+    "description": "str",
+    "partdescription": "str",
+    "bin": "str",
+    "binlocation": "str",
+    "alternatebin": "str",
+    "department": "str",
+    "supplier": "str",
+    "movementcode": "str",
+    "stockonhand": "float",
+    "soh": "float",
+    "onhand": "float",
+    "onorder": "float",
+    "available": "float",
+    "availablestock": "float",
+    "physicalstock": "float",
+    "averagecost": "float",
+    "lastsale": "date",
+    "lastsaledate": "date",
+    "lastreceipt": "date",
+    "lastreceiptdate": "date",
+}
+
+SCHEMAS: dict[str, dict[str, ColumnType]] = {
+    "parts_price_list": {
+        **_COMMON_SCHEMA,
+        "listprice": "float",
+        "stockprice": "float",
+        "price1": "float",
+        "price2": "float",
+        "packsize": "int",
+    },
+    "parts_by_bin": {
+        **_COMMON_SCHEMA,
+        "minimum": "float",
+        "maximum": "float",
+        "value": "float",
+    },
+}
+
+# Columns not in the schema are typed by the last word of their header ("Last Sale Date",
+# "Trade Price 2"; "on hand" / "on order" count as one word), first match wins; anything else
+# stays a string, so "Price Code" or "LastUpdatedBy" are not parsed as numbers or dates.
+_KEYWORD_TYPES: tuple[tuple[str, ColumnType], ...] = (
+    ("date", "date"),
+    ("price", "float"),
+    ("cost", "float"),
+    ("value", "float"),
+    ("amount", "float"),
+    ("qty", "float"),
+    ("quantity", "float"),
+    ("onhand", "float"),
+    ("onorder", "float"),
+)
+
+# Rows per column batch.
+DEFAULT_BATCH_SIZE = 10_000
+
+_NUMBER_JUNK = re.compile(r"[,$\s]")
+_HEADER_WORDS = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+_DATE_FORMATS = ("%d/%m/%Y", "%Y-%m-%d", "%d/%m/%y", "%d-%m-%Y", "%d-%b-%Y")
+
+# Cells the exports use for "no value" in numeric and date columns; read as blank.
+_PLACEHOLDERS = frozenset({"-", "N/A"})
+
+
+def _clean_number(text: str) -> str | None:
+    text = _NUMBER_JUNK.sub("", text)
+    if not text or text.upper() in _PLACEHOLDERS:
+        return None
+    if text.startswith("(") and text.endswith(")"):
+        return "-" + text[1:-1]
+    if text.endswith("-"):
+        return "-" + text[:-1]
+    return text
+
+
+def parse_float(text: str) -> float | None:
+    """
+    A numeric cell such as "1,234.50", "$12", "(3.00)" or "3.00-"; None for a blank cell, "-"
+    or "N/A".
+    """
+    cleaned = _clean_number(text)
+    return None if cleaned is None else float(cleaned)
+
+
+def parse_int(text: str) -> int | None:
+    """An integer cell (thousand separators allowed; "12.00" is 12); None for blank, "-", "N/A"."""
+    cleaned = _clean_number(text)
+    if cleaned is None:
+        return None
+    try:
+        return int(cleaned)
+    except ValueError:
+        return int(float(cleaned))
+
+
+def parse_date(text: str) -> date | None:
+    """A dd/mm/yyyy or ISO date (a time part is dropped); None for blank, "-" or "N/A"."""
+    text = text.strip()
+    if not text or text.upper() in _PLACEHOLDERS:
+        return None
+    head = text.split("T", 1)[0].split(" ", 1)[0]
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(head, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date {text!r}")
+
+
+def parse_str(text: str) -> str | None:
+    text = text.strip()
+    return text or None
+
+
+PARSERS: dict[str, Callable[[str], object]] = {
+    "str": parse_str,
+    "int": parse_int,
+    "float": parse_float,
+    "date": parse_date,
+}
+
+
+def column_type(
+    name: str, report: ReportKind | None = None, schema: Mapping[str, str] | None = None
+) -> ColumnType:
+    """The type of column name: schema override, then the report schema, then keyword rules."""
+    if schema and name in schema:
+        return schema[name]
+    normalised = normalise_header(name)
+    known = (
+        SCHEMAS.get(report)
+        if report
+        else {**SCHEMAS["parts_by_bin"], **SCHEMAS["parts_price_list"]}
+    )
+    if normalised in known:
+        return known[normalised]
+    words = [w.lower() for w in _HEADER_WORDS.findall(name) if not w.isdigit()]
+    last = {words[-1], "".join(words[-2:])} if words else set()
+    for word, kind in _KEYWORD_TYPES:
+        if word in last:
+            return kind
+    return "str"
+
+
+def field_name(header: str) -> str:
+    """Python attribute name for a CSV header ("Part Number" -> "part_number")."""
+    name = re.sub(r"\W+", "_", header.strip().lower()).strip("_") or "column"
+    if name[0].isdigit() or keyword.iskeyword(name):
+        name = "_" + name
+    return name
+
+
+class ReportRecord:
+    """
+    Base class of the per-header record types built by record_type: one __slots__ attribute
+    per column, so a record costs no per-instance dict.
+    """
+
+    __slots__ = ()
+    _fields: tuple[str, ...] = ()
+
+    def __init__(self, *values) -> None:
+        for name, value in zip(self._fields, values):
+            object.__setattr__(self, name, value)
+
+    def __iter__(self):
+        return (getattr(self, name) for name in self._fields)
+
+    def __eq__(self, other) -> bool:
+        return type(other) is type(self) and tuple(self) == tuple(other)
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{n}={getattr(self, n)!r}" for n in self._fields)
+        return f"{type(self).__name__}({values})"
+
+    def _asdict(self) -> dict:
+        return dict(zip(self._fields, self))
+
+
+def record_type(header: Sequence[str], name: str = "ReportRow") -> type[ReportRecord]:
+    """A ReportRecord subclass with one slot per header column (names from field_name)."""
+    fields: list[str] = []
+    for column in header:
+        base = field_name(column)
+        candidate = base
+        for n in itertools.count(2):
+            if candidate not in fields:
+                break
+            candidate = f"{base}_{n}"
+        fields.append(candidate)
+    return type(
+        name, (ReportRecord,), {"__slots__": tuple(fields), "_fields": tuple(fields)}
+    )
+
+
+def _open(source: Path | str | IO[str]):
+    if isinstance(source, (str, Path)):
+        return open(source, encoding="utf-8-sig", newline="")
+    return source
+
+
+def _typed_rows(
+    source: Path | str | IO[str],
+    report: ReportKind | None,
+    schema: Mapping[str, str] | None,
+) -> Iterator[tuple[list[str], list]]:
+    """Yield (header, parsed values) for every row; values are typed per column_type."""
+    f = _open(source)
+    try:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        parsers = [PARSERS[column_type(c, report, schema)] for c in header]
+        width = len(header)
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            row = (row + [""] * width)[:width]
+            try:
+                yield header, [parse(cell) for parse, cell in zip(parsers, row)]
+            except ValueError as e:
+                raise ValueError(f"Line {reader.line_num}: {e}") from e
+    finally:
+        if f is not source:
+            f.close()
+
+
+def iter_report(
+    source: Path | str | IO[str],
+    report: ReportKind | None = None,
+    *,
+    schema: Mapping[str, str] | None = None,
+) -> Iterator[ReportRecord]:
+    """
+    Yield one typed record per row of a report CSV (path or open text file). report selects
+    the schema ("parts_price_list" or "parts_by_bin"; None tries both); schema maps header
+    names to "str" / "int" / "float" / "date" to override it. Records have one attribute per
+    column named by field_name (e.g. record.part_number), and _asdict().
+    Raises ValueError with the line number for a cell that does not parse as its type.
+    """
+    record = None
+    for header, values in _typed_rows(source, report, schema):
+        if record is None:
+            record = record_type(header)
+        yield record(*values)
+
+
+def iter_report_batches(
+    source: Path | str | IO[str],
+    report: ReportKind | None = None,
+    *,
+    schema: Mapping[str, str] | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[dict[str, list]]:
+    """
+    Yield the report as column batches: dicts of field_name -> list of up to batch_size typed
+    values (e.g. for pandas.DataFrame(batch) or pyarrow.table(batch)). Arguments as iter_report.
+    """
+    names: list[str] | None = None
+    columns: list[list] = []
+    for header, values in _typed_rows(source, report, schema):
+        if names is None:
+            names = list(record_type(header)._fields)
+            columns = [[] for _ in names]
+        for column, value in zip(columns, values):
+            column.append(value)
+        if len(columns[0]) >= batch_size:
+            yield dict(zip(names, columns))
+            columns = [[] for _ in names]
+    if names is not None and columns[0]:
+        yield dict(zip(names, columns))
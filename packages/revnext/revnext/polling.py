@@ -0,0 +1,143 @@
+"""
+Adaptive polling for report tasks.
+PollHistory keeps recent generation times per report type (service object + department),
+optionally persisted to a JSON file. PollPlan uses it to schedule the first autoPollResponse near
+the expected completion time, then backs off with jitter so concurrent reports do not poll in
+lockstep.
+"""
+
+import json
+import random
+import statistics
+import threading
+import time
+from pathlib import Path
+
+from revnext.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Samples kept per report type; the expected duration is their median.
+MAX_SAMPLES = 20
+
+# Fraction of the expected duration to wait before the first poll.
+FIRST_POLL_FRACTION = 0.9
+
+
+def history_key(service_object: str, body: dict) -> str:
+    """History key for a report: service object plus the department from the submit body."""
+    return f"{service_object}|{body.get('_userContext_vg_dftdpt', '')}"
+
+
+class PollHistory:
+    """
+    Recent report generation durations (seconds) per history_key. Thread-safe.
+    With a path, samples are loaded from and saved to that JSON file; with None, in memory only.
+    """
+
+    def __init__(self, path: Path | str | None = None) -> None:
+        self.path = Path(path) if path is not None else None
+        self._lock = threading.Lock()
+        self._samples: dict[str, list[float]] = self._load()
+
+    def _load(self) -> dict[str, list[float]]:
+        if self.path is None or not self.path.exists():
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning("Ignoring unreadable poll history %s: %s", self.path, e)
+            return {}
+        return {
+            k: [float(x) for x in v][-MAX_SAMPLES:]
+            for k, v in data.items()
+            if isinstance(v, list)
+        }
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._samples, f, indent=2)
+        tmp.replace(self.path)
+
+    def expected_duration(self, key: str) -> float | None:
+        """Median of recent durations for key, or None if there is no history yet."""
+        with self._lock:
+            samples = self._samples.get(key)
+            return statistics.median(samples) if samples else None
+
+    def record(self, key: str, seconds: float) -> None:
+        """Add one observed generation duration for key and persist it."""
+        with self._lock:
+            samples = self._samples.setdefault(key, [])
+            samples.append(round(seconds, 1))
+            del samples[:-MAX_SAMPLES]
+            try:
+                self._save()
+            except OSError as e:
+                logger.warning("Could not save poll history %s: %s", self.path, e)
+
+
+class PollPlan:
+    """
+    Poll schedule for one submitted task. The first delay lands at FIRST_POLL_FRACTION of the
+    expected remaining time (never less than poll_interval); later delays start at
+    poll_interval and grow by backoff up to max_poll_interval. Every delay gets ±jitter.
+    """
+
+    def __init__(
+        self,
+        history: PollHistory | None,
+        key: str,
+        submitted_at: float,
+        *,
+        poll_interval: float = 2,
+        max_poll_interval: float = 30,
+        backoff: float = 1.5,
+        jitter: float = 0.1,
+    ) -> None:
+        self.history = history
+        self.key = key
+        self.submitted_at = submitted_at
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max(max_poll_interval, poll_interval)
+        self.backoff = backoff
+        self.jitter = jitter
+        self.expected = history.expected_duration(key) if history else None
+        self._next_interval: float | None = None
+
+    def elapsed(self) -> float:
+        return max(0.0, time.time() - self.submitted_at)
+
+    def next_delay(self) -> float:
+        """Seconds to wait before the next poll."""
+        if self._next_interval is None:
+            delay = self.poll_interval
+            if self.expected is not None:
+                remaining = self.expected - self.elapsed()
+                delay = max(delay, remaining * FIRST_POLL_FRACTION)
+            self._next_interval = self.poll_interval
+        else:
+            delay = self._next_interval
+            self._next_interval = min(
+                self.max_poll_interval, self._next_interval * self.backoff
+            )
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def eta_text(self) -> str:
+        """Progress suffix such as " (expected ~95s more)", or "" without history."""
+        if self.expected is None:
+            return ""
+        remaining = self.expected - self.elapsed()
+        if remaining < 1:
+            return f" (taking longer than the usual {self.expected:.0f}s)"
+        return f" (expected ~{remaining:.0f}s more)"
+
+    def complete(self) -> None:
+        """Record the task's total generation time in the history."""
+        if self.history is not None:
+            self.history.record(self.key, self.elapsed())
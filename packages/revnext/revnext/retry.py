@@ -0,0 +1,69 @@
+"""
+Retry policy for Revolution Next API calls and report flows.
+RetryPolicy sets how often a failed request (submit, poll, loadData, download) or a whole report
+is retried, with exponential backoff, jitter, per-step overrides and an overall deadline.
+Which failures are retried at all is decided by revnext.common (login page, 4xx, 5xx, ...).
+"""
+
+import os
+import random
+import time
+from dataclasses import dataclass, field, replace
+from typing import Mapping
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Retry settings. Request delays grow as initial_delay * backoff ** (attempt - 1), capped at
+    max_delay; full report attempts wait report_delay, growing the same way. Every delay gets
+    ±jitter (fraction). deadline (seconds) bounds one whole report, retries included.
+    steps overrides fields per step name ("submitActivityTask", "poll", "loadData", "download"),
+    e.g. RetryPolicy(steps={"download": {"max_attempts": 5}}).
+    """
+
+    # Attempts per API request (1 = no retries).
+    max_attempts: int = 3
+    initial_delay: float = 2.0
+    max_delay: float = 30.0
+    backoff: float = 2.0
+    jitter: float = 0.2
+    # Full submit → download attempts per report, and the wait before the second one.
+    report_attempts: int = 2
+    report_delay: float = 30.0
+    # Seconds one report may take in total, retries included; None for no limit.
+    deadline: float | None = None
+    steps: Mapping[str, Mapping[str, float]] = field(default_factory=dict)
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        """Env: REVNEXT_RETRY_ATTEMPTS, REVNEXT_RETRY_DELAY, REVNEXT_RETRY_MAX_DELAY, REVNEXT_REPORT_ATTEMPTS, REVNEXT_REPORT_DEADLINE."""
+        deadline = os.getenv("REVNEXT_REPORT_DEADLINE")
+        return cls(
+            max_attempts=int(os.getenv("REVNEXT_RETRY_ATTEMPTS") or 3),
+            initial_delay=float(os.getenv("REVNEXT_RETRY_DELAY") or 2.0),
+            max_delay=float(os.getenv("REVNEXT_RETRY_MAX_DELAY") or 30.0),
+            report_attempts=int(os.getenv("REVNEXT_REPORT_ATTEMPTS") or 2),
+            deadline=float(deadline) if deadline else None,
+        )
+
+    def for_step(self, step_name: str) -> "RetryPolicy":
+        """This policy with the overrides for step_name applied."""
+        overrides = self.steps.get(step_name)
+        return replace(self, **overrides) if overrides else self
+
+    def _jittered(self, delay: float) -> float:
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait after failed request attempt number attempt (1-based)."""
+        base = self.initial_delay * self.backoff ** (attempt - 1)
+        return self._jittered(min(self.max_delay, base))
+
+    def report_retry_delay(self, attempt: int) -> float:
+        """Seconds to wait after failed full report attempt number attempt (1-based)."""
+        return self._jittered(self.report_delay * self.backoff ** (attempt - 1))
+
+    def deadline_at(self) -> float | None:
+        """time.monotonic() value at which a report started now runs out of time, or None."""
+        return time.monotonic() + self.deadline if self.deadline is not None else None
@@ -4,13 +4,143 @@ Login via j_spring_security_check; persist cookies to disk; validate before use
 """
 
 import re
+import threading
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable
 from urllib.parse import urljoin
 
 import requests
+from requests.adapters import HTTPAdapter
 
-from revnext.common import _common_headers
-from revnext.config import RevNextConfig
+from revnext.common import _common_headers, _is_login_page
+from revnext.config import PoolSettings, RevNextConfig
+
+
+class RevNextSession(requests.Session):
+    """
+    requests.Session that can recover from a session that expires mid-flow. When
+    on_session_expired is set and a response is the RevNext login page (or HTTP 401),
+    the callback is called with (session, response); if it returns True (it has logged in
+    again), the request is sent once more and that response is returned instead.
+    Requests made by the callback itself (the login) are never intercepted.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.on_session_expired: (
+            Callable[[requests.Session, requests.Response], bool] | None
+        ) = None
+        self._local = threading.local()
+
+    def request(self, method, url, *args, **kwargs) -> requests.Response:
+        response = super().request(method, url, *args, **kwargs)
+        callback = self.on_session_expired
+        if (
+            callback is None
+            or getattr(self._local, "reauthenticating", False)
+            or not _is_expired_response(response)
+        ):
+            return response
+        self._local.reauthenticating = True
+        try:
+            replay = callback(self, response)
+        finally:
+            self._local.reauthenticating = False
+        if not replay:
+            return response
+        response.close()
+        return super().request(method, url, *args, **kwargs)
+
+
+def _is_expired_response(response: requests.Response) -> bool:
+    """
+    True for HTTP 401 or an HTML response that is the login form. Any other 403 is a permission
+    error: logging in again would not fix it.
+    """
+    if response.status_code == 401:
+        return True
+    if "html" not in response.headers.get("Content-Type", "").lower():
+        return False
+    return _is_login_page(response.text)
+
+
+def request_cookie(response: requests.Response) -> str | None:
+    """Cookie header the request behind response was first sent with (before any redirect)."""
+    first = response.history[0] if response.history else response
+    return first.request.headers.get("Cookie")
+
+
+def current_cookie(session: requests.Session, request: requests.PreparedRequest) -> str:
+    """Cookie header the session would send for request now."""
+    if session.headers.get("cookie"):
+        return session.headers["cookie"]
+    probe = request.copy()
+    probe.headers.pop("Cookie", None)
+    return requests.cookies.get_cookie_header(session.cookies, probe)
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    """
+    Connection pool counters for a session, summed over all hosts it has talked to.
+    connections_opened counts pooled connection objects; with keep_alive=False each request
+    reconnects on the same object, so reused is only meaningful with keep-alive on.
+    """
+
+    requests: int
+    connections_opened: int
+    idle_connections: int
+
+    @property
+    def reused(self) -> int:
+        """Requests served on an already-open (kept-alive) connection."""
+        return max(0, self.requests - self.connections_opened)
+
+
+def create_session(base_url: str, pool: PoolSettings | None = None) -> requests.Session:
+    """
+    New RevNextSession with common headers and an HTTPAdapter sized by pool settings
+    (default PoolSettings(): requests' own defaults of 10 connections per host, non-blocking).
+    """
+    pool = pool or PoolSettings()
+    session = RevNextSession()
+    adapter = HTTPAdapter(
+        pool_connections=pool.pool_connections,
+        pool_maxsize=pool.pool_maxsize,
+        pool_block=pool.pool_block,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(_common_headers(base_url))
+    if not pool.keep_alive:
+        session.headers["Connection"] = "close"
+    return session
+
+
+def get_pool_stats(session: requests.Session) -> PoolStats:
+    """
+    Read urllib3 pool counters from the session's adapters: total requests, new connections
+    opened, and idle connections currently kept alive. Use to size PoolSettings.pool_maxsize.
+    """
+    total_requests = opened = idle = 0
+    seen: set[int] = set()
+    for adapter in session.adapters.values():
+        if not isinstance(adapter, HTTPAdapter) or id(adapter) in seen:
+            continue
+        seen.add(id(adapter))
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            conn_pool = pools.get(key)
+            if conn_pool is None:
+                continue
+            total_requests += conn_pool.num_requests
+            opened += conn_pool.num_connections
+            if conn_pool.pool is not None:
+                idle += sum(1 for conn in list(conn_pool.pool.queue) if conn)
+    return PoolStats(
+        requests=total_requests, connections_opened=opened, idle_connections=idle
+    )
 
 
 def _login_page_url(base_url: str) -> str:
@@ -48,14 +178,10 @@ def _extract_csrf(html: str) -> str | None:
     return None
 
 
-def login(base_url: str, username: str, password: str) -> requests.Session:
-    """
-    Log in to Revolution Next: GET login page for CSRF and session cookie, POST to j_spring_security_check.
-    Returns a requests.Session with auth cookies set.
-    """
-    session = requests.Session()
-    session.headers.update(_common_headers(base_url))
-
+def _login_into(
+    session: requests.Session, base_url: str, username: str, password: str
+) -> None:
+    """GET the login page for CSRF and session cookie, then POST to j_spring_security_check."""
     login_url = _login_page_url(base_url)
     r = session.get(login_url, timeout=30, allow_redirects=True)
     r.raise_for_status()
@@ -82,12 +208,32 @@ def login(base_url: str, username: str, password: str) -> requests.Session:
         raise ValueError(
             "Login failed: still on login page after POST (check username/password)."
         )
+
+
+def login(
+    base_url: str,
+    username: str,
+    password: str,
+    pool: PoolSettings | None = None,
+) -> requests.Session:
+    """
+    Log in to Revolution Next: GET login page for CSRF and session cookie, POST to j_spring_security_check.
+    Returns a requests.Session with auth cookies set and its connection pool sized by pool.
+    """
+    session = create_session(base_url, pool)
+    _login_into(session, base_url, username, password)
     return session
 
 
-def _is_login_page(html: str) -> bool:
-    """True if the response body looks like the login form."""
-    return "sign in to REVOLUTIONnext" in html or 'name="j_username"' in html
+def relogin(session: requests.Session, config: RevNextConfig) -> None:
+    """
+    Log in again on an existing session whose cookies have expired, keeping its connection
+    pool and headers, and save the new cookies to the session file.
+    """
+    session.headers.pop("cookie", None)
+    session.cookies.clear()
+    _login_into(session, config.base_url, config.username, config.password)
+    save_session(session, config.base_url, _session_path(config))
 
 
 def is_session_valid(session: requests.Session, base_url: str) -> bool:
@@ -129,9 +275,12 @@ def save_session(session: requests.Session, base_url: str, path: Path) -> None:
         json.dump(data, f, indent=2)
 
 
-def load_session(base_url: str, path: Path) -> requests.Session | None:
+def load_session(
+    base_url: str, path: Path, pool: PoolSettings | None = None
+) -> requests.Session | None:
     """
     Load a session from a previously saved JSON file. Returns None if file missing or invalid.
+    The session's connection pool is sized by pool.
     """
     from urllib.parse import urlparse
     import json
@@ -153,32 +302,35 @@ def load_session(base_url: str, path: Path) -> requests.Session | None:
         domain != want_domain and not want_domain.endswith("." + domain.lstrip("."))
     ):
         return None
-    session = requests.Session()
-    session.headers.update(_common_headers(base_url))
+    session = create_session(base_url, pool)
     session.headers["cookie"] = _cookie_header(
         [[n, v] for n, v in cookies if isinstance(n, str) and isinstance(v, str)]
     )
     return session
 
 
+def _session_path(config: RevNextConfig) -> Path:
+    return config.session_path or Path.cwd() / ".revnext-session.json"
+
+
 def get_or_create_session(
-    config: RevNextConfig, service_object: str
+    config: RevNextConfig, service_object: str | None = None
 ) -> requests.Session:
     """
     Return an authenticated session: load from config.session_path if present and valid,
     otherwise log in with config username/password, save session to disk, and return it.
-    Session has common headers and x-service-object set.
+    Session has common headers set, plus a default x-service-object header when service_object
+    is given. Library calls send x-service-object per request, so the default is only needed
+    for callers that post to the session directly.
     """
     config.validate()
     base_url = config.base_url
-    path = config.session_path or Path.cwd() / ".revnext-session.json"
+    path = _session_path(config)
 
-    session = load_session(base_url, path)
-    if session and is_session_valid(session, base_url):
+    session = load_session(base_url, path, config.pool)
+    if not (session and is_session_valid(session, base_url)):
+        session = login(base_url, config.username, config.password, config.pool)
+        save_session(session, base_url, path)
+    if service_object:
         session.headers["x-service-object"] = service_object
-        return session
-
-    session = login(base_url, config.username, config.password)
-    save_session(session, base_url, path)
-    session.headers["x-service-object"] = service_object
     return session
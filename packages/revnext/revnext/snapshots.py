@@ -0,0 +1,275 @@
+"""
+Content-addressed snapshot store for downloaded reports.
+Every report CSV added is hashed (SHA-256 of the uncompressed content) and its blob is written,
+compressed, only if no earlier snapshot had the same content. A SQLite manifest records each
+snapshot: report key, service object, label, parameters, time taken and content hash. Nightly
+reports that barely change cost one manifest row instead of another full file, and any earlier
+day can be restored with restore().
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+from revnext.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Bytes hashed / compressed per chunk.
+CHUNK_SIZE = 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL,
+    service_object TEXT NOT NULL,
+    report_label TEXT,
+    params TEXT,
+    taken_at REAL NOT NULL,
+    hash TEXT NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_key_taken_at ON snapshots (key, taken_at);
+CREATE INDEX IF NOT EXISTS snapshots_hash ON snapshots (hash);
+"""
+
+
+def _zstd():
+    """The zstandard module, or None when it is not installed (pip install revnext[zstd])."""
+    try:
+        import zstandard
+
+        return zstandard
+    except ImportError:
+        return None
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """One manifest row: the report (key, service_object, params) as downloaded at taken_at."""
+
+    id: int
+    key: str
+    service_object: str
+    report_label: str | None
+    params: dict | None
+    taken_at: float
+    hash: str
+    size: int
+
+
+class SnapshotStore:
+    """
+    Snapshot store under root: blobs/<hash[:2]>/<hash>.csv.gz (or .csv.zst) and manifest.sqlite3.
+    compression is "gzip" (default) or "zstd" (needs the zstandard package). Blobs written with
+    either codec can be read back whatever the store's current setting. Thread-safe.
+    """
+
+    def __init__(self, root: Path | str, compression: str = "gzip") -> None:
+        if compression not in ("gzip", "zstd"):
+            raise ValueError(
+                f"Unknown compression {compression!r}; use 'gzip' or 'zstd'."
+            )
+        if compression == "zstd" and _zstd() is None:
+            raise ValueError(
+                "zstd compression needs the zstandard package (pip install revnext[zstd])."
+            )
+        self.root = Path(root)
+        self.compression = compression
+        (self.root / "blobs").mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.root / "manifest.sqlite3"), check_same_thread=False
+        )
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def _blob_path(self, content_hash: str, compression: str) -> Path:
+        suffix = ".csv.zst" if compression == "zstd" else ".csv.gz"
+        return self.root / "blobs" / content_hash[:2] / f"{content_hash}{suffix}"
+
+    def _find_blob(self, content_hash: str) -> Path | None:
+        for compression in ("gzip", "zstd"):
+            path = self._blob_path(content_hash, compression)
+            if path.exists():
+                return path
+        return None
+
+    def _write_blob(self, source: BinaryIO, content_hash: str) -> None:
+        """Compress source into the blob for content_hash (temp file renamed into place)."""
+        target = self._blob_path(content_hash, self.compression)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw:
+                if self.compression == "zstd":
+                    with _zstd().ZstdCompressor().stream_writer(raw) as out:
+                        shutil.copyfileobj(source, out, CHUNK_SIZE)
+                else:
+                    with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as out:
+                        shutil.copyfileobj(source, out, CHUNK_SIZE)
+                raw.flush()
+                os.fsync(raw.fileno())
+            os.replace(tmp, target)
+        finally:
+            Path(tmp).unlink(missing_ok=True)
+
+    def add(
+        self,
+        content: Path | str | bytes,
+        *,
+        key: str,
+        service_object: str,
+        report_label: str | None = None,
+        params: dict | None = None,
+        taken_at: float | None = None,
+    ) -> Snapshot:
+        """
+        Record a downloaded report (a file or its bytes) as a snapshot. The content is hashed in
+        chunks; its compressed blob is written only if no earlier snapshot had the same content.
+        """
+        opener = (
+            (lambda: io.BytesIO(content))
+            if isinstance(content, bytes)
+            else (lambda: open(content, "rb"))
+        )
+        digest = hashlib.sha256()
+        size = 0
+        with opener() as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                size += len(chunk)
+        content_hash = digest.hexdigest()
+        if self._find_blob(content_hash) is None:
+            with opener() as f:
+                self._write_blob(f, content_hash)
+        else:
+            logger.debug(
+                "Snapshot of %s unchanged (%s)", report_label or key, content_hash[:12]
+            )
+        taken_at = time.time() if taken_at is None else taken_at
+        params_json = (
+            json.dumps(params, sort_keys=True, default=str) if params else None
+        )
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO snapshots (key, service_object, report_label, params, taken_at,"
+                " hash, size) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    service_object,
+                    report_label,
+                    params_json,
+                    taken_at,
+                    content_hash,
+                    size,
+                ),
+            )
+        return Snapshot(
+            cursor.lastrowid,
+            key,
+            service_object,
+            report_label,
+            params,
+            taken_at,
+            content_hash,
+            size,
+        )
+
+    def _select(self, where: str, args: tuple) -> list[Snapshot]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, key, service_object, report_label, params, taken_at, hash, size"
+                f" FROM snapshots {where}",
+                args,
+            ).fetchall()
+        return [
+            Snapshot(*row[:4], json.loads(row[4]) if row[4] else None, *row[5:])
+            for row in rows
+        ]
+
+    def history(self, key: str) -> list[Snapshot]:
+        """Every snapshot of the report with key, oldest first."""
+        return self._select("WHERE key = ? ORDER BY taken_at, id", (key,))
+
+    def latest(self, key: str, before: float | None = None) -> Snapshot | None:
+        """The newest snapshot of key, or the newest taken at or before the time before."""
+        rows = self._select(
+            "WHERE key = ? AND taken_at <= ? ORDER BY taken_at DESC, id DESC LIMIT 1",
+            (key, before if before is not None else float("inf")),
+        )
+        return rows[0] if rows else None
+
+    def open(self, snapshot: Snapshot) -> BinaryIO:
+        """The snapshot's CSV as a binary file object, decompressed as it is read."""
+        path = self._find_blob(snapshot.hash)
+        if path is None:
+            raise FileNotFoundError(f"Snapshot blob {snapshot.hash} is missing")
+        if path.suffix == ".zst":
+            zstandard = _zstd()
+            if zstandard is None:
+                raise ValueError(
+                    "Reading a zstd snapshot needs the zstandard package (pip install revnext[zstd])."
+                )
+            return zstandard.ZstdDecompressor().stream_reader(
+                open(path, "rb"), closefd=True
+            )
+        return gzip.open(path, "rb")
+
+    def read_bytes(self, snapshot: Snapshot) -> bytes:
+        with self.open(snapshot) as f:
+            return f.read()
+
+    def restore(self, snapshot: Snapshot, output_path: Path | str) -> Path:
+        """Write the snapshot's CSV to output_path (temp file renamed into place)."""
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=output_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as out, self.open(snapshot) as f:
+                shutil.copyfileobj(f, out, CHUNK_SIZE)
+            os.replace(tmp, output_path)
+        finally:
+            Path(tmp).unlink(missing_ok=True)
+        return output_path
+
+    def prune(self, key: str, keep: int) -> int:
+        """
+        Drop all but the newest keep snapshots of key, and blobs no snapshot refers to any more.
+        Returns the number of snapshots removed.
+        """
+        history = self.history(key)
+        old = history[:-keep] if keep > 0 else history
+        if not old:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM snapshots WHERE id = ?", [(s.id,) for s in old]
+            )
+            in_use = {
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT DISTINCT hash FROM snapshots WHERE hash IN (%s)"
+                    % ",".join("?" * len(old)),
+                    [s.hash for s in old],
+                )
+            }
+        for content_hash in {s.hash for s in old} - in_use:
+            while (path := self._find_blob(content_hash)) is not None:
+                path.unlink(missing_ok=True)
+        return len(old)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,11 +1,25 @@
 """
 Download all requested reports to a folder with default parameters except company/division/department.
+All reports run concurrently on one event loop (run_reports_async), so the total time is roughly the
+slowest report's server-side generation rather than the sum of all of them.
+If a run is interrupted, running it again resumes the reports still generating on the server (see
+REVNEXT_JOURNAL_PATH) instead of submitting them again.
+With REVNEXT_SNAPSHOT_DIR set, each run's reports are also kept in a snapshot store; unchanged reports
+are only stored once, and any earlier run can be restored from it.
 Run from repo root: python download_all_reports.py
 """
 
+import asyncio
 from pathlib import Path
 
-from revnext import download_parts_by_bin_report, download_parts_price_list_report
+from revnext import (
+    PartsByBinLocationParams,
+    PartsPriceListParams,
+    RevNextClient,
+    build_parts_by_bin_job,
+    build_parts_price_list_job,
+    run_reports_async,
+)
 
 OUTPUT_DIR = Path(__file__).resolve().parent / "reports"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -18,42 +32,60 @@ REPORTS = [
     ("04", "2", "430", "Charters_Towers_Partnership"),
 ]
 
+# Maximum number of reports generating on the server at once.
+MAX_CONCURRENCY = 8
 
-def main():
+
+def build_jobs(base_url: str) -> list:
+    jobs = []
     for company, division, department, label in REPORTS:
         # Parts Price List
         out_ppl = (
             OUTPUT_DIR
             / f"Parts_Price_List_{label}_{company}_{division}_{department}.csv"
         )
-        print(
-            f"Downloading Parts Price List: {label} ({company}/{division}/{department}) -> {out_ppl.name}"
-        )
-        download_parts_price_list_report(
-            company=company,
-            division=division,
-            department=department,
-            output_path=out_ppl,
-            max_polls=180,
-            poll_interval=2,
+        jobs.append(
+            build_parts_price_list_job(
+                PartsPriceListParams(
+                    company=company, division=division, department=department
+                ),
+                base_url,
+                output_path=out_ppl,
+            )
         )
         # Parts By Bin Location
         out_bin = (
             OUTPUT_DIR
             / f"Parts_By_Bin_Location_{label}_{company}_{division}_{department}.csv"
         )
-        print(
-            f"Downloading Parts By Bin Location: {label} ({company}/{division}/{department}) -> {out_bin.name}"
+        jobs.append(
+            build_parts_by_bin_job(
+                PartsByBinLocationParams(
+                    company=company,
+                    division=division,
+                    department=department,
+                    from_department=department,
+                    to_department=department,
+                ),
+                output_path=out_bin,
+            )
         )
-        download_parts_by_bin_report(
-            company=company,
-            division=division,
-            department=department,
-            from_department=department,
-            to_department=department,
-            output_path=out_bin,
-            max_polls=180,
-            poll_interval=2,
+    return jobs
+
+
+def main():
+    with RevNextClient() as client:
+        jobs = build_jobs(client.base_url)
+        for job in jobs:
+            print(f"Queued {job.report_label} -> {job.output_path.name}")
+        asyncio.run(
+            run_reports_async(
+                jobs,
+                client,
+                max_concurrency=MAX_CONCURRENCY,
+                max_polls=180,
+                poll_interval=2,
+            )
         )
     print(f"Done. All reports saved to {OUTPUT_DIR}")
 
@@ -4,13 +4,31 @@ Run from repo root with revnext installed: pip install -e packages/revnext
 
   python scripts/run_supplier_part_enquiry.py
 
+Bulk mode looks up every part number in a file (one per line, or a CSV with a part number
+column) on a pool of workers and writes dimensions, weights and prices to CSV or Parquet.
+Progress is checkpointed next to the output, so an interrupted run resumes where it stopped
+(a checkpoint made for another supplier is refused; --fresh starts over):
+
+  python scripts/run_supplier_part_enquiry.py --file parts.txt --output supplier_parts.csv
+  python scripts/run_supplier_part_enquiry.py --file parts.csv --output supplier_parts.parquet --supid 7001
+
 Requires REVNEXT_URL, REVNEXT_USERNAME, REVNEXT_PASSWORD in env (or .env).
 """
 
+import argparse
 import sys
+from pathlib import Path
 
+from revnext.client import RevNextClient
 from revnext.common import get_or_create_session
 from revnext.config import RevNextConfig
+from revnext.parts.enquiries.bulk import (
+    DEFAULT_WORKERS,
+    BulkCheckpoint,
+    bulk_supplier_parts,
+    export_supplier_parts,
+    read_part_numbers,
+)
 from revnext.parts.enquiries.supplier_part import (
     GET_RESULTS_SERVICE,
     load_supplier_part,
@@ -18,7 +36,68 @@ from revnext.parts.enquiries.supplier_part import (
 )
 
 
+def run_bulk(config: RevNextConfig, args: argparse.Namespace) -> bool:
+    output = Path(args.output)
+    output_format = "parquet" if output.suffix == ".parquet" else "csv"
+    checkpoint_path = (
+        Path(args.checkpoint)
+        if args.checkpoint
+        else output.with_name(output.name + ".checkpoint.sqlite3")
+    )
+    parts = read_part_numbers(args.file)
+    print(f"{len(parts)} distinct part numbers in {args.file}")
+    checkpoint = BulkCheckpoint(checkpoint_path)
+    try:
+        if args.fresh:
+            checkpoint.clear()
+        with RevNextClient(config) as client:
+            try:
+                summary = bulk_supplier_parts(
+                    client.session,
+                    client.base_url,
+                    parts,
+                    checkpoint,
+                    supid=args.supid,
+                    max_workers=args.workers,
+                )
+            except ValueError as e:
+                print(f"{e} (or pass --fresh)", file=sys.stderr)
+                return False
+        print(
+            f"Done {summary.done} ({summary.not_found} not found), failed {summary.failed}, "
+            f"skipped {summary.skipped} already done"
+        )
+        rows = export_supplier_parts(checkpoint, output, output_format)
+        print(f"Wrote {rows} supplier parts to {output}")
+        for part, error in sorted(checkpoint.failures().items()):
+            print(f"  failed {part}: {error}", file=sys.stderr)
+        return summary.failed == 0
+    finally:
+        checkpoint.close()
+
+
 def main() -> bool:
+    parser = argparse.ArgumentParser(
+        description="Supplier part enquiry for one part, or for a file of parts (--file)."
+    )
+    parser.add_argument("--file", help="Part numbers to look up (bulk mode)")
+    parser.add_argument(
+        "--output",
+        default="supplier_parts.csv",
+        help="Bulk output (.csv or .parquet)",
+    )
+    parser.add_argument(
+        "--checkpoint", help="Bulk checkpoint file (default: next to --output)"
+    )
+    parser.add_argument("--supid", help="Only this supplier (e.g. 7001)")
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="Discard the checkpoint's earlier results and start over",
+    )
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args()
+
     try:
         config = RevNextConfig.from_env()
         config.validate()
@@ -26,6 +105,9 @@ def main() -> bool:
         print(f"Config invalid: {e}", file=sys.stderr)
         return False
 
+    if args.file:
+        return run_bulk(config, args)
+
     session = get_or_create_session(config, GET_RESULTS_SERVICE)
     base_url = config.base_url
 
@@ -0,0 +1,82 @@
+from revnext.parts.part_index import PartIndex
+
+BIN_HEADER = "Franchise,Part Number,Description,Bin Location,Department,Stock On Hand\n"
+
+
+def _write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_parts_by_bin_departments_keep_their_stock(tmp_path):
+    dept_130 = _write(
+        tmp_path / "bin_130.csv",
+        BIN_HEADER + "TOY,90915-YZZD1,OIL FILTER,A01,130,4\n"
+        "TOY,04465-0K090,PAD KIT,B02,130,2\n",
+    )
+    dept_150 = _write(
+        tmp_path / "bin_150.csv",
+        BIN_HEADER + "TOY,90915-YZZD1,OIL FILTER,C03,150,6\n",
+    )
+    index = PartIndex(tmp_path / "parts.sqlite3")
+    try:
+        index.add_report(dept_130, "parts_by_bin")
+        index.add_report(dept_150, "parts_by_bin")
+
+        filter_row = index.get("TOY", "90915-YZZD1")
+        assert filter_row["stktot"] == 10
+        assert filter_row["bins"] == "A01,C03"
+        assert filter_row["binid"] == "A01"
+        assert index.get("TOY", "04465-0K090")["stktot"] == 2
+
+        # Reloading one department replaces only that department's bins and stock.
+        index.add_report(dept_150, "parts_by_bin")
+        assert index.get("TOY", "90915-YZZD1")["stktot"] == 10
+        index.add_report(
+            _write(
+                tmp_path / "bin_150_moved.csv",
+                BIN_HEADER + "TOY,04465-0K090,PAD KIT,D04,150,1\n",
+            ),
+            "parts_by_bin",
+        )
+        assert index.get("TOY", "90915-YZZD1")["stktot"] == 4
+        assert index.get("TOY", "04465-0K090")["stktot"] == 3
+    finally:
+        index.close()
+
+
+def test_department_argument_scopes_reports_without_a_department_column(tmp_path):
+    header = "Franchise,Part Number,Bin Location,Stock On Hand\n"
+    index = PartIndex(tmp_path / "parts.sqlite3")
+    try:
+        index.add_report(
+            _write(tmp_path / "a.csv", header + "TOY,90915-YZZD1,A01,4\n"),
+            "parts_by_bin",
+            department="130",
+        )
+        index.add_report(
+            _write(tmp_path / "b.csv", header + "TOY,90915-YZZD1,C03,6\n"),
+            "parts_by_bin",
+            department="150",
+        )
+        assert index.get("TOY", "90915-YZZD1")["stktot"] == 10
+    finally:
+        index.close()
+
+
+def test_part_number_matches_rank_before_description_matches(tmp_path):
+    rows = "".join(f"TOY,00000-{i:05d},GASKET SEAL {i},A01,130,1\n" for i in range(50))
+    index = PartIndex(tmp_path / "parts.sqlite3")
+    try:
+        index.add_report(
+            _write(
+                tmp_path / "bin.csv",
+                BIN_HEADER + rows + "TOY,RINGO-1,BOND,A02,130,1\n"
+                "TOY,04152-YZZA1,RING RING SEAL,A03,130,1\n",
+            ),
+            "parts_by_bin",
+        )
+        found = [row["prtid"] for row in index.search("ring", batch_size=2)]
+        assert found == ["RINGO-1", "04152-YZZA1"]
+    finally:
+        index.close()
@@ -0,0 +1,51 @@
+from datetime import date
+
+import pytest
+
+from revnext.parts.reports.reader import parse_date, parse_float, parse_int
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("1,234.50", 1234.5),
+        ("$12", 12.0),
+        ("(3.00)", -3.0),
+        ("3.00-", -3.0),
+        ("", None),
+        ("  ", None),
+        ("-", None),
+        (" - ", None),
+        ("N/A", None),
+        ("n/a", None),
+    ],
+)
+def test_parse_float(text, expected):
+    assert parse_float(text) == expected
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [("1,200", 1200), ("12.00", 12), ("-", None), ("N/A", None), ("", None)],
+)
+def test_parse_int(text, expected):
+    assert parse_int(text) == expected
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("31/01/2024", date(2024, 1, 31)),
+        ("2024-01-31T08:00:00", date(2024, 1, 31)),
+        ("-", None),
+        ("N/A", None),
+        ("", None),
+    ],
+)
+def test_parse_date(text, expected):
+    assert parse_date(text) == expected
+
+
+def test_other_junk_still_raises():
+    with pytest.raises(ValueError):
+        parse_float("abc")